@@ -0,0 +1,223 @@
+"""
+Schema and synthetic dataset for benchmarks, bulk loaded with COPY.
+
+    scale   courses  teachers  students  sections  enrollments  completions
+    small     1 000       100    20 000    20 000      100 000     ~530 000
+    full     10 000     1 000   200 000   200 000    1 000 000   ~5 300 000
+
+Generation is deterministic for a given seed, so every machine and commit benchmarks
+the same data. All accounts share BENCHMARK_PASSWORD; e-mails are student{n}@bench.test,
+teacher{n}@bench.test and admin@bench.test.
+
+Tables are loaded with triggers and foreign key checks switched off (which needs the
+superuser of the local cluster); the rows those triggers would maintain (rating
+summaries, progress counters, tags) are then filled in with set-based SQL.
+"""
+
+
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+import asyncpg
+from data.migrate import apply_pending, baseline, discover_migrations, ensure_migrations_table
+
+
+SCHEMA_FILE = Path(__file__).resolve().parent.parent / "docs" / "database Postgre" / "PostgreSchema.sql"
+
+# Objects the pgAdmin schema export references but does not create
+_SCHEMA_PRELUDE = """
+    CREATE SCHEMA IF NOT EXISTS v1;
+    CREATE SEQUENCE IF NOT EXISTS v1.students_courses_students_id_seq;
+    CREATE SEQUENCE IF NOT EXISTS v1.students_courses_courses_id_seq;
+"""
+
+# The schema file already contains everything up to this migration except triggers and
+# functions; the later (idempotent) migrations add those.
+_SCHEMA_MIGRATION = 7
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_TOPICS = ["Python", "SQL", "Statistics", "Design", "Marketing", "Finance", "Physics", "History",
+           "Music", "Spanish", "Algorithms", "Biology", "Drawing", "Writing", "Networks", "Security"]
+_LEVELS = ["Basics", "Intermediate", "Advanced", "Workshop", "Bootcamp"]
+_NAMES = ["Ana", "Boris", "Petar", "Dilyana", "Maria", "Ivan", "Elena", "Georgi", "Nina", "Todor"]
+
+
+@dataclass(frozen=True)
+class Scale:
+    courses: int
+    teachers: int
+    students: int
+    sections_per_course: int
+    enrollments_per_student: int
+    # Average completed sections of an approved enrollment that is still in progress
+    completions_per_enrollment: int
+
+
+SCALES = {
+    "small": Scale(courses=1_000, teachers=100, students=20_000, sections_per_course=20,
+                   enrollments_per_student=5, completions_per_enrollment=4),
+    "full": Scale(courses=10_000, teachers=1_000, students=200_000, sections_per_course=20,
+                  enrollments_per_student=5, completions_per_enrollment=4),
+}
+
+
+async def load_schema(conn: asyncpg.Connection):
+    """Create the v1 schema from PostgreSchema.sql plus the triggers of the later migrations."""
+    await conn.execute(_SCHEMA_PRELUDE)
+    await conn.execute(SCHEMA_FILE.read_text(encoding="utf-8"))
+    migrations = discover_migrations()
+    await ensure_migrations_table(conn)
+    await baseline(conn, migrations, _SCHEMA_MIGRATION)
+    await apply_pending(conn, migrations)
+
+
+def _courses(scale: Scale, rng: random.Random):
+    for course_id in range(1, scale.courses + 1):
+        topic, level = _TOPICS[course_id % len(_TOPICS)], rng.choice(_LEVELS)
+        tags = ",".join(rng.sample(_TOPICS, 3)).lower()
+        yield (course_id, f"{topic} {level} {course_id:05d}", f"{level} course on {topic}.",
+               tags, f"https://img.bench.test/courses/{course_id}.png", rng.random() < 0.2,
+               (course_id - 1) % scale.teachers + 1, rng.random() < 0.02,
+               _EPOCH + timedelta(minutes=course_id * 7))
+
+def _sections(scale: Scale, rng: random.Random):
+    for course_id in range(1, scale.courses + 1):
+        for number in range(1, scale.sections_per_course + 1):
+            section_id = (course_id - 1) * scale.sections_per_course + number
+            yield (section_id, f"C{course_id} S{number}", course_id, "Lorem ipsum " * rng.randint(5, 60),
+                   f"Section {number} of course {course_id}", rng.random() < 0.05)
+
+def _students(scale: Scale, password_hash: str, rng: random.Random):
+    for student_id in range(1, scale.students + 1):
+        yield (student_id, f"student{student_id}@bench.test", password_hash,
+               rng.choice(_NAMES), rng.choice(_NAMES) + "ova", None, True, rng.random() < 0.7)
+
+def _teachers(scale: Scale, password_hash: str):
+    for teacher_id in range(1, scale.teachers + 1):
+        yield (teacher_id, f"teacher{teacher_id}@bench.test", password_hash, True,
+               f"08{teacher_id:08d}"[:10], f"https://linkedin.com/in/teacher{teacher_id}", True)
+
+def _subscriptions(scale: Scale, rng: random.Random):
+    subscription_id = 0
+    for student_id in range(1, scale.students + 1):
+        if rng.random() < 0.3:
+            subscription_id += 1
+            yield (subscription_id, student_id, _EPOCH, date(2099, 1, 1), True)
+
+def _enrollments(scale: Scale, seed: int):
+    """
+    Yield (enrollment row, completed sections, rating or None) per enrollment.
+
+    Uses its own generator seeded with seed, so the three tables derived from it
+    (enrollments, completions, ratings) can each be streamed by a separate pass.
+    """
+    rng = random.Random(seed)
+    enrollment_id = 0
+    for student_id in range(1, scale.students + 1):
+        for course_id in rng.sample(range(1, scale.courses + 1), scale.enrollments_per_student):
+            enrollment_id += 1
+            requested_at = _EPOCH + timedelta(minutes=rng.randint(0, 525_600))
+            approved = rng.random() < 0.95
+            completed = approved and rng.random() < 0.1
+            dropped = approved and not completed and rng.random() < 0.05
+            row = (enrollment_id, student_id, course_id, approved, requested_at,
+                   requested_at + timedelta(hours=rng.randint(1, 72)) if approved else None,
+                   requested_at + timedelta(days=rng.randint(7, 120)) if completed else None,
+                   dropped)
+            sections = 0
+            if approved:
+                sections = scale.sections_per_course if completed else min(
+                    scale.sections_per_course, rng.randint(0, 2 * scale.completions_per_enrollment))
+            rating = rng.randint(1, 10) if approved and rng.random() < 0.2 else None
+            yield row, sections, rating
+
+def _completions(scale: Scale, seed: int):
+    for (_, student_id, course_id, *_), sections, _ in _enrollments(scale, seed):
+        first = (course_id - 1) * scale.sections_per_course + 1
+        for section_id in range(first, first + sections):
+            yield student_id, section_id, True
+
+def _ratings(scale: Scale, seed: int):
+    for (_, student_id, course_id, *_), _, rating in _enrollments(scale, seed):
+        if rating is not None:
+            yield student_id, course_id, rating
+
+
+_DERIVED_ROWS = """
+    INSERT INTO v1.course_rating_summary (course_id, rating_count, rating_sum)
+    SELECT courses_id, COUNT(*), SUM(rating)
+    FROM v1.course_rating
+    GROUP BY courses_id;
+
+    INSERT INTO v1.student_course_progress (student_id, course_id, completed_sections)
+    SELECT scs.students_id, cs.course_id, COUNT(*)
+    FROM v1.students_course_sections scs
+    JOIN v1.course_sections cs ON cs.id = scs.course_sections_id
+    WHERE scs.is_completed = TRUE
+    GROUP BY scs.students_id, cs.course_id;
+
+    INSERT INTO v1.tags (name)
+    SELECT DISTINCT lower(trim(name))
+    FROM v1.courses, regexp_split_to_table(tags, ',') AS name
+    WHERE trim(name) <> '';
+
+    INSERT INTO v1.course_tags (course_id, tag_id)
+    SELECT DISTINCT c.id, t.id
+    FROM v1.courses c
+    CROSS JOIN LATERAL regexp_split_to_table(c.tags, ',') AS name
+    JOIN v1.tags t ON t.name = lower(trim(name));
+
+    DO $$
+    DECLARE
+        table_name text;
+    BEGIN
+        FOREACH table_name IN ARRAY ARRAY['admins', 'teachers', 'students', 'courses', 'course_sections',
+                                    'enrollments', 'subscriptions'] LOOP
+            EXECUTE format('SELECT setval(pg_get_serial_sequence(%L, ''id''), COALESCE(MAX(id), 0) + 1, false) FROM %s',
+                           'v1.' || table_name, 'v1.' || table_name);
+        END LOOP;
+    END;
+    $$;
+"""
+
+
+async def load_dataset(conn: asyncpg.Connection, scale: Scale, password_hash: str, seed: int = 42):
+    """
+    Bulk load a generated dataset into an empty v1 schema.
+
+    :param conn: Connection as a superuser of the benchmark cluster.
+    :param scale: Size of the dataset, see SCALES.
+    :param password_hash: Stored password of every account (a hash of BENCHMARK_PASSWORD).
+    :param seed: Seed of the generator; the same seed always produces the same rows.
+    """
+    rng = random.Random(seed)
+    tables = [
+        ("admins", ["id", "email", "password", "is_active"], [(1, "admin@bench.test", password_hash, True)]),
+        ("teachers", ["id", "email", "password", "email_verified", "mobile", "linked_in_url", "is_active"],
+         _teachers(scale, password_hash)),
+        ("students", ["id", "email", "password", "first_name", "last_name", "avatar_url", "is_active",
+                      "notifications"], _students(scale, password_hash, rng)),
+        ("subscriptions", ["id", "student_id", "subscribed_at", "expire_date", "is_active"], _subscriptions(scale, rng)),
+        ("courses", ["id", "title", "description", "tags", "picture_url", "is_premium", "owner_id", "is_hidden",
+                     "created_on"], _courses(scale, rng)),
+        ("course_sections", ["id", "title", "course_id", "content", "description", "is_hidden"], _sections(scale, rng)),
+        ("enrollments", ["id", "student_id", "course_id", "is_approved", "requested_at", "approved_at",
+                         "completed_at", "drop_out"], (row for row, _, _ in _enrollments(scale, seed))),
+        ("students_course_sections", ["students_id", "course_sections_id", "is_completed"], _completions(scale, seed)),
+        ("course_rating", ["students_id", "courses_id", "rating"], _ratings(scale, seed)),
+    ]
+
+    # Skip triggers and foreign key checks for the bulk load; derived rows are built below
+    await conn.execute("SET session_replication_role = replica")
+    try:
+        for table, columns, records in tables:
+            result = await conn.copy_records_to_table(table, schema_name="v1", columns=columns, records=records)
+            print(f"  {table}: {result}")
+    finally:
+        await conn.execute("SET session_replication_role = DEFAULT")
+
+    await conn.execute(_DERIVED_ROWS)
+    await conn.execute("VACUUM ANALYZE")
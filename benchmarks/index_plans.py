@@ -0,0 +1,136 @@
+"""
+Before/after query plans for the lookup indexes of migrations 011-013.
+
+For each query those indexes serve, runs EXPLAIN (ANALYZE, BUFFERS) twice: first in a
+transaction that drops the indexes and is rolled back afterwards, then with the indexes
+in place. Parameters are taken from existing rows, so the database needs data; on
+near-empty tables the planner prefers a sequential scan either way.
+
+    python -m benchmarks.index_plans [--runs 5]
+
+The "before" pass holds an exclusive lock on the indexed tables until it rolls back, so
+point it at a development or benchmark database, never at production.
+"""
+
+
+import argparse
+import asyncio
+import json
+import statistics
+import asyncpg
+from config.database_deploy_config import connection_supabase
+
+
+INDEXES = [
+    "v1.students_email_key",
+    "v1.teachers_email_key",
+    "v1.admins_email_key",
+    "v1.course_sections_course_id_idx",
+    "v1.enrollments_course_id_idx",
+    "v1.courses_owner_id_idx",
+    "v1.course_rating_courses_id_idx",
+]
+
+# name -> (query as issued by the repository, query picking its parameters from existing rows)
+QUERIES = {
+    "check_enrollment_repo": (
+        "SELECT 1 FROM v1.enrollments WHERE course_id = $1 AND student_id = $2",
+        "SELECT course_id, student_id FROM v1.enrollments ORDER BY id DESC LIMIT 1",
+    ),
+    "report_enrolled_students_repo": (
+        """
+        SELECT e.student_id, s.email, s.first_name, s.last_name,
+           e.course_id, c.title, e.requested_at, e.approved_at, e.completed_at, e.drop_out, c.created_on
+        FROM v1.enrollments AS e
+            JOIN v1.courses AS c ON e.course_id = c.id
+            JOIN v1.students AS s ON e.student_id = s.id
+        WHERE c.owner_id = $1
+        """,
+        "SELECT owner_id FROM v1.courses ORDER BY id DESC LIMIT 1",
+    ),
+    "get_all_courses_per_teacher_repo": (
+        """
+        SELECT c.id, c.title, rs.average_rating
+        FROM v1.courses c
+        LEFT JOIN v1.course_rating_summary rs ON c.id = rs.course_id
+        WHERE owner_id = $1 AND c.title ILIKE '%' || $2 || '%'
+        ORDER BY c.id
+        """,
+        "SELECT owner_id, '' FROM v1.courses ORDER BY id DESC LIMIT 1",
+    ),
+    "get_all_course_sections_repo": (
+        "SELECT * FROM v1.course_sections WHERE course_id = $1 ORDER BY id asc",
+        "SELECT course_id FROM v1.course_sections ORDER BY id DESC LIMIT 1",
+    ),
+    "get_course_rating_repo": (
+        """
+        SELECT cr.rating, cr.students_id, s.email
+        FROM v1.course_rating cr
+        JOIN v1.students s ON cr.students_id = s.id
+        WHERE cr.courses_id = $1
+        """,
+        "SELECT courses_id FROM v1.course_rating LIMIT 1",
+    ),
+    "get_role_by_email_repo": (
+        "SELECT role FROM v1.accounts WHERE email = $1 ORDER BY role_rank LIMIT 1",
+        "SELECT email FROM v1.students ORDER BY id DESC LIMIT 1",
+    ),
+}
+
+
+def _scan_nodes(plan: dict) -> list[str]:
+    """Scan nodes of a JSON plan, e.g. 'Index Scan on enrollments'."""
+    nodes = []
+    if "Scan" in plan["Node Type"] and "Relation Name" in plan:
+        nodes.append(f"{plan['Node Type']} on {plan['Relation Name']}")
+    for child in plan.get("Plans", []):
+        nodes.extend(_scan_nodes(child))
+    return nodes
+
+async def explain(conn: asyncpg.Connection, query: str, params, runs: int) -> tuple[float, list[str]]:
+    """Return the median execution time (ms) over runs and the scan nodes of the last plan."""
+    timings, plan = [], None
+    for _ in range(runs):
+        result = await conn.fetchval(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", *params)
+        plan = (json.loads(result) if isinstance(result, str) else result)[0]
+        timings.append(plan["Execution Time"])
+    return statistics.median(timings), _scan_nodes(plan["Plan"])
+
+async def collect(conn: asyncpg.Connection, runs: int) -> dict[str, tuple]:
+    results = {}
+    for name, (query, params_query) in QUERIES.items():
+        params = await conn.fetchrow(params_query)
+        if params is None:
+            print(f"skipping {name}: no rows to take parameters from")
+            continue
+        results[name] = await explain(conn, query, tuple(params), runs)
+    return results
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.index_plans")
+    parser.add_argument("--runs", type=int, default=5, help="EXPLAIN ANALYZE runs per query (median is reported)")
+    args = parser.parse_args(argv)
+
+    conn = await asyncpg.connect(**connection_supabase())
+    try:
+        transaction = conn.transaction()
+        await transaction.start()
+        try:
+            for index in INDEXES:
+                await conn.execute(f"DROP INDEX IF EXISTS {index}")
+            before = await collect(conn, args.runs)
+        finally:
+            await transaction.rollback()
+        after = await collect(conn, args.runs)
+    finally:
+        await conn.close()
+
+    for name, (after_ms, after_nodes) in after.items():
+        before_ms, before_nodes = before.get(name, (float("nan"), []))
+        print(f"\n{name}: {before_ms:.3f} ms -> {after_ms:.3f} ms")
+        print(f"  before: {', '.join(before_nodes) or '-'}")
+        print(f"  after:  {', '.join(after_nodes) or '-'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,259 @@
+"""
+Concurrent HTTP load against a running instance of the app, reporting throughput and
+p50/p95/p99 latency per route.
+
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000 --concurrency 32 --duration 60
+
+Students, teachers and the courses they act on are sampled from the benchmark database
+(benchmarks/dataset.py) and logged in through POST /login before the measured phase.
+Every virtual client then loops: pick a scenario by weight, send the request, record its
+latency under the route template. Samples from the warm-up period are discarded. With
+--json the results are also written to a file, for comparing runs.
+"""
+
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+import asyncpg
+import httpx
+from benchmarks.dataset import BENCHMARK_PASSWORD
+
+
+@dataclass
+class User:
+    id: int
+    email: str
+    token: str = ""
+    # Approved, ongoing enrollments of a student: course id -> section ids
+    courses: dict[int, list[int]] = field(default_factory=dict)
+
+
+@dataclass
+class Fixtures:
+    students: list[User]
+    teachers: list[User]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    route: str
+    weight: int
+    # (rng, fixtures) -> (method, url, keyword arguments for httpx)
+    build: Callable[[random.Random, Fixtures], tuple[str, str, dict]]
+
+
+def _auth(user: User) -> dict:
+    return {"Authorization": f"Bearer {user.token}"}
+
+def _public_courses(rng: random.Random, fixtures: Fixtures):
+    params = {"limit": 20, "sort_by": rng.choice(["title", "rating", "created_on"])}
+    if rng.random() < 0.25:
+        params["search"] = rng.choice(["python", "sql advanced", "design workshop", "music"])
+    return "GET", "/courses/public", {"params": params}
+
+def _student_public_courses(rng, fixtures):
+    student = rng.choice(fixtures.students)
+    return "GET", "/courses/public", {"params": {"limit": 20}, "headers": _auth(student)}
+
+def _course_sections(rng, fixtures):
+    student = rng.choice(fixtures.students)
+    return "GET", f"/courses/{rng.choice(list(student.courses))}/sections", {"headers": _auth(student)}
+
+def _complete_sections(rng, fixtures):
+    student = rng.choice(fixtures.students)
+    course_id = rng.choice(list(student.courses))
+    sections = student.courses[course_id]
+    return "POST", f"/students/{course_id}/sections/complete", {
+        "headers": _auth(student), "json": {"section_ids": rng.sample(sections, min(3, len(sections)))}}
+
+def _student_get(path: str):
+    def build(rng, fixtures):
+        return "GET", path, {"headers": _auth(rng.choice(fixtures.students))}
+    return build
+
+def _teacher_get(path: str):
+    def build(rng, fixtures):
+        return "GET", path, {"headers": _auth(rng.choice(fixtures.teachers))}
+    return build
+
+def _login(rng, fixtures):
+    user = rng.choice(fixtures.students + fixtures.teachers)
+    return "POST", "/login", {"json": {"email": user.email, "password": BENCHMARK_PASSWORD}}
+
+
+SCENARIOS = [
+    Scenario("GET /courses/public (anonymous)", 20, _public_courses),
+    Scenario("GET /courses/public (student)", 10, _student_public_courses),
+    Scenario("GET /courses/student", 10, _student_get("/courses/student")),
+    Scenario("GET /students/courses", 10, _student_get("/students/courses")),
+    Scenario("GET /students/courses/progress", 5, _student_get("/students/courses/progress")),
+    Scenario("GET /courses/{course_id}/sections", 15, _course_sections),
+    Scenario("POST /students/{course_id}/sections/complete", 5, _complete_sections),
+    Scenario("GET /courses/teacher", 10, _teacher_get("/courses/teacher")),
+    Scenario("GET /teachers/enrollment/report", 3, _teacher_get("/teachers/enrollment/report")),
+    Scenario("POST /login", 2, _login),
+]
+
+
+async def load_fixtures(connect_settings: dict, students: int, teachers: int) -> Fixtures:
+    """Sample users with ongoing enrollments (and those courses' sections) from the database."""
+    conn = await asyncpg.connect(**connect_settings)
+    try:
+        rows = await conn.fetch("""
+            SELECT s.id, s.email, array_agg(e.course_id) AS courses
+            FROM v1.students s
+            JOIN v1.enrollments e ON e.student_id = s.id
+            WHERE e.is_approved AND e.completed_at IS NULL AND NOT e.drop_out
+            GROUP BY s.id
+            ORDER BY s.id
+            LIMIT $1
+        """, students)
+        course_ids = sorted({course_id for row in rows for course_id in row["courses"]})
+        sections = {row["course_id"]: row["ids"] for row in await conn.fetch("""
+            SELECT course_id, array_agg(id ORDER BY id) AS ids
+            FROM v1.course_sections
+            WHERE course_id = ANY($1::int[]) AND NOT is_hidden
+            GROUP BY course_id
+        """, course_ids)}
+        teacher_rows = await conn.fetch("SELECT id, email FROM v1.teachers ORDER BY id LIMIT $1", teachers)
+    finally:
+        await conn.close()
+
+    students = [User(row["id"], row["email"], courses={c: sections[c] for c in row["courses"] if c in sections})
+                for row in rows]
+    return Fixtures(
+        students=[student for student in students if student.courses],
+        teachers=[User(row["id"], row["email"]) for row in teacher_rows],
+    )
+
+async def log_in(client: httpx.AsyncClient, users: list[User], concurrency: int = 8):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(user: User):
+        async with slots:
+            response = await client.post("/login", json={"email": user.email, "password": BENCHMARK_PASSWORD})
+            response.raise_for_status()
+            user.token = response.json()["access_token"]
+
+    await asyncio.gather(*(one(user) for user in users))
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list, q in (0, 1]."""
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+def summarize(samples: dict[str, list[float]], failures: dict[str, int], duration: float) -> dict:
+    report = {}
+    for route in sorted(samples.keys() | failures.keys()):
+        latencies = sorted(samples.get(route, []))
+        report[route] = {
+            "requests": len(latencies),
+            "errors": failures.get(route, 0),
+            "rps": len(latencies) / duration,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+        }
+    return report
+
+async def run_load(client: httpx.AsyncClient, fixtures: Fixtures, concurrency: int, duration: float,
+                   warmup: float, seed: int = 1) -> dict:
+    """
+    Drive the app with concurrency closed-loop clients.
+
+    :return: Per-route report; requests that failed or answered with a status >= 400 count as errors.
+    """
+    samples: dict[str, list[float]] = defaultdict(list)
+    failures: dict[str, int] = defaultdict(int)
+    weights = [scenario.weight for scenario in SCENARIOS]
+    started = time.perf_counter()
+    measure_from, stop_at = started + warmup, started + warmup + duration
+
+    async def client_loop(number: int):
+        rng = random.Random(seed * 10_000 + number)
+        while time.perf_counter() < stop_at:
+            scenario = rng.choices(SCENARIOS, weights)[0]
+            method, url, kwargs = scenario.build(rng, fixtures)
+            sent = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            finished = time.perf_counter()
+            if sent < measure_from or finished > stop_at:
+                continue
+            if ok:
+                samples[scenario.route].append(finished - sent)
+            else:
+                failures[scenario.route] += 1
+
+    await asyncio.gather(*(client_loop(number) for number in range(concurrency)))
+    return summarize(samples, failures, duration)
+
+def print_report(report: dict):
+    print(f"\n{'route':<48} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, row in report.items():
+        print(f"{route:<48} {row['requests']:>9} {row['errors']:>7} {row['rps']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+    total = sum(row["requests"] for row in report.values())
+    print(f"{'total':<48} {total:>9} {sum(row['errors'] for row in report.values()):>7} "
+          f"{sum(row['rps'] for row in report.values()):>8.1f}")
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_json(path: str, report: dict, meta: dict):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"meta": {"revision": git_revision(), **meta}, "routes": report}, file, indent=2)
+
+async def benchmark(base_url: str, connect_settings: dict, concurrency: int, duration: float, warmup: float,
+                    students: int = 500, teachers: int = 50, json_path: Optional[str] = None,
+                    meta: Optional[dict] = None) -> dict:
+    fixtures = await load_fixtures(connect_settings, students, teachers)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await log_in(client, fixtures.students + fixtures.teachers)
+        report = await run_load(client, fixtures, concurrency, duration, warmup)
+
+    print_report(report)
+    if json_path:
+        write_json(json_path, report,
+                   {"concurrency": concurrency, "duration": duration, "warmup": warmup, **(meta or {})})
+    return report
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_test")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--db-host", default="127.0.0.1")
+    parser.add_argument("--db-port", type=int, default=5432)
+    parser.add_argument("--db-user", default="postgres")
+    parser.add_argument("--db-name", default="elearning_bench")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=10, help="seconds of load before measuring")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    await benchmark(args.base_url,
+                    {"host": args.db_host, "port": args.db_port, "user": args.db_user, "database": args.db_name},
+                    args.concurrency, args.duration, args.warmup, json_path=args.json_path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Disposable Postgres cluster for benchmarks.
+
+Creates a cluster with initdb in a data directory (a temporary one unless given), starts
+it on a private port and socket directory, and removes temporary clusters on stop. The
+Postgres binaries are looked up on PATH, then with pg_config, then under
+/usr/lib/postgresql/<version>/bin; set PG_BIN to pick a specific installation.
+
+initdb refuses to run as root, so run the benchmarks as an unprivileged user.
+"""
+
+
+import glob
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Optional
+import asyncpg
+
+
+def find_bin_dir() -> Path:
+    """Directory holding initdb and pg_ctl."""
+    if os.getenv("PG_BIN"):
+        return Path(os.environ["PG_BIN"])
+    initdb = shutil.which("initdb")
+    if initdb:
+        return Path(initdb).parent
+    if shutil.which("pg_config"):
+        return Path(subprocess.run(["pg_config", "--bindir"], check=True, capture_output=True, text=True).stdout.strip())
+    candidates = sorted(glob.glob("/usr/lib/postgresql/*/bin"), key=lambda path: int(Path(path).parent.name))
+    if candidates:
+        return Path(candidates[-1])
+    raise RuntimeError("Postgres binaries not found; install Postgres or set PG_BIN")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalPostgres:
+    """
+    A Postgres cluster owned by the benchmark run.
+
+    :param data_dir: Cluster directory. An existing cluster is reused (and kept), so a
+        generated dataset can serve several runs; by default a temporary one is created.
+    :param port: TCP port on 127.0.0.1, a free one by default.
+    :param settings: Extra server settings, e.g. {"shared_buffers": "1GB"}.
+    """
+
+    def __init__(self, data_dir: Optional[Path] = None, port: Optional[int] = None, settings: Optional[dict] = None):
+        self.temporary = data_dir is None
+        self.data_dir = Path(data_dir or tempfile.mkdtemp(prefix="elearning-bench-"))
+        self.port = port or free_port()
+        self.settings = {"listen_addresses": "127.0.0.1", "max_connections": 200, **(settings or {})}
+        self.bin_dir = find_bin_dir()
+        self.user = "postgres"
+
+    def _run(self, *args: str):
+        subprocess.run([str(self.bin_dir / args[0]), *args[1:]], check=True, capture_output=True, text=True)
+
+    def start(self) -> "LocalPostgres":
+        if os.geteuid() == 0:
+            raise RuntimeError("initdb refuses to run as root; run the benchmarks as an unprivileged user")
+        if not (self.data_dir / "PG_VERSION").exists():
+            self._run("initdb", "-D", str(self.data_dir), "-U", self.user, "--auth=trust",
+                      "--encoding=UTF8", "--no-locale")
+        options = " ".join([f"-p {self.port}", f"-k {self.data_dir}"] +
+                           [f"-c {name}={value}" for name, value in self.settings.items()])
+        self._run("pg_ctl", "-D", str(self.data_dir), "-l", str(self.data_dir / "server.log"),
+                  "-o", options, "-w", "start")
+        return self
+
+    def stop(self):
+        try:
+            self._run("pg_ctl", "-D", str(self.data_dir), "-m", "fast", "-w", "stop")
+        finally:
+            if self.temporary:
+                shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def connect_settings(self, database: str) -> dict:
+        """Keyword arguments for asyncpg.connect / create_pool."""
+        return {"user": self.user, "host": "127.0.0.1", "port": self.port, "database": database}
+
+    def app_environment(self, database: str) -> dict:
+        """Environment variables pointing config/database_deploy_config.py at this cluster."""
+        return {"USE_DEPLOYED_DB": "true", "USER": self.user, "PASSWORD": "",
+                "HOST": "127.0.0.1", "PORT": str(self.port), "DBNAME": database}
+
+    async def create_database(self, database: str) -> bool:
+        """Create the database unless it exists. :return: True when it was created."""
+        conn = await asyncpg.connect(**self.connect_settings("postgres"))
+        try:
+            if await conn.fetchval("SELECT 1 FROM pg_database WHERE datname = $1", database):
+                return False
+            await conn.execute(f'CREATE DATABASE "{database}"')
+            return True
+        finally:
+            await conn.close()
+
+    def __enter__(self) -> "LocalPostgres":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
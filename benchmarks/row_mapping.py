@@ -0,0 +1,90 @@
+"""
+Micro-benchmark: building response models from database rows.
+
+Compares, per model of data/models.py that the list endpoints return, the cost per row of
+
+- validate:   Model(**dict(row)), as the routes used to do
+- adapter:    one TypeAdapter(list[Model]) call per list (STRICT_ROW_VALIDATION=true)
+- trusted:    data.mapping.to_models, the same over the model's trusted twin (the default)
+- construct:  Model.model_construct(**row), skipping validation altogether
+
+and of encoding the resulting list with common.responses.dumps. Needs no database; rows
+are generated dicts shaped like the repositories' results.
+
+    python -m benchmarks.row_mapping [--rows 1000] [--repeat 5]
+"""
+
+
+import argparse
+import timeit
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable
+from pydantic import BaseModel, TypeAdapter
+from common.responses import dumps
+from data.mapping import to_models
+from data.models import (
+    AdminCourseListResponse, CourseResponse, CourseStudentResponse, CoursesProgressResponse, EnrollmentReport,
+    StudentResponse, TeacherResponse)
+
+
+_NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _course(n: int) -> dict:
+    return {"id": n, "title": f"Course {n:05d}", "description": "An introductory course " * 4, "tags": "python,sql",
+            "picture_url": f"https://img.example.com/{n}.png", "is_premium": n % 5 == 0, "owner_id": n % 100 + 1,
+            "is_hidden": False, "created_on": _NOW + timedelta(minutes=n), "average_rating": Decimal("7.50"),
+            "student_count": n % 40}
+
+# model -> row generator, with the columns its repository query returns
+ROWS: dict[type[BaseModel], Callable[[int], dict]] = {
+    AdminCourseListResponse: _course,
+    CourseResponse: _course,
+    CourseStudentResponse: _course,
+    CoursesProgressResponse: lambda n: {"course_id": n, "title": f"Course {n}", "progress_percentage": Decimal("42.86")},
+    StudentResponse: lambda n: {"id": n, "email": f"student{n}@example.com", "password": "$2b$12$" + "x" * 53,
+                                "first_name": "Dilyana", "last_name": "Bozhinova", "avatar_url": None,
+                                "is_active": True, "notifications": True},
+    TeacherResponse: lambda n: {"id": n, "email": f"teacher{n}@example.com", "mobile": "0888123456",
+                                "linked_in_url": f"https://linkedin.com/in/teacher{n}", "is_active": True},
+    EnrollmentReport: lambda n: {"enrollment_id": n, "student_id": n, "email": f"student{n}@example.com",
+                                 "first_name": "Petar", "last_name": "Pavlov", "course_id": n % 50, "title": "Course",
+                                 "requested_at": _NOW, "approved_at": _NOW, "completed_at": None, "drop_out": False,
+                                 "created_on": _NOW},
+}
+
+
+def _per_row_us(run: Callable[[], object], rows: int, repeat: int) -> float:
+    return min(timeit.repeat(run, number=1, repeat=repeat)) / rows * 1e6
+
+def measure(model: type[BaseModel], rows: list[dict], repeat: int) -> dict[str, float]:
+    adapter = TypeAdapter(list[model])
+    construct = model.model_construct
+    constructed = [construct(**row) for row in rows]
+    return {
+        "validate": _per_row_us(lambda: [model(**dict(row)) for row in rows], len(rows), repeat),
+        "adapter": _per_row_us(lambda: adapter.validate_python([dict(row) for row in rows]), len(rows), repeat),
+        "trusted": _per_row_us(lambda: to_models(model, rows), len(rows), repeat),
+        "construct": _per_row_us(lambda: [construct(**row) for row in rows], len(rows), repeat),
+        "encode": _per_row_us(lambda: dumps(constructed), len(rows), repeat),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.row_mapping")
+    parser.add_argument("--rows", type=int, default=1000, help="rows per list")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (fastest is reported)")
+    args = parser.parse_args(argv)
+
+    print(f"microseconds per row, {args.rows} rows, best of {args.repeat}")
+    print(f"{'model':<26} {'validate':>9} {'adapter':>9} {'trusted':>9} {'construct':>10} {'speedup':>8} {'encode':>8}")
+    for model, make_row in ROWS.items():
+        rows = [make_row(n) for n in range(1, args.rows + 1)]
+        result = measure(model, rows, args.repeat)
+        print(f"{model.__name__:<26} {result['validate']:>9.2f} {result['adapter']:>9.2f} {result['trusted']:>9.2f} "
+              f"{result['construct']:>10.2f} {result['validate'] / result['trusted']:>7.1f}x {result['encode']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
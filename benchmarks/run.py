@@ -0,0 +1,107 @@
+"""
+End-to-end benchmark: a local Postgres cluster, the generated dataset, the app under
+uvicorn and the load driver, torn down again afterwards.
+
+    python -m benchmarks.run --scale small --concurrency 32 --duration 60 --json results.json
+
+Loading the full scale takes several minutes. Pass --data-dir to keep the cluster between
+runs: an existing dataset in it is reused, so later runs start right away. Delete the
+directory (or use a new one) after changing the schema or the generator.
+"""
+
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+import asyncpg
+import httpx
+from benchmarks.dataset import BENCHMARK_PASSWORD, SCALES, load_dataset, load_schema
+from benchmarks.load_test import benchmark
+from benchmarks.local_postgres import LocalPostgres, free_port
+from security.secrets import password_context
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATABASE = "elearning_bench"
+
+
+async def prepare_database(cluster: LocalPostgres, scale: str, seed: int):
+    await cluster.create_database(DATABASE)
+    conn = await asyncpg.connect(**cluster.connect_settings(DATABASE))
+    try:
+        if not await conn.fetchval("SELECT to_regclass('v1.courses') IS NOT NULL"):
+            await load_schema(conn)
+        if await conn.fetchval("SELECT EXISTS (SELECT 1 FROM v1.courses)"):
+            print("Reusing the dataset already in the cluster")
+            return
+        print(f"Loading the {scale} dataset")
+        started = time.perf_counter()
+        await load_dataset(conn, SCALES[scale], password_context.hash(BENCHMARK_PASSWORD), seed)
+        print(f"Loaded in {time.perf_counter() - started:.0f} s")
+    finally:
+        await conn.close()
+
+def start_app(cluster: LocalPostgres, port: int, workers: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        **cluster.app_environment(DATABASE),
+        "SECRET_KEY": "benchmark-secret",
+        "ALGORITHM": "HS256",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "240",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env,
+    )
+
+async def wait_until_ready(base_url: str, app: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if app.poll() is not None:
+                raise RuntimeError(f"the app exited with status {app.returncode}")
+            try:
+                if (await client.get("/metrics")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"the app did not start within {timeout:.0f} s")
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42, help="seed of the dataset generator")
+    parser.add_argument("--data-dir", type=Path, help="keep the cluster and its dataset in this directory")
+    parser.add_argument("--shared-buffers", default="512MB")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=10, help="seconds of load before measuring")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    with LocalPostgres(args.data_dir, settings={"shared_buffers": args.shared_buffers}) as cluster:
+        await prepare_database(cluster, args.scale, args.seed)
+
+        port = free_port()
+        app = start_app(cluster, port, args.workers)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            await wait_until_ready(base_url, app)
+            await benchmark(base_url, cluster.connect_settings(DATABASE), args.concurrency, args.duration,
+                            args.warmup, json_path=args.json_path,
+                            meta={"scale": args.scale, "seed": args.seed, "workers": args.workers})
+        finally:
+            app.terminate()
+            app.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
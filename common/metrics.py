@@ -0,0 +1,50 @@
+"""
+Prometheus metrics of this worker process, served on GET /metrics.
+
+Every worker keeps its own registry, so with several uvicorn workers each scrape sees
+one process; label the targets per worker (or run one worker per container).
+"""
+
+
+from prometheus_client import Counter, Gauge, Histogram
+
+
+# Query latencies span sub-millisecond primary key lookups to multi-second reports
+_QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+_ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+_REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+_QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+# `function` is the repository function that issued the query, `helper` the data.database
+# helper it went through (read_query, insert_query, ...).
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "Time a query spent executing on its connection",
+    ["function", "helper"], buckets=_QUERY_BUCKETS,
+)
+DB_ACQUIRE_SECONDS = Histogram(
+    "db_connection_acquire_seconds", "Time a query waited for a pooled connection",
+    ["function"], buckets=_QUERY_BUCKETS,
+)
+DB_QUERY_ROWS = Histogram(
+    "db_query_rows", "Rows returned or affected by a query",
+    ["function"], buckets=_ROW_BUCKETS,
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total", "Queries that raised an error",
+    ["function"],
+)
+
+# `route` is the path template of the matched route, e.g. /courses/{course_id}/sections,
+# so the number of series stays bounded by the number of endpoints.
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to handle a request, until the response is fully sent",
+    ["method", "route", "status"], buckets=_REQUEST_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests being handled",
+    ["method", "route"],
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries issued while handling a request",
+    ["method", "route"], buckets=_QUERY_COUNT_BUCKETS,
+)
@@ -0,0 +1,64 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional, Sequence
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """
+    A listing sort column usable for keyset pagination.
+
+    :param expression: SQL expression the listing orders by, e.g. "c.title".
+    :param cast: Postgres type the cursor value is cast to before comparing.
+    :param column: Name of the result column holding the sort value.
+    :param null_value: Value the expression substitutes for NULL (must match a COALESCE in `expression`).
+    """
+    expression: str
+    cast: str
+    column: str
+    null_value: Any = None
+
+    def value(self, row) -> Any:
+        value = row[self.column]
+        return self.null_value if value is None else value
+
+    def clause(self, descending: bool, value_param: int, id_param: int, id_expression: str = "c.id") -> str:
+        """Row comparison selecting the rows after the cursor, in the listing's sort direction."""
+        operator = "<" if descending else ">"
+        return (f"AND ({self.expression}, {id_expression}) {operator} "
+                f"(${value_param}::text::{self.cast}, ${id_param}::int)")
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Encode the last row's sort value and id into an opaque, URL-safe token."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    elif sort_value is not None:
+        sort_value = str(sort_value)
+    payload = json.dumps({"v": sort_value, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[Optional[str], int]:
+    """Decode a token produced by `encode_cursor`. Raises HTTP 400 for malformed tokens."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return payload["v"], int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def next_cursor(rows: Optional[Sequence], limit: int, sort_key: SortKey, id_column: str = "id") -> Optional[str]:
+    """Cursor for the page after `rows`, or None when this page was the last one."""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(sort_key.value(last), last[id_column])
+
+def set_next_cursor(response: Response, cursor: Optional[str]):
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,73 @@
+"""
+ASGI middleware timing every HTTP request per route template.
+
+Records latency, status and in-flight requests in the Prometheus metrics of
+common/metrics.py, together with the number of database queries the request issued,
+and reports the same numbers to the client in a Server-Timing header, e.g.
+
+    Server-Timing: db;dur=12.4;desc="7 queries", app;dur=31.0
+
+so N+1 query patterns show up per endpoint in the browser's network panel. The header
+is written when the response starts, so for streamed responses it covers the time to
+the first byte.
+"""
+
+
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+from common.metrics import HTTP_REQUEST_DB_QUERIES, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT
+from data.database import count_queries
+
+
+# Label of requests that match no route, so unknown paths cannot create new series
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route the request will be dispatched to, e.g. /courses/{course_id}."""
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            # Path matches but the method does not (405)
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+class RequestTimingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, route = scope["method"], route_template(scope)
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method, route)
+        status = 500
+        started = time.perf_counter()
+        in_flight.inc()
+
+        with count_queries() as queries:
+            async def send_with_timing(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing",
+                        f'db;dur={queries.seconds * 1000:.1f};desc="{queries.count} queries", app;dur={elapsed_ms:.1f}',
+                    )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                in_flight.dec()
+                HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(time.perf_counter() - started)
+                HTTP_REQUEST_DB_QUERIES.labels(method, route).observe(queries.count)
@@ -1,36 +1,155 @@
-from fastapi.responses import JSONResponse
+"""
+Response classes of the API.
 
+Bodies are encoded with orjson, which handles datetimes, dates and UUIDs natively. On top
+of that `dumps` accepts Decimal (e.g. from ROUND(AVG(...))), asyncpg Records and Pydantic
+models, so routes can hand rows and response models over as they are, without converting
+them with model_dump(mode="json") first.
+"""
 
-class BadRequest(JSONResponse):
+
+import csv
+import io
+from decimal import Decimal
+from typing import Any, AsyncIterable, AsyncIterator, Optional, Sequence
+import asyncpg
+import orjson
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        # Serialized by pydantic-core straight to JSON bytes, honouring the model's serializers
+        return orjson.Fragment(value.__pydantic_serializer__.to_json(value))
+    if isinstance(value, asyncpg.Record):
+        return dict(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Encode content as JSON bytes; UTC datetimes end in "Z", as Pydantic writes them."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+def jsonable(value: Any) -> Any:
+    """Plain JSON-compatible Python value of a model, Record or dict (e.g. for a CSV row)."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return orjson.loads(dumps(value))
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson (see `dumps`); FastAPI's default response class (main.py)."""
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class BadRequest(ORJSONResponse):
     def __init__(self, content=''):
         super().__init__(status_code=400, content=content)
 
-class Unauthorized(JSONResponse):
+class Unauthorized(ORJSONResponse):
     def __init__(self, content=''):
         super().__init__(status_code=401, content=content)
 
-class Forbidden(JSONResponse):
+class Forbidden(ORJSONResponse):
     def __init__(self, content=''):
         super().__init__(status_code=403, content=content)
 
-class NotFound(JSONResponse):
+class NotFound(ORJSONResponse):
     def __init__(self, content=''):
         super().__init__(status_code=404, content=content)
 
 
 
-class Successful(JSONResponse):
+class Successful(ORJSONResponse):
     def __init__(self, content=''):
         super().__init__(status_code=200, content=content)
 
-class Created(JSONResponse):
+class Created(ORJSONResponse):
     def __init__(self, content=''):
         super().__init__(status_code=201, content=content)
 
-class NoContent(JSONResponse):
+class Accepted(ORJSONResponse):
+    def __init__(self, content=''):
+        super().__init__(status_code=202, content=content)
+
+class NoContent(ORJSONResponse):
     def __init__(self):
         super().__init__(status_code=204, content=None)
 
-class InternalServerError(JSONResponse):
+class InternalServerError(ORJSONResponse):
     def __init__(self, content=''):
-        super().__init__(status_code=500, content=content)
\ No newline at end of file
+        super().__init__(status_code=500, content=content)
+
+
+# Bytes of encoded items collected before a chunk of a streamed response is sent
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+async def _chunks(pieces: AsyncIterable[str], head: str = "", tail: str = "") -> AsyncIterator[bytes]:
+    buffer, size = [head], len(head)
+    async for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= STREAM_CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    buffer.append(tail)
+    yield "".join(buffer).encode("utf-8")
+
+async def _json_array_items(items: AsyncIterable[Any]) -> AsyncIterator[str]:
+    separator = ""
+    async for item in items:
+        yield separator + dumps(item).decode("utf-8")
+        separator = ","
+
+async def _ndjson_lines(items: AsyncIterable[Any]) -> AsyncIterator[str]:
+    async for item in items:
+        yield dumps(item).decode("utf-8") + "\n"
+
+async def _csv_lines(rows: AsyncIterable[dict], columns: Sequence[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    async for row in rows:
+        writer.writerow(row if isinstance(row, dict) else jsonable(row))
+        if buffer.tell() >= 4096:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def _attachment(filename: Optional[str]) -> Optional[dict]:
+    return {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+
+class StreamingJSONArray(StreamingResponse):
+    """
+    JSON array written out while its items are produced, e.g. rows of `stream_query`.
+
+    Items may be anything `dumps` encodes, e.g. Records or response models. Only about
+    STREAM_CHUNK_SIZE bytes are held at a time. The status is sent before the first item,
+    so an error mid-stream ends the response early instead of turning it into a 500.
+    """
+    def __init__(self, items: AsyncIterable[Any], status_code: int = 200):
+        super().__init__(_chunks(_json_array_items(items), "[", "]"), status_code=status_code,
+                         media_type="application/json")
+
+class StreamingNDJSON(StreamingResponse):
+    """Newline-delimited JSON, one line per item, streamed like StreamingJSONArray."""
+    def __init__(self, items: AsyncIterable[Any], filename: Optional[str] = None, status_code: int = 200):
+        super().__init__(_chunks(_ndjson_lines(items)), status_code=status_code,
+                         media_type="application/x-ndjson", headers=_attachment(filename))
+
+class StreamingCSV(StreamingResponse):
+    """
+    CSV with a header row of `columns`, then one line per row (a dict of JSON-compatible
+    values, or a model or Record; None becomes an empty field), streamed like StreamingJSONArray.
+    """
+    def __init__(self, rows: AsyncIterable[dict], columns: Sequence[str], filename: Optional[str] = None,
+                 status_code: int = 200):
+        super().__init__(_chunks(_csv_lines(rows, columns)), status_code=status_code,
+                         media_type="text/csv", headers=_attachment(filename))
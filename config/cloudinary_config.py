@@ -1,5 +1,10 @@
+import asyncio
 import cloudinary
 import cloudinary.uploader
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from tempfile import SpooledTemporaryFile
+from fastapi import HTTPException, UploadFile
 from cloudinary.utils import cloudinary_url
 from dotenv import load_dotenv
 from os import getenv
@@ -21,14 +26,51 @@ cloudinary.config(
     secure = True
 )
 
+# Avatar uploads: files are streamed in chunks, rejected once they exceed the size limit,
+# and handed to the blocking Cloudinary SDK on a bounded thread pool
+AVATAR_MAX_BYTES = int(getenv("AVATAR_MAX_BYTES", str(5 * 1024 * 1024)))
+AVATAR_CHUNK_SIZE = 64 * 1024
+AVATAR_UPLOAD_WORKERS = int(getenv("AVATAR_UPLOAD_WORKERS", "4"))
+
+_upload_executor = ThreadPoolExecutor(max_workers=AVATAR_UPLOAD_WORKERS, thread_name_prefix="cloudinary-upload")
+
+
+async def read_avatar(image_file: UploadFile, max_bytes: int = AVATAR_MAX_BYTES):
+    """
+    Copy an uploaded image into a spooled temporary file, chunk by chunk.
+
+    Small files stay in memory, larger ones spill to disk. Raises HTTP 415 for non-image
+    uploads and HTTP 413 as soon as more than `max_bytes` have been received.
+    The caller owns (and must close) the returned file.
+    """
+    if not (image_file.content_type or "").startswith("image/"):
+        raise HTTPException(status_code=415, detail="Avatar must be an image")
+    if image_file.size is not None and image_file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Avatar is larger than {max_bytes} bytes")
+
+    spooled = SpooledTemporaryFile(max_size=1024 * 1024)
+    received = 0
+    try:
+        while chunk := await image_file.read(AVATAR_CHUNK_SIZE):
+            received += len(chunk)
+            if received > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Avatar is larger than {max_bytes} bytes")
+            spooled.write(chunk)
+    except BaseException:
+        spooled.close()
+        raise
+    spooled.seek(0)
+    return spooled
+
 # Upload an image
 async def upload_avatar(image_file, email: str):
-    content = await image_file.read()
-    upload_result = cloudinary.uploader.upload(content, 
+    """Upload a file-like avatar to Cloudinary without blocking the event loop and return its URL."""
+    upload = partial(cloudinary.uploader.upload, image_file,
                                                folder="avatars/", 
                                                public_id = f"email {email} avatar", 
                                                overwrite = True, 
                                                transformation = [{"width": 300, "height": 300, "crop": "thumb", "gravity": "face"}])
+    upload_result = await asyncio.get_running_loop().run_in_executor(_upload_executor, upload)
     return upload_result['secure_url']
 
 
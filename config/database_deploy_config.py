@@ -28,7 +28,47 @@ DB_CONFIG_HOSTED = {
     "database": getenv("DBNAME")
 }
 
+# Connection pool sizing - shared by every query helper in data/database.py
+DB_POOL_CONFIG = {
+    "min_size": int(getenv("DB_POOL_MIN_SIZE", "2")),
+    "max_size": int(getenv("DB_POOL_MAX_SIZE", "10")),
+    "max_inactive_connection_lifetime": float(getenv("DB_POOL_MAX_INACTIVE_LIFETIME", "300")),
+}
+
+# Seconds to wait for a free pooled connection before giving up
+DB_POOL_ACQUIRE_TIMEOUT = float(getenv("DB_POOL_ACQUIRE_TIMEOUT", "10"))
+
+# Prepared statements kept per pooled connection (LRU). 0 disables named prepared statements
+# altogether (asyncpg's own cache is always off), which is required behind a transaction-mode
+# pooler such as the Supabase pooler on port 6543.
+DB_STATEMENT_CACHE_SIZE = int(getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+
+# Optional read replicas: comma separated DSNs, e.g. "postgresql://user:pw@replica1:5432/db,postgresql://..."
+DB_REPLICA_DSNS = [dsn.strip() for dsn in getenv("DB_REPLICA_DSNS", "").split(",") if dsn.strip()]
+
+# How reads pick a replica: "round_robin" or "least_busy" (fewest connections in use)
+DB_REPLICA_STRATEGY = getenv("DB_REPLICA_STRATEGY", "round_robin").lower()
+
+# In-process cache of course rows looked up by id (data/cache.py). Size 0 disables it.
+COURSE_CACHE_SIZE = int(getenv("COURSE_CACHE_SIZE", "1024"))
+COURSE_CACHE_TTL = float(getenv("COURSE_CACHE_TTL", "30"))
+
+# Queries slower than this many milliseconds (acquire wait + execution) are logged. 0 disables the log.
+DB_SLOW_QUERY_MS = float(getenv("DB_SLOW_QUERY_MS", "250"))
+
+# Rows fetched per round trip by the server-side cursors of stream_query (data/database.py)
+DB_STREAM_PREFETCH = int(getenv("DB_STREAM_PREFETCH", "500"))
+
+# Validate database rows against the full response models (data/mapping.py), e-mail syntax included
+STRICT_ROW_VALIDATION = getenv("STRICT_ROW_VALIDATION", "false").lower() == "true"
+
 # Connect details
 def connection_supabase() -> dict:
     return DB_CONFIG_HOSTED if getenv("USE_DEPLOYED_DB", "true").lower() == "true" else DB_CONFIG_LOCAL
 
+def pool_settings() -> dict:
+    return {**connection_supabase(), **DB_POOL_CONFIG}
+
+def replica_pool_settings() -> list[dict]:
+    return [{"dsn": dsn, **DB_POOL_CONFIG} for dsn in DB_REPLICA_DSNS]
+
@@ -8,6 +8,7 @@ from dotenv import load_dotenv
 from pydantic import EmailStr
 
 from data.models import TeacherResponse, StudentResponse, Course, CourseResponse, Action, Action_UserRole
+from services.email_service import enqueue_emails
 
 load_dotenv(dotenv_path=".env")
 
@@ -20,6 +21,16 @@ api_secret = getenv("MAILJET_SECRET")
 
 mailjet = Client(auth=(api_key, api_secret), version='v3.1')
 
+# Background delivery (services/email_service.py): messages are queued by the functions
+# below and sent by worker tasks in batches of up to 50 (Mailjet's per-call limit)
+EMAIL_DISPATCHER_CONFIG = {
+    "workers": int(getenv("EMAIL_WORKERS", "2")),
+    "batch_size": min(int(getenv("EMAIL_BATCH_SIZE", "50")), 50),
+    "max_attempts": int(getenv("EMAIL_MAX_ATTEMPTS", "5")),
+    "retry_base_delay": float(getenv("EMAIL_RETRY_BASE_DELAY", "2")),
+    "outbox": getenv("EMAIL_OUTBOX", "true").lower() == "true",
+}
+
 
 async def admin_teacher_aproval(teacher_data: TeacherResponse):
     URL = "http://127.0.0.1:8000/admins/teacher/" + f"{teacher_data.id}"
@@ -48,7 +59,7 @@ async def admin_teacher_aproval(teacher_data: TeacherResponse):
                     }
             ]
     }
-    result = mailjet.send.create(data=data)
+    await enqueue_emails(data['Messages'])
 
 
 async def course_deprecation_email(student_emails: list[str], course_data: CourseResponse):
@@ -78,19 +89,11 @@ async def course_deprecation_email(student_emails: list[str], course_data: Cours
         ]
     }
 
-    try:
-        response = mailjet.send.create(data=data)
-        return {
-            "status": "success",
-            "response_status_code": response.status_code,
-            "response_data": response.json() if hasattr(response, "json") else None
-        }
-    except Exception as e:
-        # logging.exception(f"Failed to send batch course deprecation email: {e}")
-        return {
-            "status": "failed",
-            "error": str(e)
-        }
+    queued = await enqueue_emails(data['Messages'])
+    return {
+        "status": "queued",
+        "messages": queued
+    }
 
 
 
@@ -121,7 +124,7 @@ async def teacher_verify_email(teacher_data: TeacherResponse, teacher_id):
                     }
             ]
     }
-    result = mailjet.send.create(data=data)
+    await enqueue_emails(data['Messages'])
 
 
 
@@ -159,8 +162,8 @@ async def teacher_approve_enrollment(teacher_data: TeacherResponse, student_data
                     }
             ]
     }
-    result = mailjet.send.create(data=data)
-    
+    await enqueue_emails(data['Messages'])
+
 
 async def notify_user_for_account_state(action: Action, role: Action_UserRole, user_email: str):
         data = {
@@ -187,5 +190,5 @@ async def notify_user_for_account_state(action: Action, role: Action_UserRole, u
                         }
                 ]
         }
-        result = mailjet.send.create(data=data)
+        await enqueue_emails(data['Messages'])
 
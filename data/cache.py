@@ -0,0 +1,124 @@
+"""
+In-process async cache for hot, rarely changing rows (e.g. a course looked up by id
+several times per request).
+
+Entries expire after a TTL and the least recently used entry is evicted once the
+cache is full. Concurrent misses for the same key share one loader call
+(single-flight), so a burst of requests for an uncached course issues one query; if
+the caller running it is cancelled, a waiting caller takes the load over.
+Writers call `invalidate` after changing a row; a load that was already in flight
+when the key was invalidated is returned to its callers but not stored. Inside a
+transaction the key is dropped again after commit, so a concurrent reader cannot
+re-cache the row as it was before the write.
+"""
+
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+from config.database_deploy_config import COURSE_CACHE_SIZE, COURSE_CACHE_TTL
+from data.database import after_transaction
+
+
+class AsyncTTLCache:
+    """LRU + TTL cache with single-flight loading. Misses (None results) are cached too."""
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        # Keys invalidated while a load for them was in flight
+        self._stale: set[Hashable] = set()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, calling loader() at most once across concurrent misses."""
+        if not self.enabled:
+            return await loader()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        while (pending := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Only the caller running the load was cancelled, not this one: load it here instead
+                if not pending.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception retrieved when no other caller was waiting for it
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            invalidated = key in self._stale
+            self._stale.discard(key)
+
+        future.set_result(value)
+        if not invalidated:
+            self._store(key, value)
+        return value
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Drop key and keep any load already in flight for it from being stored."""
+        self._entries.pop(key, None)
+        if key in self._inflight:
+            self._stale.add(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._stale.update(self._inflight)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Course rows by id, shared by repositories/course_repo.py and every repository that writes v1.courses
+course_cache = AsyncTTLCache("course", COURSE_CACHE_SIZE, COURSE_CACHE_TTL)
+
+def invalidate_course(course_id: int):
+    """Drop a course from the cache now and again once the surrounding transaction ends."""
+    course_cache.invalidate(course_id)
+    after_transaction(lambda: course_cache.invalidate(course_id))
@@ -1,54 +1,496 @@
 """
 Database helper functions for executing SQL queries using asyncpg.
-Each function opens a connection, runs the query, and closes the connection.
+Every helper borrows a connection from a process-wide pool and returns it afterwards.
+The pool is opened on application startup and closed on shutdown (see main.py).
+
+Inside a `unit_of_work(transaction=True)` block all helpers share a single connection
+wrapped in one transaction. Other queries, including those of a plain `unit_of_work()`
+(such as the `request_scope` of every request), borrow a connection per query, so a
+request holds none while it awaits anything other than the database.
+
+Positional-parameter queries run as prepared statements cached per pooled connection,
+so Postgres parses and plans each distinct SQL text once per connection.
+
+When replica DSNs are configured, read_query and query_count go to a replica while
+insert_query and update_query go to the primary. After a write, or inside a
+transactional unit of work, reads in the same scope go to the primary so a
+request always sees its own writes.
+
+Unbounded results are read with `stream_query`, which walks a server-side cursor on a
+connection of its own and yields rows as they arrive.
+
+Every query is timed (connection wait, execution, row count) and recorded in the
+Prometheus metrics of common/metrics.py, labelled with the repository function that
+issued it. Queries slower than DB_SLOW_QUERY_MS are also logged, and `count_queries()`
+tallies the queries of a block such as one HTTP request.
 """
 
 
+import asyncio
 import asyncpg
-from typing import Any, Sequence, Union
-from config.database_deploy_config import connection_supabase
-from os import getenv
-from dotenv import load_dotenv
+import itertools
+import logging
+import sys
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from contextvars import ContextVar
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Optional, Sequence, Union
+from config.database_deploy_config import (
+    pool_settings,
+    replica_pool_settings,
+    DB_POOL_ACQUIRE_TIMEOUT,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_REPLICA_STRATEGY,
+    DB_SLOW_QUERY_MS,
+    DB_STREAM_PREFETCH,
+)
+from common.metrics import DB_ACQUIRE_SECONDS, DB_QUERY_ERRORS, DB_QUERY_ROWS, DB_QUERY_SECONDS
 
 
-async def _get_connection()-> asyncpg.Connection:
-    """Open a new asyncpg connection using Supabase or Local configuration."""
-    return await asyncpg.connect(**connection_supabase())
+logger = logging.getLogger(__name__)
 
-async def read_query(sql: str, sql_params: Union[Sequence[Any], dict] = ()):
-    """Execute a SELECT query and return all rows."""
-    conn = await _get_connection()
+
+_pool: Optional[asyncpg.Pool] = None
+_replica_pools: list[asyncpg.Pool] = []
+_replica_turn = itertools.count()
+_pool_lock = asyncio.Lock()
+
+# Process-wide counters for the prepared statement caches of all pooled connections
+statement_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+class StatementCache:
+    """
+    LRU of prepared statements for one connection, keyed by the SQL text.
+
+    Queries built with f-strings (e.g. a dynamic ORDER BY) are cached per rendered
+    variant, since each variant is a distinct SQL text. Evicted statements are
+    deallocated by asyncpg once nothing references them.
+    """
+
+    def __init__(self, connection: asyncpg.Connection, size: int):
+        self._connection = connection
+        self._size = size
+        self._statements: OrderedDict[str, asyncpg.prepared_stmt.PreparedStatement] = OrderedDict()
+
+    async def get(self, sql: str):
+        statement = self._statements.get(sql)
+        if statement is not None:
+            self._statements.move_to_end(sql)
+            statement_cache_stats["hits"] += 1
+            return statement
+
+        statement_cache_stats["misses"] += 1
+        statement = await self._connection.prepare(sql)
+        self._statements[sql] = statement
+        if len(self._statements) > self._size:
+            self._statements.popitem(last=False)
+            statement_cache_stats["evictions"] += 1
+        return statement
+
+    def discard(self, sql: str):
+        self._statements.pop(sql, None)
+
+    def __len__(self):
+        return len(self._statements)
+
+
+class CachedStatementConnection(asyncpg.Connection):
+    """Pooled connection carrying its own prepared statement cache."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statement_cache = StatementCache(self, DB_STATEMENT_CACHE_SIZE) if DB_STATEMENT_CACHE_SIZE > 0 else None
+
+
+# asyncpg's own statement cache is off: StatementCache is the only layer of named prepared
+# statements, so DB_STATEMENT_CACHE_SIZE=0 leaves only unnamed ones, as a transaction-mode
+# pooler requires
+_CONNECTION_OPTIONS = {"connection_class": CachedStatementConnection, "statement_cache_size": 0}
+
+
+async def init_pool() -> asyncpg.Pool:
+    """Create the shared primary pool and one pool per configured replica. Safe to call more than once."""
+    global _pool, _replica_pools
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await asyncpg.create_pool(**pool_settings(), **_CONNECTION_OPTIONS)
+            _replica_pools = [
+                await asyncpg.create_pool(**settings, **_CONNECTION_OPTIONS)
+                for settings in replica_pool_settings()
+            ]
+    return _pool
+
+async def close_pool():
+    """Close the shared pools, waiting for borrowed connections to be released."""
+    global _pool, _replica_pools
+    if _pool is not None:
+        pools = [_pool, *_replica_pools]
+        _pool, _replica_pools = None, []
+        for pool in pools:
+            await pool.close()
+
+async def _get_pool() -> asyncpg.Pool:
+    """Return the shared pool, creating it lazily for scripts that run outside the app lifespan."""
+    return _pool if _pool is not None else await init_pool()
+
+def _pick_replica() -> Optional[asyncpg.Pool]:
+    """Choose the replica pool serving the next read, or None when no replicas are configured."""
+    if not _replica_pools:
+        return None
+    if DB_REPLICA_STRATEGY == "least_busy":
+        return min(_replica_pools, key=lambda pool: pool.get_size() - pool.get_idle_size())
+    return _replica_pools[next(_replica_turn) % len(_replica_pools)]
+
+class _Scope:
+    """
+    State shared by the query helpers awaited inside one unit of work.
+
+    Every scope tracks whether it has written, to keep its reads on the primary. Only a
+    transactional scope (and the scopes nested in it) pins a connection: it is borrowed
+    lazily on the first query, so scopes that never touch the database (or whose
+    repositories are mocked in tests) cost nothing, and held until the scope closes.
+    A nested transactional scope opens a savepoint on its parent's connection, or
+    borrows a connection of its own under a non-transactional parent.
+    """
+
+    def __init__(self, transaction: bool, parent: Optional["_Scope"] = None):
+        self.transaction = transaction
+        self.parent = parent
+        self.connection: Optional[asyncpg.Connection] = None
+        self.has_written = False
+        self._transaction = None
+        self._pool: Optional[asyncpg.Pool] = None
+        self.on_close: list[Callable[[], None]] = []
+
+    @property
+    def reads_from_primary(self) -> bool:
+        """Read-your-writes: once the scope has written or is transactional, reads stay on its connection."""
+        if self.transaction or self.has_written:
+            return True
+        return self.parent is not None and self.parent.reads_from_primary
+
+    @property
+    def pinned(self) -> bool:
+        """Whether queries run on the scope's own connection rather than one borrowed per query."""
+        return self.transaction or (self.parent is not None and self.parent.pinned)
+
+    def mark_written(self):
+        scope = self
+        while scope is not None:
+            scope.has_written = True
+            scope = scope.parent
+
+    async def acquire(self) -> asyncpg.Connection:
+        if self.connection is None:
+            if self.parent is not None and self.parent.pinned:
+                connection = await self.parent.acquire()
+            else:
+                self._pool = await _get_pool()
+                connection = await self._pool.acquire(timeout=DB_POOL_ACQUIRE_TIMEOUT)
+            self.connection = connection
+            if self.transaction:
+                self._transaction = connection.transaction()
+                await self._transaction.start()
+        return self.connection
+
+    async def close(self, failed: bool):
+        try:
+            if self.connection is None:
+                return
+            try:
+                if self._transaction is not None:
+                    await (self._transaction.rollback() if failed else self._transaction.commit())
+            finally:
+                if self._pool is not None:
+                    await self._pool.release(self.connection)
+                self.connection = None
+                self._transaction = None
+                self._pool = None
+        finally:
+            callbacks, self.on_close = self.on_close, []
+            for callback in callbacks:
+                callback()
+
+
+_current_scope: ContextVar[Optional[_Scope]] = ContextVar("db_scope", default=None)
+
+
+@asynccontextmanager
+async def unit_of_work(transaction: bool = False):
+    """
+    Group the query helpers awaited inside the block.
+
+    With transaction=True they all run on one pooled connection and the block is atomic:
+    it commits on normal exit and rolls back when an exception escapes. Queries must then
+    be awaited one at a time, as a single asyncpg connection cannot run statements
+    concurrently. Without a transaction each query borrows a connection of its own; the
+    block only keeps reads after a write on the primary.
+    """
+    scope = _Scope(transaction, parent=_current_scope.get())
+    token = _current_scope.set(scope)
+    failed = False
     try:
+        yield scope
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        _current_scope.reset(token)
+        await scope.close(failed)
+
+def after_transaction(callback: Callable[[], None]):
+    """
+    Call callback once the outermost transactional unit of work around the caller has
+    ended (committed or rolled back), or right away outside of a transaction.
+
+    Used to drop in-process caches only after other connections can see the write.
+    """
+    outermost = None
+    scope = _current_scope.get()
+    while scope is not None:
+        if scope.transaction:
+            outermost = scope
+        scope = scope.parent
+    if outermost is None:
+        callback()
+    else:
+        outermost.on_close.append(callback)
+
+async def request_scope():
+    """FastAPI dependency giving each request a unit of work, so it reads its own writes; no connection is held."""
+    async with unit_of_work():
+        yield
+
+@asynccontextmanager
+async def _acquire(read: bool = False):
+    """
+    Yield the connection a query should run on, waiting at most DB_POOL_ACQUIRE_TIMEOUT
+    seconds for a pooled one.
+
+    Queries inside a transactional unit of work use its connection. Otherwise writes
+    borrow from the primary pool, and reads from a replica unless the active unit of
+    work has to see its own writes.
+    """
+    scope = _current_scope.get()
+    if scope is not None and not read:
+        scope.mark_written()
+    if scope is not None and scope.pinned:
+        yield await scope.acquire()
+        return
+
+    replica = _pick_replica() if read and (scope is None or not scope.reads_from_primary) else None
+    pool = replica or await _get_pool()
+    async with pool.acquire(timeout=DB_POOL_ACQUIRE_TIMEOUT) as conn:
+        yield conn
+
+async def _run_prepared(cache: StatementCache, method: str, sql: str, sql_params: Sequence[Any]):
+    statement = await cache.get(sql)
+    if method == "execute":
+        await statement.fetch(*sql_params)
+        return statement.get_statusmsg()
+    return await getattr(statement, method)(*sql_params)
+
+async def _run(conn, method: str, sql: str, sql_params: Union[Sequence[Any], dict]):
+    """Run sql with conn.<method>, through the connection's prepared statement cache when possible."""
+    cache = getattr(conn, "statement_cache", None)
+    if cache is None or not isinstance(sql_params, (list, tuple)):
+        run = getattr(conn, method)
         # When parameters are not list, tuple, pass a dictionary
-        return await conn.fetch(sql, *sql_params) if isinstance(sql_params, (list, tuple)) else await conn.fetch(sql, **sql_params)
+        return await run(sql, *sql_params) if isinstance(sql_params, (list, tuple)) else await run(sql, **sql_params)
+
+    try:
+        return await _run_prepared(cache, method, sql, sql_params)
+    except asyncpg.exceptions.InvalidCachedStatementError:
+        # The schema changed under a cached plan - prepare it again, unless a transaction is already aborted
+        cache.discard(sql)
+        if conn.is_in_transaction():
+            raise
+        return await _run_prepared(cache, method, sql, sql_params)
+
+@dataclass
+class QueryTally:
+    """Queries issued inside a `count_queries()` block, and the seconds spent on them (wait + execution)."""
+    count: int = 0
+    seconds: float = 0.0
+
+
+_query_tally: ContextVar[Optional[QueryTally]] = ContextVar("db_query_tally", default=None)
+
+
+@contextmanager
+def count_queries():
+    """Count the queries awaited inside the block, e.g. all queries of one HTTP request."""
+    tally = QueryTally()
+    token = _query_tally.set(tally)
+    try:
+        yield tally
     finally:
-        await conn.close()
+        _query_tally.reset(token)
+
+def _caller_name() -> str:
+    """
+    Name of the repository function issuing the current query, e.g. "get_course_by_id_repo".
+
+    Walks up to the first frame in a `repositories` module; nested functions (such as a
+    cache loader) count as their enclosing function. Queries issued from anywhere else are
+    labelled with the first caller outside this module.
+    """
+    frame = sys._getframe(1)
+    fallback = nested = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("repositories."):
+            name = _function_name(frame)
+            # Without co_qualname (Python < 3.11) nested functions are recognised by not being module attributes
+            if hasattr(frame.f_code, "co_qualname") or getattr(frame.f_globals.get(name), "__code__", None) is frame.f_code:
+                return name
+            nested = nested or name
+        elif fallback is None and module != __name__:
+            fallback = _function_name(frame)
+        frame = frame.f_back
+    return nested or fallback or "unknown"
+
+def _function_name(frame) -> str:
+    code = frame.f_code
+    return getattr(code, "co_qualname", code.co_name).split(".<locals>", 1)[0]
+
+def _row_count(result) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, str):
+        # Status of conn.execute, e.g. "UPDATE 3" or "INSERT 0 1"
+        count = result.rsplit(" ", 1)[-1]
+        return int(count) if count.isdigit() else 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+def _record_query(function: str, helper: str, sql: str, acquire_seconds: float, seconds: float, rows: int):
+    DB_ACQUIRE_SECONDS.labels(function).observe(acquire_seconds)
+    DB_QUERY_SECONDS.labels(function, helper).observe(seconds)
+    DB_QUERY_ROWS.labels(function).observe(rows)
+
+    tally = _query_tally.get()
+    if tally is not None:
+        tally.count += 1
+        tally.seconds += acquire_seconds + seconds
+
+    total_ms = (acquire_seconds + seconds) * 1000
+    if 0 < DB_SLOW_QUERY_MS <= total_ms:
+        logger.warning(
+            "Slow query in %s: %.1f ms (%.1f ms waiting for a connection), %d rows: %s",
+            function, total_ms, acquire_seconds * 1000, rows, " ".join(sql.split())[:500],
+        )
+
+async def _timed(helper: str, sql: str, run: Callable[[asyncpg.Connection], Awaitable[Any]], read: bool = False):
+    """Await run(conn) on the connection _acquire hands out, recording its timings under sql."""
+    function = _caller_name()
+    queued_at = time.perf_counter()
+    try:
+        async with _acquire(read=read) as conn:
+            started = time.perf_counter()
+            result = await run(conn)
+            finished = time.perf_counter()
+    except Exception:
+        DB_QUERY_ERRORS.labels(function).inc()
+        raise
+    _record_query(function, helper, sql, started - queued_at, finished - started, _row_count(result))
+    return result
+
+async def _execute(helper: str, method: str, sql: str, sql_params: Union[Sequence[Any], dict], read: bool = False):
+    """Run one query through _acquire and _run, recording its timings."""
+    return await _timed(helper, sql, lambda conn: _run(conn, method, sql, sql_params), read=read)
+
+async def read_query(sql: str, sql_params: Union[Sequence[Any], dict] = ()):
+    """Execute a SELECT query and return all rows."""
+    return await _execute("read_query", "fetch", sql, sql_params, read=True)
 
 async def insert_query(sql: str, sql_params: Union[Sequence[Any], dict] = ()):
     """Execute an INSERT query and return the first column of the first row (e.g., inserted ID)."""
-    conn = await _get_connection()
-    try:
-        result = await conn.fetchrow(sql, *sql_params) if isinstance(sql_params, (list, tuple)) else await conn.fetchrow(sql, **sql_params)
-        return result[0] if result else None
-    finally:
-        await conn.close()
+    result = await _execute("insert_query", "fetchrow", sql, sql_params)
+    return result[0] if result else None
+
+async def insert_returning_query(sql: str, sql_params: Union[Sequence[Any], dict] = ()):
+    """Execute a data-modifying query (e.g. INSERT ... RETURNING) on the primary and return its first row."""
+    return await _execute("insert_returning_query", "fetchrow", sql, sql_params)
+
+async def insert_returning_rows_query(sql: str, sql_params: Union[Sequence[Any], dict] = ()):
+    """Execute a data-modifying query that returns rows (e.g. a multi-row INSERT ... RETURNING) on the primary."""
+    return await _execute("insert_returning_rows_query", "fetch", sql, sql_params)
 
 async def update_query(sql: str, sql_params: Union[Sequence[Any], dict] = ()) -> int:
     """Execute an UPDATE query and return the number of affected rows."""
-    conn = await _get_connection()
-    try:
-        result = await conn.execute(sql, *sql_params) if isinstance(sql_params, (list, tuple)) else await conn.execute(sql, **sql_params)
-        # The result is a string like "UPDATE 1" — extract the row count
-        return int(result.split()[-1])
-    finally:
-        await conn.close()
+    result = await _execute("update_query", "execute", sql, sql_params)
+    # The result is a string like "UPDATE 1" — extract the row count
+    return int(result.split()[-1])
 
 async def query_count(sql: str, sql_params: Union[Sequence[Any], dict] = ()) -> int:
     """Execute a COUNT query and return the count as an integer."""
-    conn = await _get_connection()
+    result = await _execute("query_count", "fetchrow", sql, sql_params, read=True)
+    return result[0] if result else 0
+
+
+async def stream_query(sql: str, sql_params: Sequence[Any] = (), prefetch: Optional[int] = None) -> AsyncIterator[asyncpg.Record]:
+    """
+    Execute a SELECT query through a server-side cursor and yield its rows one at a time.
+
+    Rows are fetched `prefetch` (default DB_STREAM_PREFETCH) at a time, so memory stays flat
+    however large the result is. The cursor lives in a read-only transaction on a connection
+    borrowed for the whole iteration, independently of any unit of work: the iteration may
+    outlive the request scope (e.g. in a StreamingResponse), and it does not see the
+    uncommitted writes of an enclosing transaction. Stopping early (aclose, cancellation)
+    closes the cursor and returns the connection.
+
+    The recorded duration is the time spent waiting on the database, not on the consumer.
+    """
+    function = _caller_name()
+    scope = _current_scope.get()
+    replica = _pick_replica() if scope is None or not scope.reads_from_primary else None
+    pool = replica or await _get_pool()
+    prefetch = prefetch or DB_STREAM_PREFETCH
+
+    queued_at = time.perf_counter()
+    acquire_seconds, seconds, rows = None, 0.0, 0
+    failed = False
     try:
-        result = await conn.fetchrow(sql, *sql_params) if isinstance(sql_params, (list, tuple)) else await conn.fetchrow(sql, **sql_params)
-        return result[0] if result else 0
+        async with pool.acquire(timeout=DB_POOL_ACQUIRE_TIMEOUT) as conn:
+            acquire_seconds = time.perf_counter() - queued_at
+            async with conn.transaction(readonly=True):
+                cursor = conn.cursor(sql, *sql_params, prefetch=prefetch).__aiter__()
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        row = await cursor.__anext__()
+                    except StopAsyncIteration:
+                        seconds += time.perf_counter() - started
+                        break
+                    seconds += time.perf_counter() - started
+                    rows += 1
+                    yield row
+    except Exception:
+        failed = True
+        DB_QUERY_ERRORS.labels(function).inc()
+        raise
     finally:
-        await conn.close()
+        # Also record iterations the consumer stopped early
+        if not failed and acquire_seconds is not None:
+            _record_query(function, "stream_query", sql, acquire_seconds, seconds, rows)
+
+async def copy_records_query(table: str, columns: Sequence[str], records: Union[Iterable[tuple], AsyncIterable[tuple]],
+                             schema: str = "v1") -> int:
+    """
+    Bulk load records into schema.table with a binary COPY on the primary and return the number of rows copied.
 
+    records may be an async iterable, so rows can be produced (e.g. parsed from a request body) while they
+    are copied. An exception raised by the iterable aborts the COPY and propagates; inside a transactional
+    unit of work nothing of it is kept.
+    """
+    sql = f"COPY {schema}.{table} ({', '.join(columns)}) FROM STDIN (FORMAT binary)"
+    result = await _timed(
+        "copy_records_query", sql,
+        lambda conn: conn.copy_records_to_table(table, schema_name=schema, columns=list(columns), records=records),
+    )
+    return _row_count(result)
@@ -0,0 +1,85 @@
+"""
+Conversion of database rows into response models.
+
+Rows read from our own tables already satisfy the response models of data/models.py:
+e-mails were validated when they were written. Re-checking EmailStr on every read is
+most of the cost of building those models (about 100 us per row, against ~2 us for all
+other fields together), so rows are validated against a *trusted twin* of each model
+instead: a subclass in which EmailStr fields are plain str. Everything else - types,
+aliases, Decimal to float coercion, defaults, serializers - behaves as in the model, and
+lists go through one TypeAdapter call instead of one constructor call per row.
+
+`model_construct` would skip validation entirely, but it runs in Python and measures
+slower than the batch validation; see benchmarks/row_mapping.py.
+
+With STRICT_ROW_VALIDATION=true rows are validated against the models themselves
+(e-mail syntax included). Use it in development and CI.
+
+Only use these for rows from the database; request bodies and other untrusted input
+must keep going through normal validation.
+"""
+
+
+import types
+import typing
+from copy import copy
+from functools import lru_cache
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Mapping, Optional, TypeVar
+from pydantic import BaseModel, EmailStr, TypeAdapter, create_model
+from config.database_deploy_config import STRICT_ROW_VALIDATION
+
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+def _trust(annotation: Any) -> Any:
+    """annotation with EmailStr replaced by str, e.g. Optional[EmailStr] -> Optional[str]."""
+    if annotation is EmailStr:
+        return str
+    args = typing.get_args(annotation)
+    trusted = tuple(_trust(arg) for arg in args)
+    if trusted == args:
+        return annotation
+    origin = typing.get_origin(annotation)
+    if origin in (typing.Union, types.UnionType):
+        return typing.Union[trusted]
+    return origin[trusted]
+
+@lru_cache(maxsize=None)
+def trusted_model(model: type[Model]) -> type[Model]:
+    """The trusted twin of model: a subclass validating EmailStr fields as str (model itself if it has none)."""
+    fields = {}
+    for name, field in model.model_fields.items():
+        annotation = _trust(field.annotation)
+        if annotation != field.annotation:
+            field = copy(field)
+            field.annotation = annotation
+            fields[name] = (annotation, field)
+    if not fields:
+        return model
+    return create_model(model.__name__, __base__=model, __module__=model.__module__, **fields)
+
+def _row_model(model: type[Model]) -> type[Model]:
+    return model if STRICT_ROW_VALIDATION else trusted_model(model)
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+def to_model(model: type[Model], row: Optional[Mapping]) -> Optional[Model]:
+    """Build model from one database row (a Record or dict), or return None for a missing row."""
+    if row is None:
+        return None
+    return _row_model(model).model_validate(dict(row))
+
+def to_models(model: type[Model], rows: Optional[Iterable[Mapping]]) -> list[Model]:
+    """Build a list of model from database rows in one validation call; None (no rows) gives an empty list."""
+    if not rows:
+        return []
+    return _list_adapter(_row_model(model)).validate_python([dict(row) for row in rows])
+
+async def to_model_stream(model: type[Model], rows: AsyncIterable[Mapping]) -> AsyncIterator[Model]:
+    """Map streamed rows (e.g. of stream_query) to model one at a time."""
+    validate = _row_model(model).model_validate
+    async for row in rows:
+        yield validate(dict(row))
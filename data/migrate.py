@@ -0,0 +1,153 @@
+"""
+Applies the numbered SQL migrations in docs/db_migrations to the configured database.
+
+Migrations are the files named migrationNNN.sql, applied in order of NNN. Each one runs
+in a single transaction together with its row in v1.schema_migrations, so a migration
+that fails leaves nothing behind and is retried on the next run. The unnumbered scripts
+(migration.sql, "migration 0001.sql", ...) are full pgAdmin schema dumps, not migrations.
+
+    python -m data.migrate                  apply pending migrations
+    python -m data.migrate --status         list applied and pending migrations
+    python -m data.migrate --baseline 12    record migrations up to 012 as applied
+                                            without running them
+
+Use --baseline once on databases that were migrated by hand before this runner existed.
+"""
+
+
+import argparse
+import asyncio
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+import asyncpg
+from config.database_deploy_config import connection_supabase
+
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "docs" / "db_migrations"
+
+_MIGRATION_FILE = re.compile(r"^migration(\d{3})\.sql$")
+
+# Session-level advisory lock, so two deploys never apply migrations at the same time
+_MIGRATION_LOCK_ID = 7_316_004_013
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    path: Path
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    def read(self) -> tuple[str, str]:
+        """Return the SQL of the migration and its SHA-256 checksum."""
+        content = self.path.read_bytes()
+        return content.decode("utf-8"), hashlib.sha256(content).hexdigest()
+
+
+def discover_migrations(directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    """Return the numbered migrations in directory, ordered by version."""
+    migrations = []
+    for path in directory.iterdir():
+        match = _MIGRATION_FILE.match(path.name)
+        if match:
+            migrations.append(Migration(int(match.group(1)), path))
+    return sorted(migrations, key=lambda migration: migration.version)
+
+async def ensure_migrations_table(conn: asyncpg.Connection):
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS v1.schema_migrations
+        (
+            version integer NOT NULL,
+            name text NOT NULL,
+            checksum text NOT NULL,
+            applied_on timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT schema_migrations_pkey PRIMARY KEY (version)
+        )
+    """)
+
+async def applied_migrations(conn: asyncpg.Connection) -> dict[int, str]:
+    """Return the checksum of every applied migration, keyed by version."""
+    rows = await conn.fetch("SELECT version, checksum FROM v1.schema_migrations")
+    return {row["version"]: row["checksum"] for row in rows}
+
+async def apply_pending(conn: asyncpg.Connection, migrations: list[Migration]) -> list[Migration]:
+    """
+    Apply every migration not yet recorded in v1.schema_migrations, in version order.
+
+    :param conn: Connection to the primary database.
+    :param migrations: All known migrations, as returned by `discover_migrations`.
+    :return: The migrations that were applied.
+    """
+    applied = await applied_migrations(conn)
+    pending = []
+    for migration in migrations:
+        sql, checksum = migration.read()
+        if migration.version not in applied:
+            pending.append((migration, sql, checksum))
+        elif applied[migration.version] != checksum:
+            print(f"warning: {migration.name} changed after it was applied")
+
+    for migration, sql, checksum in pending:
+        async with conn.transaction():
+            await conn.execute(sql)
+            await conn.execute(
+                "INSERT INTO v1.schema_migrations (version, name, checksum) VALUES ($1, $2, $3)",
+                migration.version, migration.name, checksum,
+            )
+        print(f"applied {migration.name}")
+    return [migration for migration, _, _ in pending]
+
+async def baseline(conn: asyncpg.Connection, migrations: list[Migration], up_to: int) -> list[Migration]:
+    """
+    Record migrations up to version up_to as applied without running them.
+
+    :return: The migrations that were newly recorded.
+    """
+    applied = await applied_migrations(conn)
+    recorded = []
+    for migration in migrations:
+        if migration.version > up_to or migration.version in applied:
+            continue
+        _, checksum = migration.read()
+        await conn.execute(
+            "INSERT INTO v1.schema_migrations (version, name, checksum) VALUES ($1, $2, $3)",
+            migration.version, migration.name, checksum,
+        )
+        recorded.append(migration)
+    return recorded
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m data.migrate", description="Apply database migrations.")
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations and exit")
+    parser.add_argument("--baseline", type=int, metavar="VERSION",
+                        help="record migrations up to VERSION as applied without running them")
+    parser.add_argument("--dir", type=Path, default=MIGRATIONS_DIR, help="directory holding the migrations")
+    args = parser.parse_args(argv)
+
+    migrations = discover_migrations(args.dir)
+    # No prepared statement cache, so this also works through a transaction-mode pooler
+    conn = await asyncpg.connect(**connection_supabase(), statement_cache_size=0)
+    try:
+        await conn.execute("SELECT pg_advisory_lock($1)", _MIGRATION_LOCK_ID)
+        await ensure_migrations_table(conn)
+
+        if args.status:
+            applied = await applied_migrations(conn)
+            for migration in migrations:
+                print(f"{'applied' if migration.version in applied else 'pending':8} {migration.name}")
+        elif args.baseline is not None:
+            for migration in await baseline(conn, migrations, args.baseline):
+                print(f"recorded {migration.name}")
+        elif not await apply_pending(conn, migrations):
+            print("database is up to date")
+    finally:
+        # Closing the session also releases the advisory lock
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
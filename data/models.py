@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, EmailStr, field_serializer, field_validator
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Annotated, Literal, Optional
 from enum import Enum
 from fastapi import Query
@@ -158,6 +158,9 @@ class SectionOut(Section):
     id: int
     course_id: int
 
+class SectionCompletionBatch(BaseModel):
+    section_ids: list[int] = Field(min_length=1, max_length=500, description="IDs of the sections to mark as completed")
+
 class SectionUpdate(BaseModel):
     title: Optional[str] = Field(default=None, example="New section title")
     content:  Optional[str] = Field(default=None, example="New content")
@@ -246,6 +249,7 @@ class EnrollmentResponse(BaseModel):
 # e.student_id, s.email, s.first_name, s.last_name,
 # e.course_id, c.title, e.requested_at, e.approved_at, e.completed_at, e.drop_out, c.created_on
 class EnrollmentReport(BaseModel):
+    enrollment_id: Optional[int] = None
     student_id: int
     email: EmailStr
     first_name: Name | None
@@ -282,9 +286,11 @@ class CourseFilterBase(BaseModel):
     tag: Optional[str] = Field(default="", description="Filter by course tag")
     order: SortOrder = Field(default=SortOrder.asc, description="Sort order: asc or desc")
     limit: int = Field(default=10, ge=1, le=100)
-    offset: int = Field(default=0, ge=0)    
+    offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = Field(default=None, description="Token from the X-Next-Cursor header of the previous page. Takes precedence over offset")
 class CourseFilterOptions(CourseFilterBase):
     sort_by: CourseSortField = Field(default=CourseSortField.title, description="Sort by title, rating, or created_on")
+    search: Optional[str] = Field(default=None, description="Full-text search over title, description and tags, ranked by relevance")
 
 class TeacherCourseFilter(CourseFilterBase):
     sort_by: TeacherSortField = Field(default=TeacherSortField.created_on, description="Sort by created_on or title")
@@ -292,12 +298,40 @@ class TeacherCourseFilter(CourseFilterBase):
 class StudentCourseFilter(CourseFilterBase):
     sort_by: StudentSortField = Field(default=StudentSortField.approved_at, description="Sort by approved_at or title")
 
+class EnrollmentStatus(str, Enum):
+    pending = "pending"
+    active = "active"
+    completed = "completed"
+    dropped = "dropped"
+
+class ReportFormat(str, Enum):
+    json = "json"
+    csv = "csv"
+    ndjson = "ndjson"
+
+class EnrollmentReportFilter(BaseModel):
+    course_id: Optional[int] = Field(default=None, description="Only enrollments in this course")
+    status: Optional[EnrollmentStatus] = Field(default=None, description="pending (not approved), active, completed or dropped")
+    requested_from: Optional[datetime] = Field(default=None, description="Only enrollments requested at or after this time")
+    requested_to: Optional[datetime] = Field(default=None, description="Only enrollments requested before this time")
+    format: ReportFormat = Field(default=ReportFormat.json, description="json: one page; csv or ndjson: the whole report as a download")
+    limit: int = Field(default=100, ge=1, le=1000, description="Enrollments per page (json only)")
+    cursor: Optional[str] = Field(default=None, description="Token from the X-Next-Cursor header of the previous page (json only)")
+
+    @field_validator('requested_from', 'requested_to')
+    def assume_utc(cls, value):
+        # Times without an offset are UTC, so both bounds compare (and bind to timestamptz) alike
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
 class AdminCourseFilterOptions(BaseModel):
     title: Optional[str] = Field(default="", description="Filter by course title")
     teacher_id: Optional[int] = Field(default=None, description="Filter by teacher ID")
     student_id: Optional[int] = Field(default=None, description="Filter by student ID")
     limit: int = Field(default=5, ge=1, le=100, description="Number of items per page")
     offset: int = Field(default=0, ge=0, description="Pagination offset")
+    cursor: Optional[str] = Field(default=None, description="Token from the X-Next-Cursor header of the previous page. Takes precedence over offset")
 
 
 
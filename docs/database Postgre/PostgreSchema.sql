@@ -21,6 +21,15 @@ CREATE TABLE IF NOT EXISTS v1.course_rating
     CONSTRAINT unique_student_course UNIQUE (students_id, courses_id)
 );
 
+CREATE TABLE IF NOT EXISTS v1.course_rating_summary
+(
+    course_id integer NOT NULL,
+    rating_count integer NOT NULL DEFAULT 0,
+    rating_sum integer NOT NULL DEFAULT 0,
+    average_rating numeric(3, 1) GENERATED ALWAYS AS (ROUND(rating_sum::numeric / NULLIF(rating_count, 0), 1)) STORED,
+    CONSTRAINT course_rating_summary_pkey PRIMARY KEY (course_id)
+);
+
 CREATE TABLE IF NOT EXISTS v1.course_sections
 (
     id serial NOT NULL,
@@ -33,6 +42,13 @@ CREATE TABLE IF NOT EXISTS v1.course_sections
     CONSTRAINT section_title UNIQUE (title)
 );
 
+CREATE TABLE IF NOT EXISTS v1.course_tags
+(
+    course_id integer NOT NULL,
+    tag_id integer NOT NULL,
+    CONSTRAINT course_tags_pkey PRIMARY KEY (tag_id, course_id)
+);
+
 CREATE TABLE IF NOT EXISTS v1.courses
 (
     id serial NOT NULL,
@@ -44,10 +60,29 @@ CREATE TABLE IF NOT EXISTS v1.courses
     owner_id integer NOT NULL,
     is_hidden boolean NOT NULL DEFAULT false,
     created_on timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', replace(coalesce(tags, ''), ',', ' ')), 'C')
+    ) STORED,
     CONSTRAINT courses_key PRIMARY KEY (id),
     CONSTRAINT course_title_key UNIQUE (title)
 );
 
+CREATE TABLE IF NOT EXISTS v1.email_outbox
+(
+    id bigserial NOT NULL,
+    payload jsonb NOT NULL,
+    status character varying(10) COLLATE pg_catalog."default" NOT NULL DEFAULT 'pending',
+    attempts integer NOT NULL DEFAULT 0,
+    last_error text COLLATE pg_catalog."default",
+    created_on timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    leased_until timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    sent_at timestamp with time zone,
+    CONSTRAINT email_outbox_pkey PRIMARY KEY (id),
+    CONSTRAINT email_outbox_status_check CHECK (status IN ('pending', 'sent', 'failed'))
+);
+
 CREATE TABLE IF NOT EXISTS v1.enrollments
 (
     id serial NOT NULL,
@@ -111,6 +146,14 @@ CREATE TABLE IF NOT EXISTS v1.subscriptions
     CONSTRAINT unique_student_subscription UNIQUE (student_id)
 );
 
+CREATE TABLE IF NOT EXISTS v1.tags
+(
+    id serial NOT NULL,
+    name character varying(100) COLLATE pg_catalog."default" NOT NULL,
+    CONSTRAINT tags_pkey PRIMARY KEY (id),
+    CONSTRAINT tags_name_key UNIQUE (name)
+);
+
 CREATE TABLE IF NOT EXISTS v1.teachers
 (
     id serial NOT NULL,
@@ -139,6 +182,13 @@ ALTER TABLE IF EXISTS v1.course_rating
     NOT VALID;
 
 
+ALTER TABLE IF EXISTS v1.course_rating_summary
+    ADD CONSTRAINT course_rating_summary_course_id_fkey FOREIGN KEY (course_id)
+    REFERENCES v1.courses (id) MATCH SIMPLE
+    ON UPDATE NO ACTION
+    ON DELETE CASCADE;
+
+
 ALTER TABLE IF EXISTS v1.course_sections
     ADD CONSTRAINT course_id FOREIGN KEY (course_id)
     REFERENCES v1.courses (id) MATCH SIMPLE
@@ -154,6 +204,20 @@ ALTER TABLE IF EXISTS v1.course_sections
     ON DELETE CASCADE;
 
 
+ALTER TABLE IF EXISTS v1.course_tags
+    ADD CONSTRAINT course_tags_course_id_fkey FOREIGN KEY (course_id)
+    REFERENCES v1.courses (id) MATCH SIMPLE
+    ON UPDATE NO ACTION
+    ON DELETE CASCADE;
+
+
+ALTER TABLE IF EXISTS v1.course_tags
+    ADD CONSTRAINT course_tags_tag_id_fkey FOREIGN KEY (tag_id)
+    REFERENCES v1.tags (id) MATCH SIMPLE
+    ON UPDATE NO ACTION
+    ON DELETE CASCADE;
+
+
 ALTER TABLE IF EXISTS v1.courses
     ADD CONSTRAINT owner_id FOREIGN KEY (owner_id)
     REFERENCES v1.teachers (id) MATCH SIMPLE
@@ -208,4 +272,70 @@ ALTER TABLE IF EXISTS v1.subscriptions
 CREATE INDEX IF NOT EXISTS unique_student_subscription
     ON v1.subscriptions(student_id);
 
+-- Catalogue search (migration009.sql also installs the v1.sync_course_tags trigger)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS courses_title_trgm_idx
+    ON v1.courses USING gin (title gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS courses_search_vector_idx
+    ON v1.courses USING gin (search_vector);
+
+CREATE INDEX IF NOT EXISTS course_tags_course_id_idx
+    ON v1.course_tags (course_id);
+
+CREATE INDEX IF NOT EXISTS email_outbox_pending_idx
+    ON v1.email_outbox (leased_until)
+    WHERE status = 'pending';
+
+-- Login lookups (v1.accounts view, see migration011.sql)
+CREATE UNIQUE INDEX IF NOT EXISTS students_email_key ON v1.students (email);
+CREATE UNIQUE INDEX IF NOT EXISTS teachers_email_key ON v1.teachers (email);
+CREATE UNIQUE INDEX IF NOT EXISTS admins_email_key ON v1.admins (email);
+
+CREATE OR REPLACE VIEW v1.accounts AS
+    SELECT 'student'::text AS role, 1 AS role_rank, id, email, password, is_active,
+           first_name, last_name, avatar_url, notifications,
+           NULL::character varying AS mobile, NULL::character varying AS linked_in_url
+    FROM v1.students
+    UNION ALL
+    SELECT 'teacher', 2, id, email, password, is_active,
+           NULL, NULL, NULL, NULL,
+           mobile, linked_in_url
+    FROM v1.teachers
+    UNION ALL
+    SELECT 'admin', 3, id, email, password, is_active,
+           NULL, NULL, NULL, NULL,
+           NULL, NULL
+    FROM v1.admins;
+
+-- Per-course progress counters (migration012.sql also installs the
+-- v1.track_section_completion triggers that maintain them)
+CREATE TABLE IF NOT EXISTS v1.student_course_progress
+(
+    student_id integer NOT NULL,
+    course_id integer NOT NULL,
+    completed_sections integer NOT NULL DEFAULT 0,
+    CONSTRAINT student_course_progress_pkey PRIMARY KEY (student_id, course_id)
+);
+
+CREATE INDEX IF NOT EXISTS course_sections_course_id_idx
+    ON v1.course_sections (course_id);
+
+-- One enrollment per student and course (unique_student_course of migration003.sql;
+-- that constraint name is used by course_rating in this file)
+CREATE UNIQUE INDEX IF NOT EXISTS enrollments_student_id_course_id_key
+    ON v1.enrollments (student_id, course_id);
+
+-- Lookup indexes (see migration013.sql for the queries each one serves)
+
+CREATE INDEX IF NOT EXISTS enrollments_course_id_idx
+    ON v1.enrollments (course_id);
+
+CREATE INDEX IF NOT EXISTS courses_owner_id_idx
+    ON v1.courses (owner_id);
+
+CREATE INDEX IF NOT EXISTS course_rating_courses_id_idx
+    ON v1.course_rating (courses_id);
+
 END;
\ No newline at end of file
@@ -0,0 +1,21 @@
+-- Per-course rating aggregates, maintained by rate_course_repo so listings no longer AVG() v1.course_rating
+CREATE TABLE IF NOT EXISTS v1.course_rating_summary
+(
+    course_id integer NOT NULL,
+    rating_count integer NOT NULL DEFAULT 0,
+    rating_sum integer NOT NULL DEFAULT 0,
+    average_rating numeric(3, 1) GENERATED ALWAYS AS (ROUND(rating_sum::numeric / NULLIF(rating_count, 0), 1)) STORED,
+    CONSTRAINT course_rating_summary_pkey PRIMARY KEY (course_id),
+    CONSTRAINT course_rating_summary_course_id_fkey FOREIGN KEY (course_id)
+        REFERENCES v1.courses (id) MATCH SIMPLE
+        ON UPDATE NO ACTION
+        ON DELETE CASCADE
+);
+
+INSERT INTO v1.course_rating_summary (course_id, rating_count, rating_sum)
+SELECT courses_id, COUNT(*), SUM(rating)
+FROM v1.course_rating
+GROUP BY courses_id
+ON CONFLICT (course_id) DO UPDATE
+SET rating_count = EXCLUDED.rating_count,
+    rating_sum = EXCLUDED.rating_sum;
@@ -0,0 +1,78 @@
+-- Course catalogue search: trigram indexes for ILIKE filters, a weighted full-text vector
+-- for ranked search, and tags normalized into a lookup table.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS courses_title_trgm_idx
+    ON v1.courses USING gin (title gin_trgm_ops);
+
+ALTER TABLE IF EXISTS v1.courses
+    ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', replace(coalesce(tags, ''), ',', ' ')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS courses_search_vector_idx
+    ON v1.courses USING gin (search_vector);
+
+
+CREATE TABLE IF NOT EXISTS v1.tags
+(
+    id serial NOT NULL,
+    name character varying(100) COLLATE pg_catalog."default" NOT NULL,
+    CONSTRAINT tags_pkey PRIMARY KEY (id),
+    CONSTRAINT tags_name_key UNIQUE (name)
+);
+
+CREATE TABLE IF NOT EXISTS v1.course_tags
+(
+    course_id integer NOT NULL,
+    tag_id integer NOT NULL,
+    CONSTRAINT course_tags_pkey PRIMARY KEY (tag_id, course_id),
+    CONSTRAINT course_tags_course_id_fkey FOREIGN KEY (course_id)
+        REFERENCES v1.courses (id) MATCH SIMPLE
+        ON UPDATE NO ACTION
+        ON DELETE CASCADE,
+    CONSTRAINT course_tags_tag_id_fkey FOREIGN KEY (tag_id)
+        REFERENCES v1.tags (id) MATCH SIMPLE
+        ON UPDATE NO ACTION
+        ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS course_tags_course_id_idx
+    ON v1.course_tags (course_id);
+
+
+-- Keeps v1.course_tags in sync with the comma separated v1.courses.tags column
+CREATE OR REPLACE FUNCTION v1.sync_course_tags() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM v1.course_tags WHERE course_id = NEW.id;
+
+    WITH names AS (
+        SELECT DISTINCT lower(trim(name)) AS name
+        FROM regexp_split_to_table(coalesce(NEW.tags, ''), ',') AS name
+        WHERE trim(name) <> ''
+    ),
+    created AS (
+        INSERT INTO v1.tags (name)
+        SELECT name FROM names
+        ON CONFLICT (name) DO NOTHING
+        RETURNING id
+    )
+    INSERT INTO v1.course_tags (course_id, tag_id)
+    SELECT NEW.id, id FROM created
+    UNION
+    SELECT NEW.id, t.id FROM v1.tags t JOIN names n ON n.name = t.name;
+
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS courses_sync_tags ON v1.courses;
+CREATE TRIGGER courses_sync_tags
+    AFTER INSERT OR UPDATE OF tags ON v1.courses
+    FOR EACH ROW EXECUTE FUNCTION v1.sync_course_tags();
+
+-- Backfill existing courses through the trigger
+UPDATE v1.courses SET tags = tags;
@@ -0,0 +1,20 @@
+-- Durable outbox for outgoing e-mails (services/email_service.py).
+-- Rows stay 'pending' until Mailjet accepts them; pending rows whose lease has expired
+-- are picked up again when a worker process starts.
+CREATE TABLE IF NOT EXISTS v1.email_outbox
+(
+    id bigserial NOT NULL,
+    payload jsonb NOT NULL,
+    status character varying(10) COLLATE pg_catalog."default" NOT NULL DEFAULT 'pending',
+    attempts integer NOT NULL DEFAULT 0,
+    last_error text COLLATE pg_catalog."default",
+    created_on timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    leased_until timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    sent_at timestamp with time zone,
+    CONSTRAINT email_outbox_pkey PRIMARY KEY (id),
+    CONSTRAINT email_outbox_status_check CHECK (status IN ('pending', 'sent', 'failed'))
+);
+
+CREATE INDEX IF NOT EXISTS email_outbox_pending_idx
+    ON v1.email_outbox (leased_until)
+    WHERE status = 'pending';
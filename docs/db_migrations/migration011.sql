@@ -0,0 +1,23 @@
+-- One place to resolve a login: every account with its role, password hash, active flag
+-- and profile fields. Queries filter on email, which Postgres pushes into each branch
+-- of the UNION ALL, so a lookup is three index probes in a single round trip.
+CREATE UNIQUE INDEX IF NOT EXISTS students_email_key ON v1.students (email);
+CREATE UNIQUE INDEX IF NOT EXISTS teachers_email_key ON v1.teachers (email);
+CREATE UNIQUE INDEX IF NOT EXISTS admins_email_key ON v1.admins (email);
+
+-- role_rank keeps the old lookup order (student, teacher, admin) for e-mails used by several roles
+CREATE OR REPLACE VIEW v1.accounts AS
+    SELECT 'student'::text AS role, 1 AS role_rank, id, email, password, is_active,
+           first_name, last_name, avatar_url, notifications,
+           NULL::character varying AS mobile, NULL::character varying AS linked_in_url
+    FROM v1.students
+    UNION ALL
+    SELECT 'teacher', 2, id, email, password, is_active,
+           NULL, NULL, NULL, NULL,
+           mobile, linked_in_url
+    FROM v1.teachers
+    UNION ALL
+    SELECT 'admin', 3, id, email, password, is_active,
+           NULL, NULL, NULL, NULL,
+           NULL, NULL
+    FROM v1.admins;
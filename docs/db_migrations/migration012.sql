@@ -0,0 +1,77 @@
+-- Per-(student, course) count of completed sections, kept up to date by triggers on
+-- v1.students_course_sections, so a student's progress in a course is a primary-key
+-- lookup plus an indexed count of the course's sections instead of a catalogue-wide scan.
+CREATE TABLE IF NOT EXISTS v1.student_course_progress
+(
+    student_id integer NOT NULL,
+    course_id integer NOT NULL,
+    completed_sections integer NOT NULL DEFAULT 0,
+    CONSTRAINT student_course_progress_pkey PRIMARY KEY (student_id, course_id)
+);
+
+CREATE INDEX IF NOT EXISTS course_sections_course_id_idx
+    ON v1.course_sections (course_id);
+
+
+CREATE OR REPLACE FUNCTION v1.track_section_completion() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.is_completed THEN
+        UPDATE v1.student_course_progress p
+        SET completed_sections = p.completed_sections - 1
+        FROM v1.course_sections cs
+        WHERE cs.id = OLD.course_sections_id
+            AND p.student_id = OLD.students_id
+            AND p.course_id = cs.course_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_completed THEN
+        INSERT INTO v1.student_course_progress (student_id, course_id, completed_sections)
+        SELECT NEW.students_id, cs.course_id, 1
+        FROM v1.course_sections cs
+        WHERE cs.id = NEW.course_sections_id
+        ON CONFLICT (student_id, course_id)
+        DO UPDATE SET completed_sections = v1.student_course_progress.completed_sections + 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+-- Re-completing an already completed section (the upsert in section_repo) changes nothing,
+-- so updates only fire when the row actually moves between states.
+DROP TRIGGER IF EXISTS students_course_sections_progress_ins ON v1.students_course_sections;
+CREATE TRIGGER students_course_sections_progress_ins
+    AFTER INSERT ON v1.students_course_sections
+    FOR EACH ROW WHEN (NEW.is_completed)
+    EXECUTE FUNCTION v1.track_section_completion();
+
+DROP TRIGGER IF EXISTS students_course_sections_progress_upd ON v1.students_course_sections;
+CREATE TRIGGER students_course_sections_progress_upd
+    AFTER UPDATE ON v1.students_course_sections
+    FOR EACH ROW WHEN (
+        OLD.is_completed IS DISTINCT FROM NEW.is_completed
+        OR OLD.students_id <> NEW.students_id
+        OR OLD.course_sections_id <> NEW.course_sections_id
+    )
+    EXECUTE FUNCTION v1.track_section_completion();
+
+DROP TRIGGER IF EXISTS students_course_sections_progress_del ON v1.students_course_sections;
+CREATE TRIGGER students_course_sections_progress_del
+    AFTER DELETE ON v1.students_course_sections
+    FOR EACH ROW WHEN (OLD.is_completed)
+    EXECUTE FUNCTION v1.track_section_completion();
+
+
+-- Backfill while completions are blocked, so none slips in between the count and the triggers.
+-- data/migrate.py runs every migration in one transaction, which the lock needs.
+LOCK TABLE v1.students_course_sections IN SHARE ROW EXCLUSIVE MODE;
+
+INSERT INTO v1.student_course_progress (student_id, course_id, completed_sections)
+SELECT scs.students_id, cs.course_id, COUNT(*)
+FROM v1.students_course_sections scs
+JOIN v1.course_sections cs ON cs.id = scs.course_sections_id
+WHERE scs.is_completed = TRUE
+GROUP BY scs.students_id, cs.course_id
+ON CONFLICT (student_id, course_id)
+DO UPDATE SET completed_sections = EXCLUDED.completed_sections;
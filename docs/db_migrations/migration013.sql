@@ -0,0 +1,23 @@
+-- Indexes for the hottest lookup predicates. Until now only primary keys and unique
+-- constraints existed, so these filters were sequential scans of the whole table.
+-- Apply with data/migrate.py; benchmarks/index_plans.py prints the query plans with and
+-- without them.
+
+-- report_enrolled_students_repo, students_count in admin listings, deactivate_course_repo
+CREATE INDEX IF NOT EXISTS enrollments_course_id_idx
+    ON v1.enrollments (course_id);
+
+-- get_all_courses_per_teacher_repo, report_enrolled_students_repo
+CREATE INDEX IF NOT EXISTS courses_owner_id_idx
+    ON v1.courses (owner_id);
+
+-- get_course_rating_repo (unique_student_course leads with students_id, so it cannot serve this)
+CREATE INDEX IF NOT EXISTS course_rating_courses_id_idx
+    ON v1.course_rating (courses_id);
+
+-- Already covered elsewhere:
+--   enrollment lookups by student and course (check_enrollment_repo, allow_rating_repo,
+--   get_enrollment_by_student_course_repo, enroll_student_repo)
+--                                 -> unique_student_course on v1.enrollments (migration003.sql)
+--   get_all_course_sections_repo  -> course_sections_course_id_idx (migration012.sql)
+--   user_repo e-mail lookups      -> students/teachers/admins_email_key (migration011.sql)
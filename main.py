@@ -1,24 +1,48 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 import uvicorn
 from routers.api.auth import auth_router
 from routers.api.students import students_router
 from routers.api.teachers import teachers_router
 from routers.api.courses import courses_router
 from routers.api.admins import admins_router
+from routers.api.metrics import metrics_router
 from starlette.middleware.sessions import SessionMiddleware
+from common.request_timing import RequestTimingMiddleware
+from common.responses import ORJSONResponse
+from contextlib import asynccontextmanager
+from data.database import init_pool, close_pool, request_scope
+from config.mailJet_config import mailjet, EMAIL_DISPATCHER_CONFIG
+from services.email_service import MailjetTransport, start_email_dispatcher, stop_email_dispatcher
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One connection pool per process, shared by every request
+    await init_pool()
+    # Outgoing e-mails are queued by request handlers and sent by background workers
+    await start_email_dispatcher(MailjetTransport(mailjet), **EMAIL_DISPATCHER_CONFIG)
+    yield
+    await stop_email_dispatcher()
+    await close_pool()
+
+
+# Each request gets a unit of work so it reads its own writes; connections are borrowed per query
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(request_scope)], default_response_class=ORJSONResponse)
 
 app.add_middleware(SessionMiddleware, secret_key=os.getenv("SECRET_KEY"))
+# Added last, so it is the outermost middleware and times everything below it
+app.add_middleware(RequestTimingMiddleware)
 
 app.include_router(auth_router)
 app.include_router(students_router)
 app.include_router(courses_router)
 app.include_router(admins_router)
 app.include_router(teachers_router)
+app.include_router(metrics_router)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 
 from data.database import update_query
+from data.cache import invalidate_course
 from data.models import Action_UserRole, Action
 
 
@@ -33,5 +34,6 @@ async def soft_delete_course_repo(course_id: int, update_date_func = update_quer
         UPDATE v1.courses SET is_hidden = $1 WHERE id = $2
     """
     hidden_rows = await update_date_func(query, (True ,course_id))
+    invalidate_course(course_id)
 
     return hidden_rows
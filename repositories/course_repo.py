@@ -1,7 +1,29 @@
 from data.models import CourseUpdate, CourseFilterOptions, CourseCreate, TeacherCourseFilter, StudentCourseFilter
-from data.database import insert_query, read_query, update_query, query_count
+from data.database import insert_query, read_query, update_query, query_count, stream_query
+from data.cache import course_cache, invalidate_course
+from common.pagination import SortKey, decode_cursor
 from typing import Optional
 
+# Columns of v1.courses returned by course queries, aliased c; leaves out the search_vector tsvector
+COURSE_COLUMNS = "c.id, c.title, c.description, c.tags, c.picture_url, c.is_premium, c.owner_id, c.is_hidden, c.created_on"
+
+# Sort columns of the course listings, used for ORDER BY and keyset (cursor) pagination
+PUBLIC_SORT_KEYS = {
+    "title": SortKey("c.title", "text", "title"),
+    "created_on": SortKey("c.created_on", "timestamptz", "created_on"),
+    # Unrated courses sort after every real average (ratings are 1-10), as NULLs did
+    "rating": SortKey("COALESCE(rs.average_rating, 100)", "numeric", "average_rating", null_value=100),
+}
+TEACHER_SORT_KEYS = {
+    "created_on": SortKey("c.created_on", "timestamptz", "created_on"),
+    "title": SortKey("c.title", "text", "title"),
+}
+STUDENT_SORT_KEYS = {
+    "approved_at": SortKey("e.approved_at", "timestamptz", "approved_at"),
+    "title": SortKey("c.title", "text", "title"),
+}
+ADMIN_SORT_KEY = SortKey("c.created_on", "timestamptz", "created_on")
+
 # get all public courses, display title and description only
 
 async def get_all_courses_repo(filters: CourseFilterOptions, premium: bool, get_data_func = read_query):
@@ -10,11 +32,15 @@ async def get_all_courses_repo(filters: CourseFilterOptions, premium: bool, get_
 
     This asynchronous function retrieves a list of courses from the database
     according to specific filtering criteria, including search by title, tags,
-    premium access, and sorting options. The results are paginated
-    using limit and offset parameters.
+    premium access, and sorting options. The results are paginated using limit
+    and either a keyset cursor (`filters.cursor`) or offset.
+
+    The title filter is served by a trigram index and the tag filter is an exact
+    match against the normalized v1.tags lookup. When `filters.search` is set, only
+    courses matching the full-text query are returned, most relevant first.
 
     :param filters: An instance of CourseFilterOptions containing filtering and
-        sorting criteria. This includes title, tags, sort_by, limit, offset,
+        sorting criteria. This includes title, tag, search, sort_by, limit, offset,
         and order attributes.
     :type filters: CourseFilterOptions
     :param premium: A boolean indicating whether to return premium courses.
@@ -25,26 +51,47 @@ async def get_all_courses_repo(filters: CourseFilterOptions, premium: bool, get_
     :rtype: list
     """
 
-    sort_fields = {"title":"c.title", "created_on":"c.created_on", "rating":"average_rating"}
-    sort_by_field = sort_fields.get(filters.sort_by, "c.title")
-    order_by = "desc" if filters.order.lower() == "desc" else "asc"
+    sort_key = PUBLIC_SORT_KEYS.get(filters.sort_by, PUBLIC_SORT_KEYS["title"])
+    descending = filters.order.lower() == "desc"
+    order_by = "desc" if descending else "asc"
 
     premium_clause = "" if premium else "AND c.is_premium = FALSE"
+    params = [filters.title, (filters.tag or "").strip().lower(), filters.limit, filters.offset]
+
+    search_clause = ""
+    keyset_clause = ""
+    order_clause = f"{sort_key.expression} {order_by}, c.id {order_by}"
+    if filters.search:
+        # Relevance ordering has no stable key, so search results page by offset only
+        params.append(filters.search)
+        search_clause = f"AND c.search_vector @@ websearch_to_tsquery('english', ${len(params)})"
+        order_clause = f"ts_rank(c.search_vector, websearch_to_tsquery('english', ${len(params)})) DESC, {order_clause}"
+    elif filters.cursor:
+        last_value, last_id = decode_cursor(filters.cursor)
+        params[3] = 0
+        params += [last_value, last_id]
+        keyset_clause = sort_key.clause(descending, len(params) - 1, len(params))
 
     query= f"""
-    SELECT c.id, c.title, c.description, c.tags, c.picture_url, c.created_on, ROUND(AVG(cr.rating), 1) AS average_rating
+    SELECT c.id, c.title, c.description, c.tags, c.picture_url, c.created_on, rs.average_rating
     FROM v1.courses c
-    LEFT JOIN v1.course_rating cr ON c.id = cr.courses_id
+    LEFT JOIN v1.course_rating_summary rs ON c.id = rs.course_id
     WHERE c.is_hidden = FALSE
         {premium_clause}
         AND c.is_premium = FALSE
         AND (c.title ILIKE '%' || $1 || '%' OR $1 = ' ')
-        AND (c.tags ILIKE '%' || $2 || '%' OR $2 = ' ')
-    GROUP BY c.id, c.title, c.description, c.tags, c.picture_url, c.created_on
-    ORDER BY {sort_by_field} {order_by}
+        AND ($2 = '' OR EXISTS (
+            SELECT 1
+            FROM v1.tags t
+            JOIN v1.course_tags ct ON ct.tag_id = t.id
+            WHERE t.name = $2 AND ct.course_id = c.id
+        ))
+        {search_clause}
+        {keyset_clause}
+    ORDER BY {order_clause}
     LIMIT $3 OFFSET $4
     """
-    params = (filters.title, filters.tag, filters.limit, filters.offset)
+    params = tuple(params)
 
     return await get_data_func(query, params)
 
@@ -56,6 +103,8 @@ async def get_course_by_id_repo(id: int, get_data_func = read_query):
     This function executes a SQL query to retrieve details of a course
     specified by its unique identifier. The query is performed
     asynchronously using the provided function for data retrieval.
+    Lookups through the default `read_query` are served from the in-process
+    course cache (see data/cache.py); writers of v1.courses invalidate it.
 
     :param id: The unique identifier of the course.
     :param get_data_func: An asynchronous function to execute the database query.
@@ -63,14 +112,19 @@ async def get_course_by_id_repo(id: int, get_data_func = read_query):
     :return: A dictionary containing course details if found, otherwise `None`.
     """
 
-    query = """
-    SELECT *
-    FROM v1.courses
-    WHERE id = $1
+    query = f"""
+    SELECT {COURSE_COLUMNS}
+    FROM v1.courses c
+    WHERE c.id = $1
     """
 
-    result = await get_data_func(query, (id, ))
-    return result[0] if result else None
+    async def load():
+        result = await get_data_func(query, (id, ))
+        return result[0] if result else None
+
+    if get_data_func is not read_query:
+        return await load()
+    return await course_cache.get_or_load(id, load)
 
 # get all courses per teacher
 async def get_all_courses_per_teacher_repo(teacher_id: int, filters: TeacherCourseFilter, get_data_func = read_query):
@@ -83,7 +137,7 @@ async def get_all_courses_per_teacher_repo(teacher_id: int, filters: TeacherCour
     :param teacher_id: The unique identifier of the teacher whose courses are being retrieved.
     :type teacher_id: int
     :param filters: An instance of TeacherCourseFilter containing filtering and pagination options such as
-        title keyword, sorting preference, limit, and offset.
+        title keyword, sorting preference, limit, and a keyset cursor or offset.
     :type filters: TeacherCourseFilter
     :param get_data_func: An optional callable for executing the database query, with a default value set
         to `read_query`.
@@ -93,20 +147,26 @@ async def get_all_courses_per_teacher_repo(teacher_id: int, filters: TeacherCour
     :rtype: List[Dict[str, Any]]
     """
 
-    order_by = "c.created_on" if filters.sort_by == "created_on" else "c.title"
+    sort_key = TEACHER_SORT_KEYS.get(filters.sort_by, TEACHER_SORT_KEYS["title"])
+    params = (teacher_id, filters.title, filters.limit, filters.offset)
+
+    keyset_clause = ""
+    if filters.cursor:
+        last_value, last_id = decode_cursor(filters.cursor)
+        params = (teacher_id, filters.title, filters.limit, 0, last_value, last_id)
+        keyset_clause = sort_key.clause(False, 5, 6)
 
     query =f"""
-    SELECT c.*,
-    ROUND(AVG(cr.rating), 1) as average_rating
+    SELECT {COURSE_COLUMNS}, rs.average_rating
     FROM v1.courses c
-    LEFT JOIN v1.course_rating cr ON c.id = cr.courses_id
+    LEFT JOIN v1.course_rating_summary rs ON c.id = rs.course_id
     WHERE owner_id = $1 AND c.title ILIKE '%' || $2 || '%'
-    GROUP BY c.id
-    ORDER by {order_by}
+        {keyset_clause}
+    ORDER by {sort_key.expression}, c.id
     LIMIT $3 OFFSET $4
     """
 
-    return await get_data_func(query, (teacher_id, filters.title, filters.limit, filters.offset))
+    return await get_data_func(query, params)
 
 # get all courses a student is enrolled to 
 async def get_all_student_courses_repo(student_id, filters: StudentCourseFilter, get_data_func = read_query):
@@ -118,7 +178,7 @@ async def get_all_student_courses_repo(student_id, filters: StudentCourseFilter,
     :param student_id: The unique identifier of the student.
     :type student_id: int
     :param filters: Filters provided to narrow down the courses. Includes sorting options,
-        title filter, tag filter, limit, and offset for pagination.
+        title filter, tag filter, limit, and a keyset cursor or offset for pagination.
     :type filters: StudentCourseFilter
     :param get_data_func: The function used to execute the database query. Defaults to `read_query`.
     :type get_data_func: Callable[[str, Tuple[Any, ...]], Awaitable[List[Dict[str, Any]]]]
@@ -126,22 +186,29 @@ async def get_all_student_courses_repo(student_id, filters: StudentCourseFilter,
         details, or None if no courses are found.
     :rtype: Optional[List[Dict[str, Any]]]
     """
-    order_by = "e.approved_at" if filters.sort_by == "approved_at" else "c.title"
+    sort_key = STUDENT_SORT_KEYS.get(filters.sort_by, STUDENT_SORT_KEYS["title"])
+    params = (student_id, filters.title, filters.tag, filters.limit, filters.offset)
+
+    keyset_clause = ""
+    if filters.cursor:
+        last_value, last_id = decode_cursor(filters.cursor)
+        params = (student_id, filters.title, filters.tag, filters.limit, 0, last_value, last_id)
+        keyset_clause = sort_key.clause(False, 6, 7)
+
     query = f"""
-    SELECT c.id, c.title,c.description, e.approved_at, e.completed_at,
-    ROUND(AVG(cr.rating), 1) AS average_rating 
+    SELECT c.id, c.title,c.description, e.approved_at, e.completed_at, rs.average_rating
     FROM v1.enrollments e
     INNER JOIN v1.courses c ON e.course_id = c.id
-    LEFT JOIN v1.course_rating cr ON c.id = cr.courses_id
+    LEFT JOIN v1.course_rating_summary rs ON c.id = rs.course_id
     WHERE e.student_id = $1
         AND c.title ILIKE '%' || $2 || '%'
         AND c.tags ILIKE '%' || $3 || '%'
         AND e.approved_at IS NOT NULL
-    GROUP BY c.id, c.title, c.description, e.approved_at, e.completed_at
-    ORDER BY {order_by}
+        {keyset_clause}
+    ORDER BY {sort_key.expression}, c.id
     LIMIT $4 OFFSET $5
     """
-    courses = await get_data_func(query, (student_id, filters.title, filters.tag, filters.limit, filters.offset ))
+    courses = await get_data_func(query, params)
     return courses if courses else None
 
 # create course
@@ -179,6 +246,8 @@ async def insert_course_repo(course_data: CourseCreate, insert_data_func = inser
         course_data.is_hidden,
     )
     course = await insert_data_func(query, values)
+    if course:
+        invalidate_course(course)
     return course
     
 # update course by title
@@ -223,6 +292,7 @@ async def update_course_data_repo(id: int, updates: CourseUpdate, update_data_fu
     )
 
     updated = await update_data_func(query, data)
+    invalidate_course(id)
     return updated if updated else None
 
 async def count_premium_enrollments_repo(student_id, count_data_func = query_count):
@@ -252,6 +322,13 @@ async def count_premium_enrollments_repo(student_id, count_data_func = query_cou
     enrollments = await count_data_func(query,(student_id,))
     return enrollments
 
+COURSE_RATING_QUERY = """
+    SELECT cr.rating, cr.students_id, s.email
+    FROM v1.course_rating cr
+    JOIN v1.students s ON cr.students_id = s.id
+    WHERE cr.courses_id = $1
+"""
+
 async def get_course_rating_repo(course_id: int, get_data_func = read_query):
     """
     Fetches course rating information from the database using the provided course ID and
@@ -267,15 +344,20 @@ async def get_course_rating_repo(course_id: int, get_data_func = read_query):
     :rtype: Any
     """
 
-    query = """
-    SELECT cr.rating, cr.students_id, s.email
-    FROM v1.course_rating cr
-    JOIN v1.students s ON cr.students_id = s.id
-    WHERE cr.courses_id = $1
+    return await get_data_func(COURSE_RATING_QUERY, (course_id,))
 
+async def stream_course_rating_repo(course_id: int, stream_data_func = stream_query):
     """
+    Stream the ratings of a course with their students (see get_course_rating_repo) row by row.
 
-    return await get_data_func(query, (course_id,))
+    :param course_id: The unique identifier of the course whose ratings are streamed.
+    :type course_id: int
+    :param stream_data_func: An async generator function that executes the query.
+        Defaults to `stream_query`.
+    :return: An async iterator over the rating rows.
+    """
+    async for row in stream_data_func(COURSE_RATING_QUERY, (course_id,)):
+        yield row
 
 async def admin_course_view_repo(
         title_filter: str,
@@ -283,6 +365,7 @@ async def admin_course_view_repo(
         student_id: Optional[int],
         limit: int,
         offset: int,
+        cursor: Optional[str] = None,
         get_data_func = read_query
         ):
     """
@@ -290,39 +373,47 @@ async def admin_course_view_repo(
 
     This function constructs a SQL query to retrieve course information, applying the specified
     filters for title, teacher ID, and student enrollment. The data is paginated using the
-    `limit` and `offset` parameters. Average rating and student count are calculated for
-    each course, and results are ordered by the course creation date.
+    `limit` and `offset` parameters. Average rating is read from the maintained rating
+    summary, student count is calculated per course, and results are ordered by the
+    course creation date.
 
     :param title_filter: Filters courses by a case-insensitive partial match on their title.
     :param teacher_id: Filters courses by the ID of the teacher who owns them.
     :param student_id: Filters courses to include only those the specified student is enrolled in.
     :param limit: Limits the number of courses returned in the result set.
     :param offset: Skips the specified number of courses in the result set for pagination.
+    :param cursor: Keyset cursor from the previous page; when given, offset is ignored.
     :param get_data_func: Asynchronous function used to execute the database query.
     :return: A collection of course details matching the specified filters.
     :rtype: Any
     """
-    
+    params = (title_filter, teacher_id, student_id, limit, offset)
+
+    keyset_clause = ""
+    if cursor:
+        last_value, last_id = decode_cursor(cursor)
+        params = (title_filter, teacher_id, student_id, limit, 0, last_value, last_id)
+        keyset_clause = ADMIN_SORT_KEY.clause(True, 6, 7)
+
     query = f"""
     SELECT
         c.id, c.title, c.is_premium, c.description, c.tags, c.picture_url, c.owner_id, c.created_on,
-        COUNT(DISTINCT e.id) AS students_count,
-        ROUND(AVG(cr.rating), 1) AS average_rating
+        (SELECT COUNT(*) FROM v1.enrollments e WHERE e.course_id = c.id) AS students_count,
+        rs.average_rating
     FROM v1.courses c
-    LEFT JOIN v1.enrollments e ON c.id = e.course_id
-    LEFT JOIN v1.course_rating cr ON c.id = cr.courses_id
+    LEFT JOIN v1.course_rating_summary rs ON c.id = rs.course_id
     WHERE c.is_hidden = FALSE
         AND (c.title ILIKE '%' || $1 || '%' OR $1 = '' ) 
         AND ($2::INT IS NULL OR c.owner_id = $2)
         AND ($3::INT IS NULL OR EXISTS (
             SELECT 1 FROM v1.enrollments e2 WHERE e2.course_id = c.id AND e2.student_id = $3
         ))
-    GROUP BY c.id
-    ORDER BY c.created_on DESC
+        {keyset_clause}
+    ORDER BY c.created_on DESC, c.id DESC
     LIMIT $4 OFFSET $5
     """
 
-    return await get_data_func(query, (title_filter, teacher_id, student_id, limit, offset))
+    return await get_data_func(query, params)
 
 async def complete_course_repo(student_id: int, course_id: int, update_data_func = update_query):
     """
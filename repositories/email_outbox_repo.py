@@ -0,0 +1,109 @@
+import json
+from data.database import insert_query, insert_returning_rows_query, update_query
+
+
+async def insert_outbox_messages_repo(messages: list[dict], lease_seconds: float, insert_data_func = insert_query):
+    """
+    Stores outgoing e-mails in the outbox with one INSERT.
+
+    The rows are leased to the calling process for `lease_seconds`, so other processes
+    do not pick them up at startup while this one is still delivering them.
+
+    :param messages: Mailjet v3.1 message objects, one per e-mail.
+    :type messages: list[dict]
+    :param lease_seconds: How long the rows are reserved for this process.
+    :type lease_seconds: float
+    :param insert_data_func: A callable used to execute the query. Defaults to `insert_query`.
+    :type insert_data_func: Callable
+    :return: The outbox ids of the stored messages, in the order given.
+    :rtype: list[int]
+    """
+    query = """
+    WITH inserted AS (
+        INSERT INTO v1.email_outbox (payload, leased_until)
+        SELECT payload::jsonb, now() + make_interval(secs => $2)
+        FROM unnest($1::text[]) WITH ORDINALITY AS m(payload, position)
+        ORDER BY position
+        RETURNING id
+    )
+    SELECT array_agg(id ORDER BY id) FROM inserted
+    """
+    ids = await insert_data_func(query, ([json.dumps(message) for message in messages], lease_seconds))
+    return list(ids) if ids else []
+
+async def claim_pending_outbox_repo(limit: int, lease_seconds: float, update_data_func = insert_returning_rows_query):
+    """
+    Leases pending outbox rows whose previous lease has expired (e.g. after a restart).
+
+    Rows locked by another process are skipped, so concurrent workers never claim the same e-mail.
+    The claim is an UPDATE ... RETURNING, so it always runs on the primary, never on a read replica.
+
+    :param limit: Maximum number of rows to claim.
+    :type limit: int
+    :param lease_seconds: How long the claimed rows are reserved for this process.
+    :type lease_seconds: float
+    :param update_data_func: A callable used to execute the query. Defaults to `insert_returning_rows_query`.
+    :type update_data_func: Callable
+    :return: Records with id, payload (JSON text) and attempts.
+    :rtype: list
+    """
+    query = """
+    UPDATE v1.email_outbox o
+    SET leased_until = now() + make_interval(secs => $2)
+    WHERE o.id IN (
+        SELECT id
+        FROM v1.email_outbox
+        WHERE status = 'pending' AND leased_until < now()
+        ORDER BY id
+        LIMIT $1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING o.id, o.payload::text AS payload, o.attempts
+    """
+    return await update_data_func(query, (limit, lease_seconds))
+
+async def mark_outbox_sent_repo(ids: list[int], update_data_func = update_query) -> int:
+    """
+    Marks delivered outbox rows as sent.
+
+    :param ids: The outbox ids accepted by the e-mail provider.
+    :type ids: list[int]
+    :param update_data_func: A callable used to execute the query. Defaults to `update_query`.
+    :type update_data_func: Callable
+    :return: The number of updated rows.
+    :rtype: int
+    """
+    query = """
+    UPDATE v1.email_outbox
+    SET status = 'sent', sent_at = now(), attempts = attempts + 1
+    WHERE id = ANY($1::bigint[])
+    """
+    return await update_data_func(query, (ids,))
+
+async def record_outbox_failure_repo(ids: list[int], error: str, final: bool, retry_in: float,
+                                     update_data_func = update_query) -> int:
+    """
+    Records a failed delivery attempt for outbox rows.
+
+    :param ids: The outbox ids of the failed batch.
+    :type ids: list[int]
+    :param error: The error reported by the transport.
+    :type error: str
+    :param final: True when the messages ran out of attempts and are given up on.
+    :type final: bool
+    :param retry_in: Seconds until the next attempt; the lease is extended past it.
+    :type retry_in: float
+    :param update_data_func: A callable used to execute the query. Defaults to `update_query`.
+    :type update_data_func: Callable
+    :return: The number of updated rows.
+    :rtype: int
+    """
+    query = """
+    UPDATE v1.email_outbox
+    SET attempts = attempts + 1,
+        last_error = $2,
+        status = CASE WHEN $3 THEN 'failed' ELSE status END,
+        leased_until = now() + make_interval(secs => $4)
+    WHERE id = ANY($1::bigint[])
+    """
+    return await update_data_func(query, (ids, error, final, retry_in))
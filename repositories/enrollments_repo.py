@@ -1,4 +1,4 @@
-from data.database import insert_query, read_query, update_query
+from data.database import insert_query, insert_returning_query, read_query, update_query
 from datetime import datetime
 
 
@@ -27,6 +27,83 @@ async def create_enrollment_repo(course_id, student_id, insert_data_func = inser
     # except UniqueViolationError:
     #     raise HTTPException(status_code=400, detail="Already enrolled in this course!")
 
+async def enroll_student_repo(course_id: int, student_id: int, premium_limit: int, insert_data_func = insert_returning_query):
+    """
+    Checks enrollment eligibility and creates the enrollment in a single statement.
+
+    The course is looked up together with its teacher. Premium courses require a
+    subscription and fewer than `premium_limit` active premium enrollments; a student
+    cannot request a course they have any enrollment for, completed or dropped ones
+    included, since there is one enrollment per student and course. The enrollment
+    is inserted only when every check passes.
+
+    :param course_id: The unique identifier of the course to enroll in.
+    :type course_id: int
+    :param student_id: The unique identifier of the student to be enrolled.
+    :type student_id: int
+    :param premium_limit: Maximum number of active premium enrollments per student.
+    :type premium_limit: int
+    :param insert_data_func: A callable executing the statement on the primary and returning
+        its first row. Defaults to 'insert_returning_query'.
+    :type insert_data_func: Callable[[str, tuple], Awaitable[Record]]
+    :return: None when the course does not exist. Otherwise a row with the course columns,
+        the teacher (teacher_email, teacher_mobile, teacher_linked_in_url), the eligibility
+        flags (subscribed, within_premium_limit, already_enrolled) and enrollment_id, which
+        is NULL when the enrollment was not created.
+    :rtype: Optional[Record]
+    """
+    query = """
+    WITH course AS (
+        SELECT id, title, description, tags, picture_url, is_premium, owner_id, is_hidden, created_on
+        FROM v1.courses
+        WHERE id = $2
+    ),
+    eligibility AS (
+        SELECT
+            NOT course.is_premium
+                OR EXISTS (SELECT 1 FROM v1.subscriptions s WHERE s.student_id = $1) AS subscribed,
+            NOT course.is_premium
+                OR (SELECT count(*)
+                    FROM v1.enrollments en
+                    JOIN v1.courses co ON en.course_id = co.id
+                    WHERE en.student_id = $1
+                        AND en.is_approved = true
+                        AND en.completed_at IS NULL
+                        AND en.drop_out = false
+                        AND co.is_premium = true) < $3 AS within_premium_limit,
+            -- Any earlier enrollment counts, completed or dropped too: (student_id, course_id) is unique
+            EXISTS (
+                SELECT 1
+                FROM v1.enrollments e
+                WHERE e.student_id = $1
+                    AND e.course_id = course.id
+            ) AS already_enrolled
+        FROM course
+    ),
+    enrolled AS (
+        INSERT INTO v1.enrollments (student_id, course_id)
+        SELECT $1, $2
+        FROM eligibility
+        WHERE subscribed AND within_premium_limit AND NOT already_enrolled
+        -- A concurrent request for the same pair may insert first
+        ON CONFLICT (student_id, course_id) DO NOTHING
+        RETURNING id
+    )
+    SELECT
+        course.*,
+        t.email AS teacher_email,
+        t.mobile AS teacher_mobile,
+        t.linked_in_url AS teacher_linked_in_url,
+        eligibility.subscribed,
+        eligibility.within_premium_limit,
+        eligibility.already_enrolled,
+        (SELECT id FROM enrolled) AS enrollment_id
+    FROM course
+    CROSS JOIN eligibility
+    JOIN v1.teachers t ON t.id = course.owner_id
+    """
+    return await insert_data_func(query, (student_id, course_id, premium_limit))
+
 async def confirm_enrollment_repo(enrollment_id, update_data_func = update_query):
     """
     Confirms the enrollment by updating the relevant database record. Sets the
@@ -1,5 +1,6 @@
 from data.models import SectionCreate, SectionUpdate, UserRole
-from data.database import insert_query, update_query, read_query
+from data.database import insert_query, insert_returning_rows_query, update_query, read_query, copy_records_query
+from typing import AsyncIterable, Iterable, Union
 
 async def insert_section_repo(course_id: int, section: SectionCreate, insert_data_func = insert_query):
     """
@@ -35,6 +36,30 @@ async def insert_section_repo(course_id: int, section: SectionCreate, insert_dat
     result  = await insert_data_func(query, data)
     return result if result else None
 
+async def copy_sections_repo(course_id: int, sections: Union[Iterable[SectionCreate], AsyncIterable[SectionCreate]],
+                             copy_data_func = copy_records_query) -> int:
+    """
+    Bulk inserts sections into a course with a single COPY instead of one INSERT per section.
+
+    Sections are consumed lazily, so they can be validated while they are copied. Run it inside
+    a transactional unit of work to keep the course's sections all-or-nothing.
+
+    :param course_id: The unique identifier of the course the sections belong to.
+    :type course_id: int
+    :param sections: Sections to insert, as an iterable or an async iterable.
+    :param copy_data_func: The function used to run the COPY. Defaults to `copy_records_query`.
+    :return: The number of sections inserted.
+    :rtype: int
+    """
+    columns = ("course_id", "title", "content", "description", "is_hidden")
+
+    if hasattr(sections, "__aiter__"):
+        records = ((course_id, s.title, s.content, s.description, s.is_hidden) async for s in sections)
+    else:
+        records = ((course_id, s.title, s.content, s.description, s.is_hidden) for s in sections)
+
+    return await copy_data_func("course_sections", columns, records)
+
 async def update_section_repo(id: int, updates: SectionUpdate, update_data_func = update_query):
     """
     Asynchronously updates a section in the course sections repository. The updated
@@ -189,6 +214,49 @@ async def complete_section_repo(student_id: int, section_id: int, insert_data_fu
     """
     return await insert_data_func(query, (student_id, section_id))
 
+async def complete_sections_repo(student_id: int, course_id: int, section_ids: list[int],
+                                 insert_data_func = insert_returning_rows_query):
+    """
+    Marks several sections of a course as completed for a student with one multi-row upsert.
+
+    Only sections that belong to the given course are written; the other requested ids are
+    reported back as not completed.
+
+    :param student_id: ID of the student who completed the sections
+    :type student_id: int
+    :param course_id: ID of the course the sections must belong to
+    :type course_id: int
+    :param section_ids: IDs of the course sections to be marked as completed
+    :type section_ids: list[int]
+    :param insert_data_func: A callable executing the statement on the primary and returning all rows.
+                             Defaults to `insert_returning_rows_query`.
+    :type insert_data_func: Callable[[str, tuple], Awaitable[list]]
+    :return: One row per distinct requested section id, ordered by id, with the
+        `section_id` and whether it was `completed`.
+    :rtype: list
+    """
+
+    query = """
+    WITH requested AS (
+        SELECT DISTINCT unnest($3::int[]) AS section_id
+    ),
+    completed AS (
+        INSERT INTO v1.students_course_sections (students_id, course_sections_id, is_completed)
+        SELECT $1, cs.id
+        FROM v1.course_sections cs
+        JOIN requested r ON r.section_id = cs.id
+        WHERE cs.course_id = $2
+        ON CONFLICT (students_id, course_sections_id)
+        DO UPDATE SET is_completed = TRUE
+        RETURNING course_sections_id
+    )
+    SELECT r.section_id, c.course_sections_id IS NOT NULL AS completed
+    FROM requested r
+    LEFT JOIN completed c ON c.course_sections_id = r.section_id
+    ORDER BY r.section_id
+    """
+    return await insert_data_func(query, (student_id, course_id, section_ids))
+
 async def get_completed_sections_repo(student_id: int, course_id: int, get_data_func=read_query):
     """
     Retrieve the IDs of completed course sections for a student in a given course.
@@ -1,5 +1,6 @@
-from data.database import update_query, insert_query, read_query
+from data.database import update_query, insert_query, read_query, stream_query
 from data.models import Subscription
+from repositories.course_repo import COURSE_COLUMNS
 
 
 async def update_student_data_repo(
@@ -33,6 +34,19 @@ async def update_student_data_repo(
     student = await update_data_func(query, (first_name, last_name, avatar_url, user_email))
     return student
 
+STUDENT_ALL_COURSES_QUERY = f"""
+    SELECT {COURSE_COLUMNS}, rs.average_rating FROM v1.courses c
+    LEFT JOIN v1.course_rating_summary rs ON c.id = rs.course_id
+    WHERE is_premium = FALSE
+    OR (is_premium = TRUE
+        AND
+        id IN (SELECT e.course_id FROM v1.enrollments e
+                WHERE e.student_id = $1
+                AND e.is_approved = TRUE
+                AND e.completed_at IS NULL)
+            )
+"""
+
 async def get_courses_student_all_repo(student_id, get_data_func = read_query):
     """
     Fetches all courses data for a specified student. Includes information about all free courses
@@ -40,7 +54,7 @@ async def get_courses_student_all_repo(student_id, get_data_func = read_query):
     not yet completed.
 
     This function retrieves the courses' data including the average ratings of each course,
-    calculating them by aggregating data from a course rating table. It supports asynchronous
+    read from the maintained course rating summary. It supports asynchronous
     processing and uses parameterized queries for safe database interaction.
 
     :param student_id: The unique identifier of the student.
@@ -53,22 +67,22 @@ async def get_courses_student_all_repo(student_id, get_data_func = read_query):
         rating. Returns None if no courses were found.
     :rtype: Optional[List[Dict]]
     """
-    query = """
-        SELECT c.*, avg(cr.rating) AS average_rating FROM v1.courses c
-        LEFT JOIN v1.course_rating cr ON c.id = cr.courses_id
-        WHERE is_premium = FALSE
-        OR (is_premium = TRUE
-            AND
-            id IN (SELECT e.course_id FROM v1.enrollments e
-                    WHERE e.student_id = $1
-                    AND e.is_approved = TRUE
-                    AND e.completed_at IS NULL)
-                )
-        GROUP BY c.id, c.title, c.description, c.tags, c.picture_url, c.is_premium, c.created_on
-    """
-    courses = await get_data_func(query, (student_id, ))
+    courses = await get_data_func(STUDENT_ALL_COURSES_QUERY, (student_id, ))
     return courses if courses else None
 
+async def stream_courses_student_all_repo(student_id: int, stream_data_func = stream_query):
+    """
+    Stream the courses of get_courses_student_all_repo row by row instead of loading them all.
+
+    :param student_id: The unique identifier of the student.
+    :type student_id: int
+    :param stream_data_func: An async generator function that executes the query.
+        Defaults to `stream_query`.
+    :return: An async iterator over the course rows, each with its average rating.
+    """
+    async for row in stream_data_func(STUDENT_ALL_COURSES_QUERY, (student_id, )):
+        yield row
+
 async def get_courses_progress_repo(student_id:int, get_data_func = read_query):
     """
     Fetches the progress of courses for a specific student from the database.
@@ -92,7 +106,7 @@ async def get_courses_progress_repo(student_id:int, get_data_func = read_query):
         SELECT
         c.id AS course_id,
         c.title,
-        COALESCE(visited.count * 100.0 / total.count, 0) AS progress_percentage
+        COALESCE(visited.completed_sections * 100.0 / total.count, 0) AS progress_percentage
         FROM
             v1.courses c
         LEFT JOIN (
@@ -100,17 +114,50 @@ async def get_courses_progress_repo(student_id:int, get_data_func = read_query):
             FROM v1.course_sections
             GROUP BY course_id
         ) total ON total.course_id = c.id
-        LEFT JOIN (
-            SELECT cs.course_id, COUNT(*) AS count
-            FROM v1.students_course_sections scs
-            JOIN v1.course_sections cs ON cs.id = scs.course_sections_id
-            WHERE scs.students_id = $1 AND scs.is_completed = true
-            GROUP BY cs.course_id
-        ) visited ON visited.course_id = c.id
+        LEFT JOIN v1.student_course_progress visited
+            ON visited.course_id = c.id AND visited.student_id = $1
     """
     courses = await get_data_func(query, (student_id,))
     return courses if courses else None
 
+async def get_course_progress_repo(student_id: int, course_id: int, get_data_func = read_query):
+    """
+    Fetches a student's progress in a single course.
+
+    The number of completed sections comes from the `v1.student_course_progress`
+    counter, which triggers keep up to date as sections are completed, so the cost
+    does not depend on the size of the catalogue or on the student's other courses.
+
+    :param student_id: Unique identifier of the student.
+    :type student_id: int
+    :param course_id: Unique identifier of the course.
+    :type course_id: int
+    :param get_data_func: A callable query execution function that takes an SQL
+        query string and its parameters. Defaults to `read_query`.
+    :type get_data_func: Callable
+    :return: A dictionary with `course_id`, `title` and `progress_percentage`, or
+        `None` if the course does not exist.
+    :rtype: Optional[Dict[str, Any]]
+    """
+    query = """
+        SELECT
+        c.id AS course_id,
+        c.title,
+        COALESCE(visited.completed_sections * 100.0 / NULLIF(total.count, 0), 0) AS progress_percentage
+        FROM
+            v1.courses c
+        CROSS JOIN LATERAL (
+            SELECT COUNT(*) AS count
+            FROM v1.course_sections
+            WHERE course_id = c.id
+        ) total
+        LEFT JOIN v1.student_course_progress visited
+            ON visited.course_id = c.id AND visited.student_id = $1
+        WHERE c.id = $2
+    """
+    progress = await get_data_func(query, (student_id, course_id))
+    return progress[0] if progress else None
+
 async def update_avatar_url_repo(url: str, user_email, update_data_func = update_query):
     """
     Updates the avatar URL for a specific student, identified by their email
@@ -187,11 +234,57 @@ async def is_subscribed_repo(student_id, get_data_func = read_query):
     subscription = await get_data_func(query, (student_id,))
     return subscription[0] if subscription else None
 
+# First rating of a course by a student: counted in the summary only when this statement inserted it
+RATE_COURSE_FIRST_QUERY = """
+    WITH rated AS (
+        INSERT INTO v1.course_rating(students_id, courses_id, rating)
+        VALUES ($1, $2, $3)
+        ON CONFLICT (students_id, courses_id) DO NOTHING
+        RETURNING students_id, courses_id, rating
+    ),
+    summary AS (
+        INSERT INTO v1.course_rating_summary AS rs (course_id, rating_count, rating_sum)
+        SELECT courses_id, 1, rating FROM rated
+        ON CONFLICT (course_id)
+        DO UPDATE SET rating_count = rs.rating_count + 1,
+                      rating_sum = rs.rating_sum + EXCLUDED.rating_sum
+    )
+    SELECT students_id, courses_id, rating FROM rated
+"""
+
+# Changed rating: the row is locked before the old rating is read, so concurrent changes apply one after the other
+RATE_COURSE_AGAIN_QUERY = """
+    WITH previous AS (
+        SELECT rating
+        FROM v1.course_rating
+        WHERE students_id = $1 AND courses_id = $2
+        FOR UPDATE
+    ),
+    rated AS (
+        UPDATE v1.course_rating r
+        SET rating = $3
+        FROM previous
+        WHERE r.students_id = $1 AND r.courses_id = $2
+        RETURNING r.students_id, r.courses_id, r.rating
+    ),
+    summary AS (
+        UPDATE v1.course_rating_summary rs
+        SET rating_sum = rs.rating_sum + $3 - previous.rating
+        FROM previous
+        WHERE rs.course_id = $2
+    )
+    SELECT students_id, courses_id, rating FROM rated
+"""
+
 async def rate_course_repo(student_id, course_id, rating: int, insert_data_func = insert_query):
     """
     Asynchronously inserts or updates a course rating for a specific student. If a rating already exists for the given
-    student and course, it updates the existing rating. Otherwise, it inserts a new rating. The functionality leverages
-    the provided `insert_data_func` to execute database operations.
+    student and course, it updates the existing rating. Otherwise, it inserts a new rating. The course rating summary
+    (count, sum and average) is adjusted along with the rating.
+
+    The insert and the update are separate statements: the update's snapshot then already contains a
+    rating inserted concurrently by the same student, so its old value is subtracted from the summary
+    instead of being counted twice.
 
     :param student_id: The unique identifier for the student.
     :param course_id: The unique identifier for the course.
@@ -199,15 +292,11 @@ async def rate_course_repo(student_id, course_id, rating: int, insert_data_func
     :param insert_data_func: A callable function responsible for executing the database query. Defaults to `insert_query`.
     :return: The inserted or updated rating record as returned by the database.
     """
-    query = """
-        INSERT INTO v1.course_rating(students_id, courses_id, rating)
-        VALUES ($1, $2, $3)
-        ON CONFLICT (students_id, courses_id)
-        DO UPDATE SET rating = EXCLUDED.rating
-        RETURNING students_id, courses_id, rating
-    """
-    rating = await insert_data_func(query, (student_id, course_id, rating))
-    return rating
+    params = (student_id, course_id, rating)
+    rated = await insert_data_func(RATE_COURSE_FIRST_QUERY, params)
+    if rated is None:
+        rated = await insert_data_func(RATE_COURSE_AGAIN_QUERY, params)
+    return rated
 
 #get all courses a student is enrolled to or has completed
 async def allow_rating_repo(student_id, course_id, get_data_func = read_query):
@@ -1,4 +1,8 @@
-from data.database import read_query, update_query
+from data.database import read_query, update_query, stream_query
+from data.cache import invalidate_course
+from data.models import EnrollmentReportFilter, EnrollmentStatus
+from common.pagination import SortKey, decode_cursor
+from typing import Optional
 
 async def update_teacher_repo(mobile, linked_in_url, email, update_data_func = update_query):
     """
@@ -22,6 +26,61 @@ async def update_teacher_repo(mobile, linked_in_url, email, update_data_func = u
     result = await update_data_func(query, (mobile, linked_in_url, email))
     return result if result else None
 
+ENROLLED_STUDENTS_QUERY = """
+    SELECT e.id AS enrollment_id, e.student_id, s.email, s.first_name, s.last_name,
+       e.course_id, c.title, e.requested_at, e.approved_at, e.completed_at, e.drop_out, c.created_on
+    FROM v1.enrollments AS e
+        JOIN v1.courses AS c
+    ON e.course_id = c.id
+        JOIN v1.students AS s
+    ON e.student_id = s.id
+    WHERE c.owner_id = $1
+"""
+
+# The report is ordered by request time; keyset pages continue after (requested_at, enrollment id)
+ENROLLMENT_REPORT_SORT_KEY = SortKey("e.requested_at", "timestamptz", "requested_at")
+
+ENROLLMENT_STATUS_CLAUSES = {
+    EnrollmentStatus.pending: "AND e.is_approved = FALSE",
+    EnrollmentStatus.active: "AND e.is_approved = TRUE AND e.completed_at IS NULL AND e.drop_out IS NOT TRUE",
+    EnrollmentStatus.completed: "AND e.completed_at IS NOT NULL",
+    EnrollmentStatus.dropped: "AND e.drop_out = TRUE",
+}
+
+def enrollment_report_query(owner_id: int, filters: EnrollmentReportFilter, paginate: bool) -> tuple[str, tuple]:
+    """
+    Build the filtered enrollment report query of a course owner.
+
+    :param owner_id: The ID of the course owner.
+    :param filters: Course, status and request-time range to filter by, plus the page limit and cursor.
+    :param paginate: Whether to return one keyset page (limit, cursor) instead of the whole report.
+    :return: The SQL and its parameters.
+    """
+    params = [owner_id, filters.course_id, filters.requested_from, filters.requested_to]
+
+    keyset_clause = ""
+    limit_clause = ""
+    if paginate:
+        if filters.cursor:
+            last_value, last_id = decode_cursor(filters.cursor)
+            params += [last_value, last_id]
+            keyset_clause = ENROLLMENT_REPORT_SORT_KEY.clause(False, len(params) - 1, len(params), id_expression="e.id")
+        params.append(filters.limit)
+        limit_clause = f"LIMIT ${len(params)}"
+
+    status_clause = ENROLLMENT_STATUS_CLAUSES.get(filters.status, "")
+
+    query = f"""{ENROLLED_STUDENTS_QUERY}
+        AND ($2::int IS NULL OR e.course_id = $2)
+        AND ($3::timestamptz IS NULL OR e.requested_at >= $3)
+        AND ($4::timestamptz IS NULL OR e.requested_at < $4)
+        {status_clause}
+        {keyset_clause}
+    ORDER BY {ENROLLMENT_REPORT_SORT_KEY.expression}, e.id
+    {limit_clause}
+    """
+    return query, tuple(params)
+
 async def report_enrolled_students_repo(owner_id: int,  get_data_func = read_query):
     """
     Retrieve a detailed report of enrolled students for a specific course owner.
@@ -39,19 +98,41 @@ async def report_enrolled_students_repo(owner_id: int,  get_data_func = read_que
         no data is found.
     :rtype: list | None
     """
-    query = """
-        SELECT e.student_id, s.email, s.first_name, s.last_name,
-           e.course_id, c.title, e.requested_at, e.approved_at, e.completed_at, e.drop_out, c.created_on
-        FROM v1.enrollments AS e
-            JOIN v1.courses AS c
-        ON e.course_id = c.id
-            JOIN v1.students AS s
-        ON e.student_id = s.id
-        WHERE c.owner_id = $1
+    report = await get_data_func(ENROLLED_STUDENTS_QUERY, (owner_id, ))
+    return report if report else None
+
+async def get_enrollment_report_page_repo(owner_id: int, filters: EnrollmentReportFilter, get_data_func = read_query):
     """
+    Retrieve one page of a course owner's filtered enrollment report, oldest request first.
 
-    report = await get_data_func(query, (owner_id, ))
-    return report if report else None
+    :param owner_id: The ID of the course owner.
+    :type owner_id: int
+    :param filters: Filters, page size (`limit`) and the keyset `cursor` of the previous page.
+    :type filters: EnrollmentReportFilter
+    :param get_data_func: An asynchronous callable that executes the query.
+        By default, it uses the `read_query` function.
+    :return: The enrollment rows of the page.
+    :rtype: list
+    """
+    query, params = enrollment_report_query(owner_id, filters, paginate=True)
+    return await get_data_func(query, params)
+
+async def stream_enrolled_students_repo(owner_id: int, filters: Optional[EnrollmentReportFilter] = None,
+                                        stream_data_func = stream_query):
+    """
+    Stream the enrollment report of a course owner row by row, oldest request first.
+
+    :param owner_id: The ID of the course owner whose enrollment report is streamed.
+    :type owner_id: int
+    :param filters: Optional course, status and request-time filters; paging fields are ignored.
+    :type filters: EnrollmentReportFilter | None
+    :param stream_data_func: An async generator function that executes the query.
+        By default, it uses the `stream_query` function.
+    :return: An async iterator over the enrollment report rows.
+    """
+    query, params = enrollment_report_query(owner_id, filters or EnrollmentReportFilter(), paginate=False)
+    async for row in stream_data_func(query, params):
+        yield row
 
 async def deactivate_course_repo(teacher_id: int, course_id: int, update_data_func = update_query):
     """
@@ -83,6 +164,8 @@ async def deactivate_course_repo(teacher_id: int, course_id: int, update_data_fu
     """
 
     result = await update_data_func(query, (teacher_id, course_id))
+    if result:
+        invalidate_course(course_id)
     return result if result else None
 
 async def verify_email_repo(teacher_id, update_data_func = update_query):
@@ -1,7 +1,7 @@
 from typing import Callable, Any, Union
 from pydantic import EmailStr
 from common.responses import BadRequest
-from data.database import read_query, insert_query
+from data.database import read_query, insert_query, update_query
 from data.models import StudentRegisterData, TeacherRegisterData, UserRole
 
 ALLOWED_ROLES = {
@@ -142,9 +142,9 @@ async def get_role_by_email_repo(
         get_data_func: Callable[[str, tuple], Any] = read_query
 ):
     """
-    Retrieves the role associated with a given email by querying specified database tables. The function
-    executes queries on tables corresponding to students, teachers, and admins, and returns the matching role
-    if found. If no role is associated with the email, it returns None.
+    Retrieves the role associated with a given email with one query on the `v1.accounts` view, which
+    unions students, teachers, and admins. If the email is used by several roles, the student role wins,
+    then teacher, then admin. If no role is associated with the email, it returns None.
 
     :param email: The email address to search for in the database.
     :type email: str
@@ -154,16 +154,51 @@ async def get_role_by_email_repo(
     :rtype: Optional[str]
     """
 
-    tables = {"v1.students": "student", "v1.teachers": "teacher", "v1.admins": "admin"}
-    
-    for table, role in tables.items():
-        query = f"SELECT 1 FROM {table} WHERE email = $1"
-        role_found = await get_data_func(query,(email,))
-        if role_found:
-            return role
-    else:
+    query = """
+        SELECT role
+        FROM v1.accounts
+        WHERE email = $1
+        ORDER BY role_rank
+        LIMIT 1
+    """
+    result = await get_data_func(query, (email,))
+    return result[0]["role"] if result else None
+
+async def get_identity_by_email_repo(
+        email,
+        get_data_func: Callable[[str, tuple], Any] = read_query
+):
+    """
+    Resolves everything a login needs for an email in a single query on the `v1.accounts` view:
+    the role, the password hash and the role's profile fields (the same fields as
+    `get_account_by_email_repo` returns for that role).
+
+    :param email: The email address to look up.
+    :type email: str
+    :param get_data_func: A callable function that executes queries. Defaults to `read_query`.
+    :type get_data_func: Callable[[str, tuple], Any]
+    :return: A dict with "role", "password" and "profile" keys, or None if no account uses the email.
+    :rtype: Optional[dict]
+    """
+    query = """
+        SELECT *
+        FROM v1.accounts
+        WHERE email = $1
+        ORDER BY role_rank
+        LIMIT 1
+    """
+    result = await get_data_func(query, (email,))
+    if not result:
         return None
 
+    account = result[0]
+    fields = ALLOWED_ROLES[account["role"]]["fields"].split(", ")
+    return {
+        "role": account["role"],
+        "password": account["password"],
+        "profile": {field: account[field] for field in fields},
+    }
+
 async def get_user_by_id_repo(
         user_id,
         role: str,
@@ -197,3 +232,38 @@ async def get_user_by_id_repo(
     result = await get_data_func(query, (user_id,))
     return result[0] if result else None
 
+
+async def update_password_hash_repo(
+        user_id,
+        role: str,
+        hashed_password: str,
+        update_data_func: Callable[[str, tuple], Any] = update_query
+):
+    """
+    Replaces the stored password hash of a user, e.g. when a login finds it was made with
+    outdated hashing settings.
+
+    :param user_id: The unique identifier of the user.
+    :type user_id: Any
+    :param role: The role of the user, used to determine the database table.
+    :type role: str
+    :param hashed_password: The new password hash.
+    :type hashed_password: str
+    :param update_data_func: A callable function for executing the update. Defaults to `update_query`.
+    :type update_data_func: Callable[[str, tuple], Any]
+    :return: The number of updated rows.
+    :rtype: int
+    :raises ValueError: If the provided role is not in the allowed roles.
+    """
+    role_info = ALLOWED_ROLES.get(role.lower())
+
+    if not role_info:
+        raise ValueError(f"Unsupported role: {role}")
+
+    query = f"""
+        UPDATE {role_info['table']}
+        SET password = $2
+        WHERE id = $1
+    """
+
+    return await update_data_func(query, (user_id, hashed_password))
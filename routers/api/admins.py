@@ -2,9 +2,11 @@ from fastapi import APIRouter, Depends
 from security.auth_dependencies import get_current_user
 from data.models import UserRole, CourseResponse, AdminCourseFilterOptions, AdminCourseListResponse, Action, Action_UserRole
 from common import responses
+from data.mapping import to_model, to_models
+from common.pagination import set_next_cursor
 from config.mailJet_config import course_deprecation_email, notify_user_for_account_state
-from services.admin_service import get_admin_courses_view_service, soft_delete_course_service, change_account_state
-from services.course_service import get_course_rating_service, get_course_by_id_service
+from services.admin_service import get_admin_courses_view_service, soft_delete_course_service, change_account_state, admin_courses_next_cursor, get_cache_stats_service
+from services.course_service import stream_course_rating_service, get_course_by_id_service
 from services.enrollment_service import unenroll_student_service
 from services.teacher_service import get_teacher_by_id
 from services.student_service import get_student_by_id
@@ -46,8 +48,7 @@ async def get_course_rating(course_id: int, payload: dict = Depends(get_current_
     """
     if not payload["role"] == UserRole.ADMIN:
         return responses.Forbidden(content="Admin authorisation required.")
-    rating = await get_course_rating_service(course_id)
-    return responses.Successful(content=rating)
+    return responses.StreamingJSONArray(stream_course_rating_service(course_id))
     
 @admins_router.put("/course/{course_id}/student/{student_id}")
 async def remove_student_from_course(course_id: int, student_id: int, payload: dict = Depends(get_current_user)):
@@ -77,7 +78,7 @@ async def soft_delete_course(course_id: int, payload: dict = Depends(get_current
     if not payload["role"] == UserRole.ADMIN:
         return responses.Forbidden(content="Admin authorisation required.")
 
-    course_response = CourseResponse(**await get_course_by_id_service(course_id))
+    course_response = to_model(CourseResponse, await get_course_by_id_service(course_id))
 
 
     student_emails, deleted_row_count = await soft_delete_course_service(course_id)
@@ -94,7 +95,8 @@ async def view_courses(filters:AdminCourseFilterOptions = Depends(), payload: di
     List all courses with advanced filters.
 
     Admins can filter by course title, teacher ID or student ID
-    and apply pagination with limit/offset.
+    and apply pagination with limit/offset, or with the cursor returned
+    in the X-Next-Cursor header of the previous page.
     """
     if not payload["role"] == UserRole.ADMIN:
         return responses.Forbidden(content="Admin authorisation required.")
@@ -104,7 +106,21 @@ async def view_courses(filters:AdminCourseFilterOptions = Depends(), payload: di
         teacher_id=filters.teacher_id,
         student_id=filters.student_id,
         limit=filters.limit,
-        offset=filters.offset
+        offset=filters.offset,
+        cursor=filters.cursor
     )
-    return [AdminCourseListResponse(**dict(row)) for row in result]
+    response = responses.Successful(content=to_models(AdminCourseListResponse, result))
+    set_next_cursor(response, admin_courses_next_cursor(result, filters.limit))
+    return response
 
+
+@admins_router.get("/cache/stats")
+async def cache_stats(payload: dict = Depends(get_current_user)):
+    """
+    Show hit ratio and size of the in-process caches of this worker process.
+
+    Admin access is required.
+    """
+    if not payload["role"] == UserRole.ADMIN:
+        return responses.Forbidden(content="Admin authorisation required.")
+    return get_cache_stats_service()
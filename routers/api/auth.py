@@ -2,17 +2,15 @@ from fastapi import APIRouter, Request, Depends
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from data.models import LoginData, StudentRegisterData, TeacherRegisterData, UserRole
-from services.user_service import email_exists, create_account, get_hash_by_email, get_role_by_email
+from services.user_service import email_exists, create_account, get_identity_by_email, update_password_hash
 from common import responses
 from typing import Union
-from security import secrets
 from security.jwt_auth import create_access_token
 from authlib.integrations.starlette_client import OAuth
 from starlette.config import Config
 from dotenv import load_dotenv
-from repositories.user_repo import get_account_by_email_repo
 import os
-from security.secrets import verify_password
+from security.secrets import verify_and_update_password, hash_password_async
 from services.teacher_service import get_teacher_by_id
 from config.mailJet_config import teacher_verify_email, admin_teacher_aproval
 
@@ -37,7 +35,7 @@ oauth.register(
 async def _authenticate_user(email: str, password: str):
     """
     Authenticates a user by verifying their email and password credentials. This
-    function checks if the email exists in the database, validates the password,
+    function looks up the account by email in one query, validates the password,
     and ensures the user account is active. If the credentials are valid, it generates
     an access token and returns it along with the token type. If the account is blocked
     or still in the process of activation, appropriate messages are returned.
@@ -51,16 +49,21 @@ async def _authenticate_user(email: str, password: str):
     :rtype: responses.Successful or responses.Unauthorized
     """
 
-    if not await email_exists(email):
-        return responses.Unauthorized("Wrong Credentials!")
-    
-    hashed_pw = await get_hash_by_email(email)
-    if not verify_password(password, hashed_pw):
+    # Role, password hash and profile come from a single query
+    identity = await get_identity_by_email(email)
+    if not identity:
         return responses.Unauthorized("Wrong Credentials!")
 
-    role = await get_role_by_email(email)
+    # bcrypt runs on the password worker pool, not on the event loop
+    valid, new_hash = await verify_and_update_password(password, identity["password"])
+    if not valid:
+        return responses.Unauthorized("Wrong Credentials!")
 
-    profile = await get_account_by_email_repo(email, role)
+    role = identity["role"]
+    profile = identity["profile"]
+    if new_hash:
+        # The stored hash used outdated settings - replace it while the plain password is at hand
+        await update_password_hash(profile["id"], role, new_hash)
     if profile.get("is_active") == False:
         if role == UserRole.STUDENT:
             return responses.Unauthorized(content=f"This accound is blocked by admin. Please contact ADMIN team at {admin_email}.")
@@ -128,7 +131,7 @@ async def register(register_data: Union[TeacherRegisterData, StudentRegisterData
     if await email_exists(register_data.email):
         return responses.BadRequest(content="Email already registered.")
     
-    role, role_id = await create_account(register_data, secrets.hash_password(register_data.password))
+    role, role_id = await create_account(register_data, await hash_password_async(register_data.password))
 
     if role == UserRole.TEACHER:
         teacher_object = await get_teacher_by_id(role_id)
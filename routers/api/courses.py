@@ -5,13 +5,19 @@ from services.course_service import (
     get_all_courses_per_student_service,
     create_course_service,
     update_course_service,
-    get_all_courses_service)
+    get_all_courses_service,
+    public_courses_next_cursor,
+    teacher_courses_next_cursor,
+    student_courses_next_cursor)
 from services.section_service import (
     create_section_service,update_section_service, get_all_sections_per_course_service,
     hide_section_service,is_student_allowed_to_view_sections)
+from services.course_import_service import (
+    parse_course_bundle, parse_csv_sections, parse_json_section_list, import_course_service, import_sections_service)
 from data.models import CourseCreate, CourseBase, CourseUpdate, SectionCreate, SectionUpdate, CourseFilterOptions, UserRole, TeacherCourseFilter, StudentCourseFilter
 from fastapi.security import OAuth2PasswordBearer
-from common.responses import Unauthorized, NotFound, Created, Successful, Forbidden
+from common.responses import Unauthorized, NotFound, Created, Successful, Forbidden, BadRequest
+from common.pagination import set_next_cursor
 from security.auth_dependencies import get_current_user
 from services.teacher_service import get_teacher_by_email, validate_teacher_verified_and_activated
 from router_helper import router_helper
@@ -29,6 +35,7 @@ async def get_all_courses(request: Request, filters: CourseFilterOptions = Depen
 
     Returns public courses for anonymous users.
     If a student is authenticated and subscribed, premium courses are included.
+    The X-Next-Cursor header carries the cursor for the next page.
     """
     auth: Optional[str] = request.headers.get("Authorization") #get auth header
     student_id = None
@@ -43,7 +50,10 @@ async def get_all_courses(request: Request, filters: CourseFilterOptions = Depen
             except Exception:
                 pass  # for anonymous users
 
-    return await get_all_courses_service(filters, student_id)
+    courses = await get_all_courses_service(filters, student_id)
+    response = Successful(content=courses)
+    set_next_cursor(response, public_courses_next_cursor(courses, filters))
+    return response
 
 
 @courses_router.get("/student")
@@ -57,7 +67,10 @@ async def get_all_courses_per_student(filters: StudentCourseFilter = Depends(),
     if payload.get("role") != UserRole.STUDENT:
         return Unauthorized(content="Only students can view the courses they are enrolled to.")
     
-    return await get_all_courses_per_student_service(payload.get("id"), filters)
+    courses = await get_all_courses_per_student_service(payload.get("id"), filters)
+    response = Successful(content=courses)
+    set_next_cursor(response, student_courses_next_cursor(courses, filters))
+    return response
 
 @courses_router.get("/teacher")
 async def get_all_courses_per_teacher(filters: TeacherCourseFilter = Depends(), payload: dict = Depends(get_current_user)):
@@ -70,7 +83,10 @@ async def get_all_courses_per_teacher(filters: TeacherCourseFilter = Depends(),
     if payload.get("role") != UserRole.TEACHER:
         return Unauthorized(content="Only teachers can view the courses they own.")    
     
-    return await get_all_courses_per_teacher_service(payload.get("id"), filters)
+    courses = await get_all_courses_per_teacher_service(payload.get("id"), filters)
+    response = Successful(content=courses)
+    set_next_cursor(response, teacher_courses_next_cursor(courses, filters))
+    return response
 
 @courses_router.post("/")
 async def create_course(course_data: CourseBase, payload: dict = Security(get_current_user)):
@@ -91,6 +107,64 @@ async def create_course(course_data: CourseBase, payload: dict = Security(get_cu
 
     return Created(content={"new_id" : new_id, "message": f"Course with id {new_id} created"})
 
+@courses_router.post("/import")
+async def import_course(request: Request, payload: dict = Security(get_current_user)):
+    """
+    Create a course together with all of its sections (Teacher only).
+
+    Body (application/json):
+
+        {
+            "course": {"title": "...", "description": "...", "tags": "...", "picture_url": "...", "is_premium": false},
+            "sections": [{"title": "...", "content": "...", "description": "..."}, ...]
+        }
+
+    Sections are validated while they are bulk loaded; the import is all-or-nothing,
+    and the first invalid section is reported by its number.
+    """
+    if payload["role"] != UserRole.TEACHER:
+        return Unauthorized(content="Only teachers can import courses")
+
+    id = await router_helper.get_teacher_id(payload.get("email"))
+    if not await validate_teacher_verified_and_activated(id):
+        return Forbidden(content="Account is not verified/activated still. Please verify your email first.")
+
+    course, sections = parse_course_bundle(await request.body())
+    new_id, imported = await import_course_service(id, course, sections)
+
+    return Created(content={"new_id": new_id, "sections": imported,
+                            "message": f"Course with id {new_id} created with {imported} sections"})
+
+@courses_router.post("/{course_id}/sections/import")
+async def import_sections(course_id: int, request: Request, payload: dict = Security(get_current_user)):
+    """
+    Add many sections to a course at once (course owner only).
+
+    Body, by Content-Type:
+    - application/json: a list of sections, as in POST /courses/{course_id}/sections
+    - text/csv: a header row with title, content, description and optionally is_hidden, then one row per section
+
+    The CSV body is validated as it streams in. The import is all-or-nothing,
+    and the first invalid section is reported by its number.
+    """
+    if payload["role"] != UserRole.TEACHER:
+        return Unauthorized(content="Only teachers can import sections")
+
+    id = await router_helper.get_teacher_id(payload.get("email"))
+    await router_helper.verify_course_owner(course_id, id)
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "text/csv":
+        sections = parse_csv_sections(request.stream())
+    elif content_type == "application/json":
+        sections = parse_json_section_list(await request.body())
+    else:
+        return BadRequest(content="Send the sections as application/json or text/csv")
+
+    imported = await import_sections_service(course_id, sections)
+
+    return Created(content={"sections": imported, "message": f"{imported} sections added to course {course_id}"})
+
 @courses_router.patch("/{course_id}")
 async def update_course(course_id: int, updates: CourseUpdate, payload: dict = Security(get_current_user)):
     """
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response
+from services.metrics_service import get_metrics_service
+
+metrics_router = APIRouter(tags=["metrics"])
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint: query latencies per repository function and the
+    counters of the in-process caches, password hashing and e-mail delivery.
+
+    Not authenticated, like any scrape target - restrict it to the monitoring network
+    at the proxy.
+    """
+    content, media_type = get_metrics_service()
+    return Response(content=content, media_type=media_type)
@@ -1,22 +1,20 @@
 from fastapi import APIRouter, UploadFile, File, Body, Depends
 from typing import Optional
 from config.mailJet_config import teacher_approve_enrollment
-from config.cloudinary_config import upload_avatar
+from services.avatar_service import start_avatar_upload, get_avatar_upload_job
 from security.auth_dependencies import get_current_user
 from fastapi.security import OAuth2PasswordBearer
-from services.course_service import enroll_course, count_premium_enrollments, get_course_by_id_service
-from services.enrollment_service import unenroll_student_service
+from services.enrollment_service import unenroll_student_service, enroll_student_service
 from services.student_service import (
-    update_avatar_url,
     get_student_by_email,
     update_student_service,
-    get_student_courses_service,
+    stream_student_courses_service,
     get_student_courses_progress_service,
-    rate_course_service, complete_section_service,
+    get_student_course_progress_service,
+    rate_course_service, complete_section_service, complete_sections_service,
     complete_course_service, check_enrollment_service
 )
-from services.teacher_service import get_teacher_by_id
-from services.subscription_service import subscribe, is_subscribed
+from services.subscription_service import subscribe
 from data.models import (
     SubscriptionResponse,
     UpdateStudentRequest,
@@ -24,8 +22,9 @@ from data.models import (
     CourseStudentResponse,
     CoursesProgressResponse,
     TeacherResponse,
-    CourseResponse, UserRole)
+    CourseResponse, UserRole, SectionCompletionBatch)
 from common import responses
+from data.mapping import to_model, to_models, to_model_stream
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
@@ -43,7 +42,7 @@ async def get_profile(payload: dict = Depends(get_current_user)):
     if payload.get("role") != "student":
         return responses.Forbidden(content="Only a Student user can perform this action")
     student = await get_student_by_email(payload.get("email"))
-    return responses.Successful(content=StudentResponse(**student).model_dump(mode="json"))
+    return responses.Successful(content=to_model(StudentResponse, student))
 
 @students_router.put("/account")
 async def update_student(
@@ -70,7 +69,7 @@ async def update_student(
         payload.get("role")
     )
 
-    return responses.Successful(content=StudentResponse(**student).model_dump(mode="json"))
+    return responses.Successful(content=to_model(StudentResponse, student))
 
 @students_router.get("/courses")
 async def get_student_courses(payload: dict = Depends(get_current_user)):
@@ -84,17 +83,16 @@ async def get_student_courses(payload: dict = Depends(get_current_user)):
     :param payload: The request payload containing user information, typically
         resolved using the dependency injection.
     :type payload: dict
-    :return: A successful response containing the list of student courses if the
-        user is a student, or a forbidden response if the user lacks the required role.
-    :rtype: JSONResponse
+    :return: A response streaming the list of student courses if the user is a
+        student, or a forbidden response if the user lacks the required role.
+    :rtype: StreamingJSONArray | JSONResponse
     """
     if payload.get("role") != "student":
         return responses.Forbidden(content="Only a Student user can perform this action")
 
-    student_courses = await get_student_courses_service(payload.get("id")) or []
-    student_courses_response = [CourseStudentResponse(**sc).model_dump(mode="json") for sc in student_courses]
+    student_courses = stream_student_courses_service(payload.get("id"))
 
-    return responses.Successful(content=student_courses_response)
+    return responses.StreamingJSONArray(to_model_stream(CourseStudentResponse, student_courses))
 
 @students_router.get("/courses/progress")
 async def get_student_courses_progress(payload: dict = Depends(get_current_user)):
@@ -109,7 +107,7 @@ async def get_student_courses_progress(payload: dict = Depends(get_current_user)
 
     progress_data = await get_student_courses_progress_service(payload.get("id"))
     # progress_data["progress"] = str(progress_data["progress"]) + "%"
-    progress_response = [CoursesProgressResponse(**prd).model_dump(mode="json") for prd in progress_data]
+    progress_response = to_models(CoursesProgressResponse, progress_data)
 
     return responses.Successful(content=progress_response)
 
@@ -119,24 +117,32 @@ async def upload_avatar_photo(file: UploadFile = File(...), payload: dict = Depe
     """
     Upload and update the student's profile avatar.
 
-    Uploads an image to cloud storage and updates the avatar URL in the profile.
+    The image is validated and accepted right away; uploading it to cloud storage
+    and updating the avatar URL in the profile happen in the background.
 
     Returns:
-        The updated student profile with the new avatar URL.
+        The id of the upload job; poll GET /students/avatar/{job_id} for its result.
     """
     email = payload.get("email")
     student_profile = await get_student_by_email(email)
     if student_profile:
-        # Uploading and generating URL
-        url = await upload_avatar(file, email)
-
-        # Updating URL in database
-        await update_avatar_url(url, email)
-        
-        if student_profile: 
-            return responses.Created(content=StudentResponse(**student_profile).model_dump(mode="json"))
+        job = await start_avatar_upload(file, email)
+        return responses.Accepted(content={**job.to_dict(), "status_url": f"/students/avatar/{job.id}"})
     return responses.BadRequest(content="Account missmatch. Please login as student and try again.")
 
+@students_router.get('/avatar/{job_id}')
+async def get_avatar_upload_status(job_id: str, payload: dict = Depends(get_current_user)):
+    """
+    Check the status of an avatar upload.
+
+    Returns:
+        The job status ("pending", "succeeded" or "failed") and the new avatar URL once uploaded.
+    """
+    job = get_avatar_upload_job(job_id, payload.get("email"))
+    if not job:
+        return responses.NotFound(content=f"There is no avatar upload with id {job_id}")
+    return responses.Successful(content=job.to_dict())
+
 @students_router.post("/subscribe")
 async def subscribe_student(payload: dict = Depends(get_current_user)):
     """
@@ -149,7 +155,7 @@ async def subscribe_student(payload: dict = Depends(get_current_user)):
     """
     student = await get_student_by_email(payload.get("email"))
     subscription = await subscribe(student[0])
-    return responses.Created(content=SubscriptionResponse(**subscription).model_dump(mode="json"))
+    return responses.Created(content=to_model(SubscriptionResponse, subscription))
 
 @students_router.post("/enroll/{course_id}")
 async def enroll(course_id: int, payload: dict = Depends(get_current_user)):
@@ -158,6 +164,8 @@ async def enroll(course_id: int, payload: dict = Depends(get_current_user)):
 
     Validates subscription status for premium courses, checks enrollment limits,
     and sends a notification to the course's teacher for approval.
+    The checks and the insert run as one statement; the teacher notification
+    is queued and sent in the background.
 
     Path Parameters:
         course_id: ID of the course to enroll in.
@@ -165,41 +173,31 @@ async def enroll(course_id: int, payload: dict = Depends(get_current_user)):
     Returns:
         Enrollment status message.
     """
-    # allowed by default
-    allowed = True
-
-    # Checking if course is premium
-    course = await get_course_by_id_service(course_id)
     student_id = payload.get("id")
-    if course:
-        if course[5] == True:
-        # Check if student is subscribed
-            if await is_subscribed(student_id):
-                # Checking premium courses enrollment count.
-                premium_enrollments_count = await count_premium_enrollments((payload.get("id")))
-                if premium_enrollments_count >= 5:
-                    allowed = False
-                    return responses.Unauthorized(content="Student is already enrolled to 5 premium courses. First complete or cancel enrollment.")
-            else: 
-                allowed = False
-                return responses.Forbidden(content="Course enrollment requires premium subscription!")
-    else:
-        allowed = False 
-        return responses.BadRequest(content=f"There is no course with id {course_id}")
-    
-
-    if allowed:
-        teacher_data = await get_teacher_by_id(course[6])
-
-        # Gathering all obejects needed
-        enrollment_id = await enroll_course(course_id, student_id)
-        course_object = CourseResponse(**(await get_course_by_id_service(course_id)))
-        student_object = StudentResponse(**payload)
-
-        # Sending enrollment request to course owner
-        await teacher_approve_enrollment(teacher_data, student_object, course_object, enrollment_id)
+    result = await enroll_student_service(course_id, student_id)
 
-        return responses.Created(content=f"Enrollment created. Course teacher will be notified about your interest.")
+    if not result:
+        return responses.BadRequest(content=f"There is no course with id {course_id}")
+    if not result["subscribed"]:
+        return responses.Forbidden(content="Course enrollment requires premium subscription!")
+    if not result["within_premium_limit"]:
+        return responses.Unauthorized(content="Student is already enrolled to 5 premium courses. First complete or cancel enrollment.")
+    if result["enrollment_id"] is None:
+        return responses.BadRequest(content="Student is already enrolled to this course.")
+
+    # Gathering all obejects needed
+    teacher_data = to_model(TeacherResponse, {
+        "id": result["owner_id"],
+        "email": result["teacher_email"],
+        "mobile": result["teacher_mobile"],
+        "linked_in_url": result["teacher_linked_in_url"]})
+    course_object = to_model(CourseResponse, result)
+    student_object = StudentResponse(**payload)
+
+    # Sending enrollment request to course owner
+    await teacher_approve_enrollment(teacher_data, student_object, course_object, result["enrollment_id"])
+
+    return responses.Created(content=f"Enrollment created. Course teacher will be notified about your interest.")
 
 @students_router.put("/unenroll/{course_id}")
 async def unenroll(course_id: int, payload: dict = Depends(get_current_user)):
@@ -252,6 +250,32 @@ async def rate_course(course_id: int, rating: int = Body(...), payload: dict = D
     
 
 
+@students_router.post("/{course_id}/sections/complete")
+async def complete_sections(course_id: int, batch: SectionCompletionBatch, payload: dict = Depends(get_current_user)):
+    """
+    Mark several sections of a course as completed at once.
+
+    Meant for clients replaying completions made offline. Enrollment is checked once
+    and all sections are saved in a single statement.
+
+    Path Parameters:
+        course_id: ID of the course.
+
+    Returns:
+        One result per section: "completed", or "not_in_course" for ids that are not sections of the course.
+    """
+    if payload.get("role") != UserRole.STUDENT:
+        return responses.Unauthorized(content="Only students can complete sections.")
+
+    student_id = payload.get("id")
+    enrolled = await check_enrollment_service(course_id, student_id)
+
+    if not enrolled:
+        return responses.Forbidden(content="You must be enrolled to complete a section.")
+
+    results = await complete_sections_service(student_id, course_id, batch.section_ids)
+    return responses.Successful(content={"results": results})
+
 @students_router.post("/{course_id}/sections/{section_id}/complete")
 async def complete_section(course_id: int, section_id: int, payload: dict = Depends(get_current_user)):
     """
@@ -301,8 +325,7 @@ async def complete_course(course_id: int, payload: dict = Depends(get_current_us
     if not enrolled:
         return responses.Forbidden(content="You must be enrolled to complete this course.")
 
-    progress_data = await get_student_courses_progress_service(student_id)
-    course_progress = next((course for course in progress_data if course["course_id"] == course_id), None)
+    course_progress = await get_student_course_progress_service(student_id, course_id)
 
     if not course_progress:
         return responses.NotFound(content="Course progress data not found.")
@@ -1,17 +1,21 @@
 from fastapi import APIRouter
 from fastapi.params import Depends, Body
-from data.models import TeacherResponse, EnrollmentReport
+from data.models import TeacherResponse, EnrollmentReport, EnrollmentReportFilter, ReportFormat
 from security.auth_dependencies import get_current_user
 from services.teacher_service import (
     get_teacher_by_email,
     update_teacher_service,
-    get_enrolled_students,
+    stream_enrolled_students,
+    get_enrollment_report_page,
+    enrollment_report_next_cursor,
     deactivate_course_service, 
     confirm_enrollment,
     verify_email,
 )
 from services.enrollment_service import get_enrollment_by_id
 from common import responses
+from data.mapping import to_model, to_models, to_model_stream
+from common.pagination import set_next_cursor
 from router_helper import router_helper
 
 teachers_router = APIRouter(prefix="/teachers", tags=["teachers"])
@@ -26,7 +30,7 @@ async def get_profile(payload: dict = Depends(get_current_user)):
     """
     teacher = await get_teacher_by_email(payload["email"])
     if teacher:
-        return responses.Successful(content=TeacherResponse(**teacher).model_dump(mode="json"))
+        return responses.Successful(content=to_model(TeacherResponse, teacher))
     else:
         return responses.Forbidden(content="Only a Teacher user can perform this action")
 
@@ -83,24 +87,36 @@ async def update_teacher(
     
     teacher = await update_teacher_service(mobile, linked_in_url, email)
 
-    return responses.Successful(content=TeacherResponse(**teacher).model_dump(mode="json"))
+    return responses.Successful(content=to_model(TeacherResponse, teacher))
 
 
 # Teachers should be able to generate reports for the past and current students that have subscribed for their courses.
 @teachers_router.get("/enrollment/report")
-async def generate_report(payload: dict = Depends(get_current_user)):
+async def generate_report(filters: EnrollmentReportFilter = Depends(), payload: dict = Depends(get_current_user)):
     """
     Generate a report of students enrolled in the teacher’s courses.
 
-    Returns historical and current enrollments.
+    Returns historical and current enrollments, oldest request first, optionally filtered
+    by course, status and request time.
+    - format=json (default): one page of `limit` enrollments; the X-Next-Cursor header
+      carries the cursor for the next page.
+    - format=csv / format=ndjson: the whole report as a download, streamed as it is read.
     """
     if not await get_teacher_by_email(payload["email"]):
             return responses.NotFound(content="You need to be Teacher for this action.")
 
-    repo_records = await get_enrolled_students(payload["id"])
-    report_list = [EnrollmentReport(**r).model_dump(mode="json") for r in repo_records]
+    if filters.format != ReportFormat.json:
+        repo_records = stream_enrolled_students(payload["id"], filters)
+        report = to_model_stream(EnrollmentReport, repo_records)
+        if filters.format == ReportFormat.csv:
+            return responses.StreamingCSV(report, list(EnrollmentReport.model_fields), filename="enrollment-report.csv")
+        return responses.StreamingNDJSON(report, filename="enrollment-report.ndjson")
 
-    return responses.Successful(content=report_list)
+    repo_records = await get_enrollment_report_page(payload["id"], filters)
+    response = responses.Successful(content=to_models(EnrollmentReport, repo_records))
+    set_next_cursor(response, enrollment_report_next_cursor(repo_records, filters))
+
+    return response
 
 # Teachers to deactivate only courses to which they are owners when there are no student enrollments
 # The SQL query checks for enrollments and updates at the same time.
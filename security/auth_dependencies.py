@@ -1,9 +1,12 @@
 from fastapi import Depends, HTTPException, status, Security
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from collections import OrderedDict
+from hashlib import sha256
 from typing import Optional
 from os import getenv
 import os
+import time
 
 # Point FastAPI where the token is expected (Authorization header with Bearer scheme)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")  # change here if token URL is different
@@ -11,7 +14,42 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")  # change here if token
 SECRET_KEY = getenv("SECRET_KEY")
 ALGORITHM = getenv("ALGORITHM")
 
-def get_current_user(token: str = Security(oauth2_scheme)) -> dict:
+# Verified token payloads, keyed by the SHA-256 of the token. An entry lives until the
+# token's `exp`, and never longer than JWT_CACHE_MAX_TTL seconds (tokens without `exp`).
+JWT_CACHE_SIZE = int(getenv("JWT_CACHE_SIZE", "4096"))
+JWT_CACHE_MAX_TTL = float(getenv("JWT_CACHE_MAX_TTL", "300"))
+
+_payload_cache: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+
+
+def _cached_payload(key: bytes) -> Optional[dict]:
+    entry = _payload_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, payload = entry
+    if expires_at <= time.time():
+        del _payload_cache[key]
+        return None
+    _payload_cache.move_to_end(key)
+    return payload
+
+def _cache_payload(key: bytes, payload: dict):
+    if JWT_CACHE_SIZE <= 0:
+        return
+    expires_at = time.time() + JWT_CACHE_MAX_TTL
+    if isinstance(payload.get("exp"), (int, float)):
+        expires_at = min(expires_at, payload["exp"])
+    _payload_cache[key] = (expires_at, payload)
+    _payload_cache.move_to_end(key)
+    while len(_payload_cache) > JWT_CACHE_SIZE:
+        _payload_cache.popitem(last=False)
+
+async def get_current_user(token: str = Security(oauth2_scheme)) -> dict:
+    key = sha256(token.encode()).digest()
+    payload = _cached_payload(key)
+    if payload is not None:
+        return dict(payload)
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: Optional[str] = payload.get("email")
@@ -20,7 +58,8 @@ def get_current_user(token: str = Security(oauth2_scheme)) -> dict:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token payload",
             )
-        return payload  # if needed we can fetch full user info from DB
+        _cache_payload(key, payload)
+        return dict(payload)  # if needed we can fetch full user info from DB
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
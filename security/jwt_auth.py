@@ -8,9 +8,15 @@ from os import getenv
 
 SECRET_KEY = getenv("SECRET_KEY")
 ALGORITHM = getenv("ALGORITHM")
+# Lifetime of issued tokens when the caller passes no expires_delta; unset means tokens never expire
+ACCESS_TOKEN_EXPIRE_MINUTES = getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
+    if expires_delta is None and ACCESS_TOKEN_EXPIRE_MINUTES:
+        expires_delta = timedelta(minutes=int(ACCESS_TOKEN_EXPIRE_MINUTES))
+    if expires_delta is not None:
+        to_encode["exp"] = datetime.now(timezone.utc) + expires_delta
 
     token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return {"JWT": token}
@@ -1,10 +1,62 @@
-
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from os import getenv
+from typing import Optional
+from fastapi import HTTPException
 from passlib.context import CryptContext
 
 password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so hashing on a thread pool runs in parallel without blocking the event loop.
+# At most PASSWORD_HASH_CONCURRENCY hashes run at once; callers beyond that wait in line, and once
+# PASSWORD_HASH_MAX_QUEUE are waiting, new ones are turned away with 503 instead of piling up.
+PASSWORD_HASH_CONCURRENCY = int(getenv("PASSWORD_HASH_CONCURRENCY", "4"))
+PASSWORD_HASH_MAX_QUEUE = int(getenv("PASSWORD_HASH_MAX_QUEUE", "200"))
+
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_CONCURRENCY, thread_name_prefix="bcrypt")
+_hash_slots = asyncio.Semaphore(PASSWORD_HASH_CONCURRENCY)
+
+# Process-wide counters: current queue depth and running hashes, totals, and time spent waiting for a slot
+password_hash_stats = {"waiting": 0, "running": 0, "completed": 0, "rejected": 0, "wait_seconds_total": 0.0}
+
+
 def hash_password(password: str) ->str:
     return password_context.hash(password)
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    return password_context.verify(password, hashed_password)
\ No newline at end of file
+    return password_context.verify(password, hashed_password)
+
+async def _run_bounded(func, *args):
+    if password_hash_stats["waiting"] >= PASSWORD_HASH_MAX_QUEUE:
+        password_hash_stats["rejected"] += 1
+        raise HTTPException(status_code=503, detail="Too many login attempts in progress, please retry")
+
+    queued_at = time.perf_counter()
+    password_hash_stats["waiting"] += 1
+    try:
+        await _hash_slots.acquire()
+    finally:
+        password_hash_stats["waiting"] -= 1
+    password_hash_stats["wait_seconds_total"] += time.perf_counter() - queued_at
+
+    password_hash_stats["running"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        password_hash_stats["running"] -= 1
+        password_hash_stats["completed"] += 1
+        _hash_slots.release()
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the bcrypt worker pool."""
+    return await _run_bounded(password_context.hash, password)
+
+async def verify_and_update_password(password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password on the bcrypt worker pool.
+
+    :return: (valid, new_hash). new_hash is set when the password is valid but the stored hash
+        uses outdated settings (passlib's needs_update), and should replace the stored one.
+    """
+    return await _run_bounded(password_context.verify_and_update, password, hashed_password)
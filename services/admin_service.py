@@ -1,8 +1,12 @@
 from repositories.admin_repo import change_account_state_repo, soft_delete_course_repo
 from repositories.teacher_repo import report_enrolled_students_repo
-from repositories.course_repo import get_course_by_id_repo, admin_course_view_repo
+from repositories.course_repo import get_course_by_id_repo, admin_course_view_repo, ADMIN_SORT_KEY
 from repositories.enrollments_repo import unenroll_all_by_course_id_repo
 from data.models import Action_UserRole, Action
+from data.database import unit_of_work, statement_cache_stats
+from data.cache import course_cache
+from common.pagination import next_cursor
+from typing import Optional
 
 async def change_account_state(role: Action_UserRole, action: Action, user_id: int) -> int | None:
     """
@@ -17,30 +21,34 @@ async def change_account_state(role: Action_UserRole, action: Action, user_id: i
 
 async def soft_delete_course_service(course_id: int) -> tuple[list[str], int] | tuple[None, None]:
     """
+    Hiding the course and unenrolling its students run in one transaction.
+
     :param course_id:
     :return tuple[list[str], int] | tuple[None, None]:
     """
-    course_data = await get_course_by_id_repo(course_id)
-    if course_data:
-        owner_id = course_data["owner_id"]
-        enrolled_students_data = await report_enrolled_students_repo(owner_id)
+    async with unit_of_work(transaction=True):
+        course_data = await get_course_by_id_repo(course_id)
+        if course_data:
+            owner_id = course_data["owner_id"]
+            enrolled_students_data = await report_enrolled_students_repo(owner_id)
+
+            soft_deleted_row_count = await soft_delete_course_repo(course_id)
+            if soft_deleted_row_count:
+                await unenroll_all_by_course_id_repo(course_id)
+
+            student_emails = [row["email"] for row in enrolled_students_data]
 
-        soft_deleted_row_count = await soft_delete_course_repo(course_id)
-        if soft_deleted_row_count:
-            await unenroll_all_by_course_id_repo(course_id)
-        
-        student_emails = [row["email"] for row in enrolled_students_data]
-        
-        return student_emails, soft_deleted_row_count
-    else:
-        return None, None
+            return student_emails, soft_deleted_row_count
+        else:
+            return None, None
 
 async def get_admin_courses_view_service(
         title: str = "",
         teacher_id: int = None,
         student_id: int = None,
         limit: int = 5,
-        offset: int = 0):
+        offset: int = 0,
+        cursor: Optional[str] = None):
     """
 
     :param title: "" | course title to filter by.
@@ -48,6 +56,7 @@ async def get_admin_courses_view_service(
     :param student_id: None | student_id to filter by.
     :param limit: 5 | limit of rows to return.
     :param offset: 0 | offset of rows to return.
+    :param cursor: None | keyset cursor of the previous page, takes precedence over offset.
     :return: Record(
         id,
         title,
@@ -60,8 +69,16 @@ async def get_admin_courses_view_service(
         students_count,
         average_rating)
     """
-    return await admin_course_view_repo(title, teacher_id, student_id, limit, offset)
-
+    return await admin_course_view_repo(title, teacher_id, student_id, limit, offset, cursor)
 
+def admin_courses_next_cursor(courses, limit: int) -> Optional[str]:
+    """Build the cursor for the page following `courses` in the admin listing, or None on the last page."""
+    return next_cursor(courses, limit, ADMIN_SORT_KEY)
 
 
+def get_cache_stats_service() -> dict:
+    """
+    :return: dict -- hit ratio and size of the in-process course cache and the
+        prepared statement cache counters of this process.
+    """
+    return {"course_cache": course_cache.stats(), "statement_cache": dict(statement_cache_stats)}
@@ -0,0 +1,98 @@
+"""
+Asynchronous avatar uploads.
+
+The request handler only spools the upload (see `read_avatar`) and registers a job;
+the Cloudinary upload and the avatar URL update run in a background task. Clients
+poll the job by id until it has succeeded or failed.
+
+The task starts from an empty context rather than a copy of the request's, so it does
+not inherit the request's unit of work (closed by the time the task queries the
+database) and opens its own.
+"""
+
+
+import asyncio
+import contextvars
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+from fastapi import UploadFile
+from config.cloudinary_config import read_avatar, upload_avatar
+from data.database import unit_of_work
+from services.student_service import update_avatar_url
+
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs are kept this long (seconds) for polling, and at most this many jobs overall
+JOB_RETENTION = 3600
+MAX_JOBS = 10_000
+
+
+@dataclass
+class AvatarUploadJob:
+    email: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "pending"
+    url: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return {"job_id": self.id, "status": self.status, "url": self.url, "error": self.error}
+
+
+_jobs: OrderedDict[str, AvatarUploadJob] = OrderedDict()
+_tasks: set[asyncio.Task] = set()
+
+
+def _prune():
+    now = time.time()
+    while _jobs:
+        oldest = next(iter(_jobs.values()))
+        expired = oldest.finished_at is not None and now - oldest.finished_at > JOB_RETENTION
+        if not expired and len(_jobs) <= MAX_JOBS:
+            break
+        _jobs.popitem(last=False)
+
+async def start_avatar_upload(image_file: UploadFile, email: str) -> AvatarUploadJob:
+    """
+    Validate and spool the uploaded file, then upload it in the background.
+
+    :param image_file: The uploaded image.
+    :param email: Email of the student whose avatar is replaced.
+    :return: The pending job; poll it with `get_avatar_upload_job`.
+    :raises HTTPException: 413 when the file is too large, 415 when it is not an image.
+    """
+    spooled = await read_avatar(image_file)
+    job = AvatarUploadJob(email=email)
+    _prune()
+    _jobs[job.id] = job
+
+    task = contextvars.Context().run(asyncio.create_task, _run(job, spooled))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+async def _run(job: AvatarUploadJob, spooled):
+    try:
+        job.url = await upload_avatar(spooled, job.email)
+        async with unit_of_work():
+            await update_avatar_url(job.url, job.email)
+        job.status = "succeeded"
+    except Exception as exc:
+        logger.exception("Avatar upload %s failed", job.id)
+        job.status = "failed"
+        job.error = str(exc)
+    finally:
+        spooled.close()
+        job.finished_at = time.time()
+
+def get_avatar_upload_job(job_id: str, email: str) -> Optional[AvatarUploadJob]:
+    """Return the job with job_id if it belongs to the student with this email."""
+    job = _jobs.get(job_id)
+    return job if job is not None and job.email == email else None
@@ -0,0 +1,191 @@
+"""
+Bulk import of courses and their sections.
+
+Request bodies are parsed and validated one section at a time while the rows are being
+copied into v1.course_sections (see copy_sections_repo), so a course with hundreds of
+sections is a single COPY in one transaction instead of one INSERT per section. The first
+invalid section aborts the COPY and nothing of the import is kept.
+
+Two body formats are accepted:
+
+- JSON: {"course": {...CourseBase}, "sections": [{...SectionCreate}, ...]} for a new
+  course, or just the list of sections when importing into an existing course.
+- CSV (sections only): a header row naming the columns title, content, description and
+  optionally is_hidden, then one row per section. Fields may span lines when quoted.
+"""
+
+
+import codecs
+import csv
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Union
+from asyncpg.exceptions import StringDataRightTruncationError, UniqueViolationError
+from fastapi.exceptions import HTTPException
+from pydantic import ValidationError
+from data.database import unit_of_work
+from data.models import CourseBase, CourseCreate, SectionCreate
+from repositories.course_repo import insert_course_repo
+from repositories.section_repo import copy_sections_repo
+
+# Upper bound of sections in one import
+MAX_IMPORT_SECTIONS = 1000
+
+CSV_REQUIRED_COLUMNS = ("title", "content", "description")
+CSV_COLUMNS = CSV_REQUIRED_COLUMNS + ("is_hidden",)
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'value'}: {e['msg']}" for e in error.errors())
+
+def _validate_section(number: int, data) -> SectionCreate:
+    if number > MAX_IMPORT_SECTIONS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_IMPORT_SECTIONS} sections can be imported at once")
+    try:
+        return SectionCreate.model_validate(data)
+    except ValidationError as error:
+        raise HTTPException(status_code=422, detail=f"Section {number}: {_describe(error)}")
+
+def _load_json(body: bytes):
+    try:
+        return json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {error}")
+
+def parse_json_sections(sections) -> Iterator[SectionCreate]:
+    """
+    Validate a JSON list of sections lazily, one section per iteration.
+
+    :raises HTTPException: 422 on the first invalid section (numbered from 1), 413 past MAX_IMPORT_SECTIONS.
+    """
+    if not isinstance(sections, list):
+        raise HTTPException(status_code=422, detail="sections must be a list")
+    for number, data in enumerate(sections, 1):
+        yield _validate_section(number, data)
+
+def parse_course_bundle(body: bytes) -> tuple[CourseBase, Iterator[SectionCreate]]:
+    """
+    Parse a JSON course bundle {"course": {...}, "sections": [...]}.
+
+    The course is validated right away; the sections only as the returned iterator is consumed.
+    """
+    bundle = _load_json(body)
+    if not isinstance(bundle, dict):
+        raise HTTPException(status_code=422, detail="Expected an object with course and sections")
+    try:
+        course = CourseBase.model_validate(bundle.get("course"))
+    except ValidationError as error:
+        raise HTTPException(status_code=422, detail=f"Course: {_describe(error)}")
+    return course, parse_json_sections(bundle.get("sections", []))
+
+def parse_json_section_list(body: bytes) -> Iterator[SectionCreate]:
+    """Parse a JSON list of sections, validated lazily."""
+    return parse_json_sections(_load_json(body))
+
+async def _csv_rows(chunks: AsyncIterable[bytes]) -> AsyncIterator[list[str]]:
+    """
+    Split a UTF-8 CSV byte stream into rows as the chunks arrive.
+
+    A line ending inside a quoted field (an odd number of quotes so far) continues the row.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending, row, quotes = "", "", 0
+    try:
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                row += line + "\n"
+                quotes += line.count('"')
+                if quotes % 2 == 0:
+                    fields = next(csv.reader([row]), [])
+                    row, quotes = "", 0
+                    if fields:
+                        yield fields
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="The CSV body must be UTF-8 encoded")
+
+    row += pending
+    quotes += pending.count('"')
+    if quotes % 2:
+        raise HTTPException(status_code=422, detail="Unterminated quoted field at the end of the CSV body")
+    fields = next(csv.reader([row]), []) if row.strip() else []
+    if fields:
+        yield fields
+
+async def parse_csv_sections(chunks: AsyncIterable[bytes]) -> AsyncIterator[SectionCreate]:
+    """
+    Validate sections from a streamed CSV body, one row per iteration.
+
+    :param chunks: The body, e.g. `request.stream()`.
+    :raises HTTPException: 422 on a bad header or the first invalid row, 413 past MAX_IMPORT_SECTIONS.
+    """
+    rows = _csv_rows(chunks)
+    header = await anext(rows, None)
+    if header is None:
+        return
+    header = [column.strip().lower() for column in header]
+
+    missing = [column for column in CSV_REQUIRED_COLUMNS if column not in header]
+    unknown = [column for column in header if column not in CSV_COLUMNS]
+    if missing or unknown or len(set(header)) != len(header):
+        raise HTTPException(
+            status_code=422,
+            detail=f"The CSV header must name the columns {', '.join(CSV_REQUIRED_COLUMNS)} and optionally is_hidden, "
+                   f"each once; got {', '.join(header)}")
+
+    number = 0
+    async for row in rows:
+        number += 1
+        if len(row) != len(header):
+            raise HTTPException(status_code=422, detail=f"Section {number}: expected {len(header)} fields, got {len(row)}")
+        data = dict(zip(header, row))
+        if data.get("is_hidden", None) == "":
+            del data["is_hidden"]
+        yield _validate_section(number, data)
+
+
+async def _copy_sections(course_id: int, sections) -> int:
+    try:
+        return await copy_sections_repo(course_id, sections)
+    except UniqueViolationError:
+        raise HTTPException(status_code=400, detail="A section with one of these titles already exists")
+
+async def import_course_service(teacher_id: int, course: CourseBase,
+                                sections: Union[Iterable[SectionCreate], AsyncIterable[SectionCreate]]) -> tuple[int, int]:
+    """
+    Create a course with all of its sections in one transaction.
+
+    :param teacher_id: Owner of the new course.
+    :param course: The course fields.
+    :param sections: Sections to add, validated lazily (see parse_course_bundle).
+    :return: The new course id and the number of sections imported.
+    :raises HTTPException: 400 on a duplicate title or a value too long for its column, or the
+        validation error of the first invalid section; nothing is created in either case.
+    """
+    try:
+        async with unit_of_work(transaction=True):
+            try:
+                course_id = await insert_course_repo(CourseCreate(**course.model_dump(), owner_id=teacher_id))
+            except UniqueViolationError:
+                raise HTTPException(status_code=400, detail="Course with this title already exists")
+            imported = await _copy_sections(course_id, sections)
+    except StringDataRightTruncationError as error:
+        raise HTTPException(status_code=400, detail=f"A value is too long: {error}")
+    return course_id, imported
+
+async def import_sections_service(course_id: int,
+                                  sections: Union[Iterable[SectionCreate], AsyncIterable[SectionCreate]]) -> int:
+    """
+    Append sections to an existing course in one transaction.
+
+    :param course_id: The course to add the sections to.
+    :param sections: Sections to add, validated lazily (see parse_csv_sections / parse_json_section_list).
+    :return: The number of sections imported.
+    :raises HTTPException: As import_course_service; no section is added on error.
+    """
+    try:
+        async with unit_of_work(transaction=True):
+            return await _copy_sections(course_id, sections)
+    except StringDataRightTruncationError as error:
+        raise HTTPException(status_code=400, detail=f"A value is too long: {error}")
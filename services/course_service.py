@@ -1,11 +1,12 @@
 from repositories.course_repo import (
     get_all_courses_per_teacher_repo, get_course_by_id_repo, insert_course_repo, update_course_data_repo, get_all_courses_repo,
-    get_all_student_courses_repo, count_premium_enrollments_repo, get_course_rating_repo)
+    get_all_student_courses_repo, get_course_rating_repo, stream_course_rating_repo,
+    PUBLIC_SORT_KEYS, TEACHER_SORT_KEYS, STUDENT_SORT_KEYS)
 from repositories.student_repo import validate_subscription_repo
 from data.models import CourseCreate, CourseUpdate, CourseFilterOptions, StudentCourseFilter, TeacherCourseFilter
 from asyncpg.exceptions import UniqueViolationError
 from fastapi.exceptions import HTTPException
-from repositories.enrollments_repo import create_enrollment_repo
+from common.pagination import next_cursor
 from typing import Optional
 
 async def get_all_courses_service(filters: CourseFilterOptions, student_id: Optional[int] = None):
@@ -30,6 +31,16 @@ async def get_all_courses_service(filters: CourseFilterOptions, student_id: Opti
         premium = await validate_subscription_repo(student_id)
     return await get_all_courses_repo(filters, premium)
 
+def public_courses_next_cursor(courses, filters: CourseFilterOptions) -> Optional[str]:
+    """
+    Build the cursor for the page following `courses` in the public listing.
+
+    :return: The cursor token, or None on the last page and for full-text search, which pages by offset.
+    """
+    if filters.search:
+        return None
+    return next_cursor(courses, filters.limit, PUBLIC_SORT_KEYS.get(filters.sort_by, PUBLIC_SORT_KEYS["title"]))
+
 async def get_course_by_id_service(id: int):
     """
     Fetches a course by its unique identifier asynchronously.
@@ -78,6 +89,14 @@ async def get_all_courses_per_student_service(student_id, filters: StudentCourse
     """
     return await get_all_student_courses_repo(student_id, filters)
 
+def teacher_courses_next_cursor(courses, filters: TeacherCourseFilter) -> Optional[str]:
+    """Build the cursor for the page following `courses` in a teacher's listing, or None on the last page."""
+    return next_cursor(courses, filters.limit, TEACHER_SORT_KEYS.get(filters.sort_by, TEACHER_SORT_KEYS["title"]))
+
+def student_courses_next_cursor(courses, filters: StudentCourseFilter) -> Optional[str]:
+    """Build the cursor for the page following `courses` in a student's listing, or None on the last page."""
+    return next_cursor(courses, filters.limit, STUDENT_SORT_KEYS.get(filters.sort_by, STUDENT_SORT_KEYS["title"]))
+
 async def create_course_service(course_data: CourseCreate):
     """
     Creates a new course in the system using the provided course data. This method interacts
@@ -108,39 +127,6 @@ async def update_course_service(id: int, updates: CourseUpdate):
     """
     return await update_course_data_repo(id, updates)
 
-
-async def enroll_course(course_id: int, student_id: int):
-    """
-    Handle the enrollment of a student in a course asynchronously. The function takes
-    the course ID and student ID as inputs, processes the enrollment through a
-    repository function, and returns the unique enrollment ID.
-
-    :param course_id: Unique identifier for the course.
-    :type course_id: int
-    :param student_id: Unique identifier for the student.
-    :type student_id: int
-    :return: The unique identifier for the enrollment.
-    :rtype: int
-    """
-    enrollment_id = await create_enrollment_repo(course_id, student_id)
-    return enrollment_id
-
-
-async def count_premium_enrollments(student_id):
-    """
-    Counts the number of premium enrollments for a given student asynchronously.
-
-    This function communicates with the associated repository layer to retrieve
-    the count of premium enrollments for the specified student ID.
-
-    :param student_id: The unique identifier of the student for whom the premium
-        enrollments are to be counted.
-    :type student_id: int
-    :return: The total count of premium enrollments for the provided student ID.
-    :rtype: int
-    """
-    return await count_premium_enrollments_repo(student_id)
-
 async def get_course_rating_service(course_id: int):
     """
     Fetches the rating details of a specific course from the repository.
@@ -156,4 +142,15 @@ async def get_course_rating_service(course_id: int):
     :rtype: List[Dict]
     """
     data = await get_course_rating_repo(course_id) 
-    return [dict(row) for row in data] 
\ No newline at end of file
+    return [dict(row) for row in data]
+
+async def stream_course_rating_service(course_id: int):
+    """
+    Stream the ratings of a course as dictionaries, one per rating (see get_course_rating_service).
+
+    :param course_id: Unique identifier of the course whose ratings are streamed.
+    :type course_id: int
+    :return: An async iterator over the rating dictionaries.
+    """
+    async for row in stream_course_rating_repo(course_id):
+        yield dict(row) 
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+Outgoing e-mail dispatch.
+
+Request handlers call `enqueue_emails`, which stores the messages in the v1.email_outbox
+table and puts them on an in-process queue, then returns. Worker tasks started in the
+application lifespan take messages off the queue, send them to the transport in
+batches (Mailjet accepts up to 50 messages per call) and retry failed messages with
+exponential backoff. Transports report a result per message, so a rejected recipient
+only uses up the attempts of its own message. Messages still pending after a crash or restart are claimed from
+the outbox again by the next process that starts.
+
+Transports are pluggable: `MailjetTransport` in production, `FakeTransport` in tests.
+"""
+
+
+import asyncio
+import json
+import logging
+import random
+from dataclasses import dataclass
+from typing import Optional, Protocol
+from data.database import after_transaction
+from repositories.email_outbox_repo import (
+    insert_outbox_messages_repo,
+    claim_pending_outbox_repo,
+    mark_outbox_sent_repo,
+    record_outbox_failure_repo)
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmailDeliveryError(Exception):
+    pass
+
+
+class EmailTransport(Protocol):
+    async def send(self, messages: list[dict]) -> list[Optional[str]]:
+        """
+        Deliver a batch of Mailjet v3.1 message objects.
+
+        Returns one entry per message: None when it was accepted, else the error it was rejected with.
+        Raises when the batch as a whole failed and nothing was delivered.
+        """
+
+
+def _message_errors(response, count: int) -> Optional[list[Optional[str]]]:
+    """Per-message errors of a Mailjet v3.1 response, or None when it does not report a status per message."""
+    try:
+        results = response.json().get("Messages")
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(results, list) or len(results) != count:
+        return None
+    return [None if result.get("Status") == "success" else json.dumps(result.get("Errors", result))[:1000]
+            for result in results]
+
+
+class MailjetTransport:
+    """
+    Sends batches through the Mailjet v3.1 API. The blocking client runs in a worker thread.
+
+    Mailjet still delivers the valid messages of a batch when some are rejected (400 with a
+    status per message), so only the rejected ones are reported as failed.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    async def send(self, messages: list[dict]) -> list[Optional[str]]:
+        response = await asyncio.to_thread(self._client.send.create, data={"Messages": messages})
+        if response.status_code < 400:
+            return [None] * len(messages)
+        errors = _message_errors(response, len(messages)) if response.status_code == 400 else None
+        if errors is None:
+            raise EmailDeliveryError(f"Mailjet responded {response.status_code}: {response.text[:500]}")
+        return errors
+
+
+class FakeTransport:
+    """
+    Collects sent batches in memory. `failures` makes the next n calls raise;
+    messages to a recipient in `rejected` are refused on every call.
+    """
+
+    def __init__(self, failures: int = 0, rejected: frozenset[str] = frozenset()):
+        self.batches: list[list[dict]] = []
+        self.failures = failures
+        self.rejected = rejected
+
+    async def send(self, messages: list[dict]) -> list[Optional[str]]:
+        if self.failures > 0:
+            self.failures -= 1
+            raise EmailDeliveryError("fake transport failure")
+        errors = ["recipient rejected" if any(to["Email"] in self.rejected for to in message.get("To", [])) else None
+                  for message in messages]
+        self.batches.append([message for message, error in zip(messages, errors) if error is None])
+        return errors
+
+    @property
+    def messages(self) -> list[dict]:
+        return [message for batch in self.batches for message in batch]
+
+
+@dataclass
+class OutboxMessage:
+    payload: dict
+    id: Optional[int] = None
+    attempts: int = 0
+
+
+class EmailDispatcher:
+    """
+    In-process e-mail queue drained by `workers` tasks.
+
+    :param transport: Where batches are delivered.
+    :param workers: Number of concurrent worker tasks.
+    :param batch_size: Maximum messages per transport call.
+    :param max_attempts: Attempts per message before it is marked failed.
+    :param retry_base_delay: Backoff before the first retry, in seconds; doubles per attempt.
+    :param retry_max_delay: Upper bound for the backoff, in seconds.
+    :param outbox: Persist messages in v1.email_outbox. Disabled in tests without a database.
+    :param lease_seconds: How long a process reserves the outbox rows it is delivering.
+    """
+
+    def __init__(self, transport: EmailTransport, workers: int = 2, batch_size: int = 50, max_attempts: int = 5,
+                 retry_base_delay: float = 2.0, retry_max_delay: float = 300.0, outbox: bool = True,
+                 lease_seconds: float = 300.0):
+        self.transport = transport
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.outbox = outbox
+        self.lease_seconds = lease_seconds
+        self._queue: asyncio.Queue[OutboxMessage] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._retries: set[asyncio.TimerHandle] = set()
+        self.stats = {"queued": 0, "sent": 0, "retried": 0, "failed": 0}
+
+    async def enqueue(self, payloads: list[dict]) -> int:
+        """
+        Store the messages and queue them for delivery. Inside a transactional unit of work
+        they are queued once it ends, so workers never see outbox rows that are not committed.
+        """
+        if not payloads:
+            return 0
+        ids = await insert_outbox_messages_repo(payloads, self.lease_seconds) if self.outbox else [None] * len(payloads)
+        messages = [OutboxMessage(payload, id) for payload, id in zip(payloads, ids)]
+        after_transaction(lambda: self._put(messages))
+        return len(messages)
+
+    def _put(self, messages: list[OutboxMessage]):
+        for message in messages:
+            self._queue.put_nowait(message)
+        self.stats["queued"] += len(messages)
+
+    async def start(self):
+        """Queue outbox messages left pending by earlier processes and start the workers."""
+        if self._tasks:
+            return
+        if self.outbox:
+            try:
+                rows = await claim_pending_outbox_repo(10_000, self.lease_seconds)
+                self._put([OutboxMessage(json.loads(row["payload"]), row["id"], row["attempts"]) for row in rows])
+            except Exception:
+                logger.exception("Could not recover pending e-mails from the outbox")
+        self._tasks = [asyncio.create_task(self._work(), name=f"email-worker-{n}") for n in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0):
+        """Give the workers `timeout` seconds to drain the queue, then cancel them. Undelivered rows stay pending."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping with %s e-mails still queued; they stay pending in the outbox", self._queue.qsize())
+        for handle in self._retries:
+            handle.cancel()
+        self._retries.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await self._deliver(batch)
+            except Exception:
+                logger.exception("E-mail worker failed to process a batch")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _deliver(self, batch: list[OutboxMessage]):
+        try:
+            errors = await self.transport.send([message.payload for message in batch])
+        except Exception as exc:
+            # Nothing was delivered: the attempt counts for every message of the batch
+            await self._failed(batch, str(exc)[:1000])
+            return
+
+        sent = [message for message, error in zip(batch, errors) if error is None]
+        for message, error in zip(batch, errors):
+            if error is not None:
+                await self._failed([message], error)
+
+        self.stats["sent"] += len(sent)
+        ids = [message.id for message in sent if message.id is not None]
+        if ids:
+            await mark_outbox_sent_repo(ids)
+
+    async def _failed(self, messages: list[OutboxMessage], error: str):
+        for message in messages:
+            message.attempts += 1
+        given_up = [message for message in messages if message.attempts >= self.max_attempts]
+        retry = [message for message in messages if message.attempts < self.max_attempts]
+        logger.warning("Delivery of %s e-mails failed: %s", len(messages), error)
+
+        if retry:
+            self.stats["retried"] += len(retry)
+            delay = self._backoff(min(message.attempts for message in retry))
+            self._schedule(retry, delay)
+            await self._record_failure(retry, error, final=False, delay=delay)
+        if given_up:
+            self.stats["failed"] += len(given_up)
+            await self._record_failure(given_up, error, final=True, delay=0)
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.retry_base_delay * 2 ** (attempts - 1), self.retry_max_delay)
+        # Jitter keeps batches that failed together from retrying in lockstep
+        return delay * random.uniform(0.5, 1.0)
+
+    def _schedule(self, messages: list[OutboxMessage], delay: float):
+        def requeue():
+            self._retries.discard(handle)
+            self._put(messages)
+
+        handle = asyncio.get_running_loop().call_later(delay, requeue)
+        self._retries.add(handle)
+
+    async def _record_failure(self, messages: list[OutboxMessage], error: str, final: bool, delay: float):
+        ids = [message.id for message in messages if message.id is not None]
+        if ids:
+            await record_outbox_failure_repo(ids, error, final, delay + self.lease_seconds)
+
+
+_dispatcher: Optional[EmailDispatcher] = None
+
+
+def get_dispatcher() -> Optional[EmailDispatcher]:
+    return _dispatcher
+
+async def start_email_dispatcher(transport: EmailTransport, **options) -> EmailDispatcher:
+    """Create and start the process-wide dispatcher (called from the application lifespan)."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = EmailDispatcher(transport, **options)
+    await _dispatcher.start()
+    return _dispatcher
+
+async def stop_email_dispatcher():
+    global _dispatcher
+    if _dispatcher is not None:
+        dispatcher, _dispatcher = _dispatcher, None
+        await dispatcher.stop()
+
+async def enqueue_emails(payloads: list[dict]) -> int:
+    """
+    Queue Mailjet message objects for background delivery and return how many were queued.
+
+    Raises RuntimeError when the dispatcher has not been started.
+    """
+    if _dispatcher is None:
+        raise RuntimeError("E-mail dispatcher is not running; start it with start_email_dispatcher()")
+    return await _dispatcher.enqueue(payloads)
@@ -1,9 +1,14 @@
 from repositories.enrollments_repo import (
+    enroll_student_repo,
     get_enrollment_by_id_repo,
     get_enrollment_by_student_course_repo,
     unenroll_student_repo)
-from repositories.student_repo import get_courses_progress_repo
+from repositories.student_repo import get_course_progress_repo
 from data.models import EnrollmentResponse
+from data.mapping import to_model
+
+# Active premium enrollments a subscribed student may hold at once
+PREMIUM_ENROLLMENT_LIMIT = 5
 
 
 async def get_enrollment_by_id(enrollment_id):
@@ -24,7 +29,7 @@ async def get_enrollment_by_id(enrollment_id):
     """
     enrollment = await get_enrollment_by_id_repo(int(enrollment_id))
     if enrollment:
-        enrollment_response = EnrollmentResponse(**enrollment)
+        enrollment_response = to_model(EnrollmentResponse, enrollment)
         return enrollment_response
     return None
 
@@ -39,9 +44,8 @@ async def unenroll_student_service(student_id: int, course_id: int):
     :param course_id: The unique identifier of the course from which the student is to be unenrolled
     :return: A result from the unenrollment repository, if enrollment exists; otherwise, None
     """
-    progress_response = await get_courses_progress_repo(student_id)
-    filtered_response = list(filter(lambda x: x["course_id"] == course_id, progress_response))
-    drop_out = filtered_response[0]["progress_percentage"] < 100
+    progress_response = await get_course_progress_repo(student_id, course_id)
+    drop_out = progress_response is None or progress_response["progress_percentage"] < 100
     enrollment_response = await get_enrollment_by_student_course_repo(student_id, course_id)
 
     if enrollment_response:
@@ -50,12 +54,17 @@ async def unenroll_student_service(student_id: int, course_id: int):
         return None
 
 
-
-
-
-
-
-
-
-
-
+async def enroll_student_service(course_id: int, student_id: int):
+    """
+    Checks eligibility and creates an enrollment request in one database round trip.
+
+    :param course_id: The ID of the course to enroll in.
+    :type course_id: int
+    :param student_id: The ID of the student requesting the enrollment.
+    :type student_id: int
+    :return: None if the course does not exist, otherwise the record returned by
+        `enroll_student_repo`, holding the course, its teacher, the eligibility flags
+        and the new enrollment_id (None when the student was not eligible).
+    :rtype: Optional[Record]
+    """
+    return await enroll_student_repo(course_id, student_id, PREMIUM_ENROLLMENT_LIMIT)
@@ -0,0 +1,62 @@
+"""
+Prometheus exposition of this process.
+
+Besides the histograms of common/metrics.py, the counters that components already keep
+for themselves (course cache, prepared statement cache, password hashing, e-mail
+dispatcher) are read at scrape time, so they cost nothing between scrapes.
+"""
+
+
+from prometheus_client import REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from data.cache import course_cache
+from data.database import statement_cache_stats
+from security.secrets import password_hash_stats
+from services.email_service import get_dispatcher
+
+
+class _ComponentStatsCollector:
+    def collect(self):
+        cache = course_cache.stats()
+        lookups = CounterMetricFamily("app_cache_lookups", "In-process cache lookups", labels=["cache", "result"])
+        lookups.add_metric([cache["name"], "hit"], cache["hits"])
+        lookups.add_metric([cache["name"], "miss"], cache["misses"])
+        entries = GaugeMetricFamily("app_cache_entries", "Entries held by an in-process cache", labels=["cache"])
+        entries.add_metric([cache["name"]], cache["size"])
+        yield lookups
+        yield entries
+
+        statements = CounterMetricFamily(
+            "db_statement_cache_events", "Prepared statement cache hits, misses and evictions", labels=["event"]
+        )
+        for event, count in statement_cache_stats.items():
+            statements.add_metric([event], count)
+        yield statements
+
+        yield GaugeMetricFamily("password_hash_waiting", "Password hashes waiting for a worker",
+                                value=password_hash_stats["waiting"])
+        yield GaugeMetricFamily("password_hash_running", "Password hashes being computed",
+                                value=password_hash_stats["running"])
+        yield CounterMetricFamily("password_hash_completed", "Password hashes computed",
+                                  value=password_hash_stats["completed"])
+        yield CounterMetricFamily("password_hash_rejected", "Password hashes turned away with 503",
+                                  value=password_hash_stats["rejected"])
+        yield CounterMetricFamily("password_hash_wait_seconds", "Time spent waiting for a password hash worker",
+                                  value=password_hash_stats["wait_seconds_total"])
+
+        dispatcher = get_dispatcher()
+        if dispatcher is not None:
+            emails = CounterMetricFamily("email_messages", "E-mails by delivery outcome", labels=["outcome"])
+            for outcome, count in dispatcher.stats.items():
+                emails.add_metric([outcome], count)
+            yield emails
+
+
+REGISTRY.register(_ComponentStatsCollector())
+
+
+def get_metrics_service() -> tuple[bytes, str]:
+    """
+    :return: tuple -- the metrics of this process in the Prometheus text format, and its content type.
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -3,12 +3,15 @@ from repositories.student_repo import (
     update_avatar_url_repo,
     update_student_data_repo,
     get_courses_student_all_repo,
+    stream_courses_student_all_repo,
     get_courses_progress_repo,
+    get_course_progress_repo,
     rate_course_repo,
     allow_rating_repo, check_enrollment_repo
 )
 from data.models import StudentResponse
-from repositories.section_repo import complete_section_repo, get_completed_sections_repo
+from data.mapping import to_model
+from repositories.section_repo import complete_section_repo, complete_sections_repo, get_completed_sections_repo
 from repositories.course_repo import complete_course_repo
 
 
@@ -44,6 +47,16 @@ async def get_student_courses_service(student_id: int):
     """
     return await get_courses_student_all_repo(student_id)
 
+def stream_student_courses_service(student_id: int):
+    """
+    Stream the courses of get_student_courses_service row by row instead of loading them all.
+
+    :param student_id: The unique identifier of the student whose courses are streamed.
+    :type student_id: int
+    :return: An async iterator over the course rows.
+    """
+    return stream_courses_student_all_repo(student_id)
+
 async def get_student_courses_progress_service(student_id: int):
     """
     Fetches the progress of courses for a specific student by their ID.
@@ -61,6 +74,20 @@ async def get_student_courses_progress_service(student_id: int):
     """
     return await get_courses_progress_repo(student_id)
 
+async def get_student_course_progress_service(student_id: int, course_id: int):
+    """
+    Fetches a student's progress in a single course.
+
+    :param student_id: The unique identifier of the student.
+    :type student_id: int
+    :param course_id: The unique identifier of the course.
+    :type course_id: int
+    :return: The course progress with `course_id`, `title` and `progress_percentage`,
+        or None if the course does not exist.
+    :rtype: Optional[dict]
+    """
+    return await get_course_progress_repo(student_id, course_id)
+
 async def update_avatar_url(url: str, user_email):
     return await update_avatar_url_repo(url, user_email)
 
@@ -106,17 +133,17 @@ async def get_student_by_id(student_id: int):
     Retrieve a student's information by their unique ID asynchronously.
 
     This function interacts with the repository layer to fetch user details
-    for a specific student based on their ID. It then transforms and returns
-    the data in the form of a serialized student response.
+    for a specific student based on their ID. It then constructs a
+    `StudentResponse` object with the retrieved data.
 
     :param student_id: The unique identifier of the student to be retrieved.
     :type student_id: int
 
-    :return: The serialized JSON representation of the student's information.
-    :rtype: Dict
+    :return: A `StudentResponse` object containing the student's information.
+    :rtype: StudentResponse
     """
     student = await get_user_by_id_repo(student_id, role = "student")
-    return StudentResponse(**student).model_dump(mode="json")
+    return to_model(StudentResponse, student)
 
 
 async def complete_section_service(student_id: int, section_id: int):
@@ -137,6 +164,25 @@ async def complete_section_service(student_id: int, section_id: int):
     """
     return await complete_section_repo(student_id, section_id)
 
+async def complete_sections_service(student_id: int, course_id: int, section_ids: list[int]):
+    """
+    Complete several sections of a course for a student in one database round trip.
+
+    :param student_id: The unique identifier of the student.
+    :type student_id: int
+    :param course_id: The unique identifier of the course the sections belong to.
+    :type course_id: int
+    :param section_ids: The identifiers of the sections to be completed.
+    :type section_ids: list[int]
+    :return: Per-section results: {"section_id": ..., "status": "completed" | "not_in_course"}.
+    :rtype: list[dict]
+    """
+    rows = await complete_sections_repo(student_id, course_id, section_ids)
+    return [
+        {"section_id": row["section_id"], "status": "completed" if row["completed"] else "not_in_course"}
+        for row in rows
+    ]
+
 async def complete_course_service(student_id: int, course_id: int):
     """
     Complete the course for a given student by interacting with the repository layer.
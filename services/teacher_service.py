@@ -2,13 +2,18 @@ from common.responses import Unauthorized, Forbidden
 from repositories.user_repo import get_account_by_email_repo, get_user_by_id_repo
 from repositories.teacher_repo import (
     update_teacher_repo,
-    report_enrolled_students_repo,
+    stream_enrolled_students_repo,
+    get_enrollment_report_page_repo,
+    ENROLLMENT_REPORT_SORT_KEY,
     deactivate_course_repo,
     verify_email_repo,
     validate_teacher_verified_and_activated_repo
 )
-from typing import Union
-from data.models import UserRole, TeacherResponse
+from typing import Optional, Union
+from fastapi import HTTPException
+from data.models import UserRole, TeacherResponse, EnrollmentReportFilter
+from common.pagination import next_cursor
+from data.mapping import to_model
 from repositories.user_repo import get_role_by_email_repo
 from repositories.enrollments_repo import confirm_enrollment_repo
 
@@ -70,19 +75,43 @@ async def validate_teacher_role(email: str) -> Union[Unauthorized, Forbidden] |
         return Forbidden(content="Only a Teacher user can perform this action")
     return None
 
-async def get_enrolled_students(teacher_id: int):
+def _check_report_period(filters: EnrollmentReportFilter):
+    if filters.requested_from and filters.requested_to and filters.requested_from >= filters.requested_to:
+        raise HTTPException(status_code=400, detail="requested_from must be earlier than requested_to")
+
+def stream_enrolled_students(teacher_id: int, filters: Optional[EnrollmentReportFilter] = None):
     """
-    Fetches a list of students enrolled under a specific teacher.
+    Stream the enrollments across a teacher's courses row by row, for reports too large to load at once.
 
-    This function queries the repository to retrieve the students
-    enrolled with a teacher based on their unique identifier.
+    :param teacher_id: The unique identifier of the teacher.
+    :type teacher_id: int
+    :param filters: Optional course, status and request-time filters.
+    :type filters: EnrollmentReportFilter | None
+    :return: An async iterator over the enrollment rows, oldest request first.
+    :raises HTTPException: 400 when the request-time range is empty.
+    """
+    if filters:
+        _check_report_period(filters)
+    return stream_enrolled_students_repo(teacher_id, filters)
+
+async def get_enrollment_report_page(teacher_id: int, filters: EnrollmentReportFilter):
+    """
+    Fetch one page of the filtered enrollment report of a teacher.
 
     :param teacher_id: The unique identifier of the teacher.
     :type teacher_id: int
-    :return: A list of students enrolled under the teacher.
+    :param filters: Course, status and request-time filters, page size and cursor.
+    :type filters: EnrollmentReportFilter
+    :return: The enrollment rows of the page, oldest request first.
     :rtype: list
+    :raises HTTPException: 400 when the request-time range is empty or the cursor is malformed.
     """
-    return await report_enrolled_students_repo(teacher_id)
+    _check_report_period(filters)
+    return await get_enrollment_report_page_repo(teacher_id, filters)
+
+def enrollment_report_next_cursor(rows, filters: EnrollmentReportFilter) -> Optional[str]:
+    """Build the cursor for the page following `rows` of the enrollment report, or None on the last page."""
+    return next_cursor(rows, filters.limit, ENROLLMENT_REPORT_SORT_KEY, id_column="enrollment_id")
 
 async def deactivate_course_service(teacher_id: int, course_id: int):
     """
@@ -112,7 +141,7 @@ async def get_teacher_by_id(teacher_id: int):
     :rtype: TeacherResponse
     """
     teacher = await get_user_by_id_repo(teacher_id, role = "teacher")
-    return TeacherResponse(**teacher)
+    return to_model(TeacherResponse, teacher)
 
 async def confirm_enrollment(enrollment_id):
     """
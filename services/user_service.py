@@ -2,7 +2,7 @@ from pydantic import EmailStr
 from data.database import read_query, update_query
 from data.models import UserRole, StudentRegisterData, TeacherRegisterData
 from fastapi.security import OAuth2PasswordBearer
-from repositories.user_repo import insert_user_repo, email_exists_repo, get_role_by_email_repo
+from repositories.user_repo import insert_user_repo, email_exists_repo, get_identity_by_email_repo, update_password_hash_repo
 from typing import Union
 
 
@@ -65,5 +65,24 @@ async def get_hash_by_email(email: EmailStr, get_data_func = read_query):
 
     return result[0][0]
 
-async def get_role_by_email(email):
-    return await get_role_by_email_repo(email)
+async def get_identity_by_email(email: EmailStr):
+    """
+    Looks up the role, password hash and profile of the account using the email, in one query.
+
+    :param email: The email address of the account.
+    :type email: EmailStr
+    :return: A dict with "role", "password" and "profile" keys, or None if there is no such account.
+    :rtype: Optional[dict]
+    """
+    return await get_identity_by_email_repo(email)
+
+async def update_password_hash(user_id: int, role: str, hashed_password: str):
+    """
+    Stores a new password hash for the user, used to upgrade outdated hashes on login.
+
+    :param user_id: The ID of the user.
+    :param role: The role of the user ("student", "teacher" or "admin").
+    :param hashed_password: The new password hash.
+    :return: The number of updated rows.
+    """
+    return await update_password_hash_repo(user_id, role, hashed_password)
@@ -0,0 +1,138 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from data import cache, database
+from data.cache import AsyncTTLCache
+
+
+@pytest.mark.asyncio
+class TestAsyncTTLCache:
+    async def test_caches_values_and_misses(self):
+        course_cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        loader = AsyncMock(return_value=None)
+
+        assert await course_cache.get_or_load(1, loader) is None
+        assert await course_cache.get_or_load(1, loader) is None
+
+        loader.assert_awaited_once()
+        assert course_cache.stats()["hit_ratio"] == 0.5
+
+    async def test_expired_entries_reload(self):
+        course_cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        loader = AsyncMock(side_effect=["old", "new"])
+
+        with patch("data.cache.time.monotonic", return_value=0):
+            assert await course_cache.get_or_load(1, loader) == "old"
+        with patch("data.cache.time.monotonic", return_value=61):
+            assert await course_cache.get_or_load(1, loader) == "new"
+
+    async def test_evicts_least_recently_used(self):
+        course_cache = AsyncTTLCache("test", maxsize=2, ttl=60)
+        for key in (1, 2, 1, 3):
+            await course_cache.get_or_load(key, AsyncMock(return_value=key))
+
+        assert len(course_cache) == 2
+        assert 2 not in course_cache._entries
+
+    async def test_concurrent_misses_share_one_load(self):
+        course_cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        release = asyncio.Event()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"id": 1}
+
+        tasks = [asyncio.create_task(course_cache.get_or_load(1, loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert [await task for task in tasks] == [{"id": 1}] * 5
+        assert calls == 1
+
+    async def test_waiter_takes_over_when_the_loading_caller_is_cancelled(self):
+        course_cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        release = asyncio.Event()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"id": 1}
+
+        owner = asyncio.create_task(course_cache.get_or_load(1, loader))
+        waiter = asyncio.create_task(course_cache.get_or_load(1, loader))
+        await asyncio.sleep(0)
+        owner.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await waiter == {"id": 1}
+        assert owner.cancelled()
+        assert calls == 2
+        assert course_cache._entries[1][1] == {"id": 1}
+
+    async def test_cancelled_waiter_does_not_take_over(self):
+        course_cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        release = asyncio.Event()
+
+        async def loader():
+            await release.wait()
+            return {"id": 1}
+
+        owner = asyncio.create_task(course_cache.get_or_load(1, loader))
+        waiter = asyncio.create_task(course_cache.get_or_load(1, loader))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await owner == {"id": 1}
+        assert waiter.cancelled()
+
+    async def test_invalidated_inflight_load_is_not_stored(self):
+        course_cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        release = asyncio.Event()
+
+        async def loader():
+            await release.wait()
+            return "before write"
+
+        task = asyncio.create_task(course_cache.get_or_load(1, loader))
+        await asyncio.sleep(0)
+        course_cache.invalidate(1)
+        release.set()
+
+        assert await task == "before write"
+        assert len(course_cache) == 0
+
+    async def test_loader_errors_reach_every_waiter(self):
+        course_cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        with pytest.raises(RuntimeError):
+            await course_cache.get_or_load(1, AsyncMock(side_effect=RuntimeError("db down")))
+
+        assert len(course_cache) == 0
+
+    async def test_disabled_cache_always_loads(self):
+        course_cache = AsyncTTLCache("test", maxsize=0, ttl=60)
+        loader = AsyncMock(return_value="row")
+
+        await course_cache.get_or_load(1, loader)
+        await course_cache.get_or_load(1, loader)
+
+        assert loader.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_course_repeats_after_transaction():
+    course_cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+    with patch.object(cache, "course_cache", course_cache):
+        async with database.unit_of_work(transaction=True):
+            cache.invalidate_course(1)
+            await course_cache.get_or_load(1, AsyncMock(return_value="stale"))
+            assert len(course_cache) == 1
+
+        assert len(course_cache) == 0
@@ -10,9 +10,12 @@ from repositories.course_repo import (
     count_premium_enrollments_repo,
     get_course_rating_repo,
     admin_course_view_repo,
-    complete_course_repo
+    complete_course_repo,
+    PUBLIC_SORT_KEYS
 )
 from data.models import CourseFilterOptions, TeacherCourseFilter, StudentCourseFilter, CourseCreate, CourseUpdate
+from common.pagination import encode_cursor, decode_cursor, next_cursor
+from fastapi import HTTPException
 
 
 @pytest.mark.asyncio
@@ -24,6 +27,40 @@ async def test_get_all_courses_repo():
     mock_func.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_get_all_courses_repo_search_ranks_by_relevance():
+    filters = CourseFilterOptions(search="python basics", tag=" Backend ")
+    mock_func = AsyncMock(return_value=[])
+    await get_all_courses_repo(filters, premium=False, get_data_func=mock_func)
+
+    query, params = mock_func.call_args.args
+    assert "websearch_to_tsquery" in query
+    assert "ts_rank" in query
+    assert params == ("", "backend", 10, 0, "python basics")
+
+
+@pytest.mark.asyncio
+async def test_get_all_courses_repo_cursor_seeks_past_last_row():
+    filters = CourseFilterOptions(sort_by="created_on", order="desc", offset=20,
+                                  cursor=encode_cursor("2025-01-02T10:00:00", 42))
+    mock_func = AsyncMock(return_value=[])
+    await get_all_courses_repo(filters, premium=False, get_data_func=mock_func)
+
+    query, params = mock_func.call_args.args
+    assert "(c.created_on, c.id) < ($5::text::timestamptz, $6::int)" in query
+    assert "ORDER BY c.created_on desc, c.id desc" in query
+    assert params == ("", "", 10, 0, "2025-01-02T10:00:00", 42)
+
+
+def test_cursor_round_trip_and_next_page():
+    rows = [{"id": 3, "average_rating": None}, {"id": 8, "average_rating": None}]
+
+    assert next_cursor(rows, 3, PUBLIC_SORT_KEYS["rating"]) is None
+    assert decode_cursor(next_cursor(rows, 2, PUBLIC_SORT_KEYS["rating"])) == ("100", 8)
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor")
+
+
 @pytest.mark.asyncio
 async def test_get_course_by_id_repo():
     mock_func = AsyncMock(return_value=[{"id": 1}])
@@ -42,6 +79,19 @@ async def test_get_all_courses_per_teacher_repo():
     mock_func.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_course_queries_list_their_columns():
+    mock_func = AsyncMock(return_value=[])
+
+    await get_course_by_id_repo(1, get_data_func=mock_func)
+    await get_all_courses_per_teacher_repo(1, TeacherCourseFilter(), get_data_func=mock_func)
+
+    for call in mock_func.await_args_list:
+        query = call.args[0]
+        assert "*" not in query.split("FROM", 1)[0]
+        assert "c.is_premium" in query and "search_vector" not in query
+
+
 @pytest.mark.asyncio
 async def test_get_all_student_courses_repo():
     student_id = 1
@@ -111,6 +161,17 @@ async def test_admin_course_view_repo():
     mock_func.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_admin_course_view_repo_with_cursor():
+    mock_func = AsyncMock(return_value=[])
+    await admin_course_view_repo("", None, None, 10, 5, cursor=encode_cursor("2025-01-02T10:00:00", 7),
+                                 get_data_func=mock_func)
+
+    query, params = mock_func.call_args.args
+    assert "(c.created_on, c.id) < ($6::text::timestamptz, $7::int)" in query
+    assert params == ("", None, None, 10, 0, "2025-01-02T10:00:00", 7)
+
+
 @pytest.mark.asyncio
 async def test_complete_course_repo():
     student_id = 10
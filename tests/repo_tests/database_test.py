@@ -0,0 +1,387 @@
+import sys
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from prometheus_client import REGISTRY
+from data import database
+from repositories import course_repo, student_repo
+
+
+class FakeAcquire:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def __await__(self):
+        self.pool.acquired += 1
+        return self._conn().__await__()
+
+    async def _conn(self):
+        return self.pool.conn
+
+    async def __aenter__(self):
+        self.pool.acquired += 1
+        return self.pool.conn
+
+    async def __aexit__(self, *exc):
+        await self.pool.release(self.pool.conn)
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+        self.acquired = 0
+        self.timeouts = []
+        self.release = AsyncMock()
+
+    def acquire(self, timeout=None):
+        self.timeouts.append(timeout)
+        return FakeAcquire(self)
+
+
+@pytest.fixture
+def fake_conn():
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value=[{"id": 1}])
+    conn.fetchrow = AsyncMock(return_value=[7])
+    conn.execute = AsyncMock(return_value="UPDATE 3")
+    conn.transaction.return_value = MagicMock(start=AsyncMock(), commit=AsyncMock(), rollback=AsyncMock())
+    conn.statement_cache = None
+    return conn
+
+
+@pytest.fixture
+def fake_pool(fake_conn):
+    pool = FakePool(fake_conn)
+    with patch.object(database, "_pool", pool):
+        yield pool
+
+
+@pytest.mark.asyncio
+class TestQueryHelpersUsePool:
+    async def test_read_query_borrows_from_pool(self, fake_pool, fake_conn):
+        result = await database.read_query("SELECT 1", (1,))
+
+        assert result == [{"id": 1}]
+        assert fake_pool.acquired == 1
+        assert fake_pool.timeouts == [database.DB_POOL_ACQUIRE_TIMEOUT]
+        fake_conn.fetch.assert_awaited_once_with("SELECT 1", 1)
+
+    async def test_insert_query_returns_first_column(self, fake_pool):
+        assert await database.insert_query("INSERT", (1,)) == 7
+
+    async def test_update_query_returns_row_count(self, fake_pool):
+        assert await database.update_query("UPDATE", (1,)) == 3
+
+    async def test_query_count_defaults_to_zero(self, fake_pool, fake_conn):
+        fake_conn.fetchrow.return_value = None
+        assert await database.query_count("SELECT count(*)", ()) == 0
+
+
+def make_statement(rows=None, status="UPDATE 2"):
+    statement = MagicMock()
+    statement.fetch = AsyncMock(return_value=rows or [])
+    statement.fetchrow = AsyncMock(return_value=[5])
+    statement.get_statusmsg.return_value = status
+    return statement
+
+
+@pytest.mark.asyncio
+class TestStatementCache:
+    async def test_prepares_once_and_counts_hits(self):
+        conn = MagicMock()
+        conn.prepare = AsyncMock(side_effect=lambda sql: make_statement())
+        cache = database.StatementCache(conn, size=2)
+
+        with patch.dict(database.statement_cache_stats, {"hits": 0, "misses": 0, "evictions": 0}):
+            first = await cache.get("SELECT 1")
+            second = await cache.get("SELECT 1")
+
+            assert first is second
+            conn.prepare.assert_awaited_once_with("SELECT 1")
+            assert database.statement_cache_stats["hits"] == 1
+            assert database.statement_cache_stats["misses"] == 1
+
+    async def test_evicts_least_recently_used(self):
+        conn = MagicMock()
+        conn.prepare = AsyncMock(side_effect=lambda sql: make_statement())
+        cache = database.StatementCache(conn, size=2)
+
+        with patch.dict(database.statement_cache_stats, {"hits": 0, "misses": 0, "evictions": 0}):
+            await cache.get("ORDER BY title")
+            await cache.get("ORDER BY created_on")
+            await cache.get("ORDER BY title")
+            await cache.get("ORDER BY rating")
+
+            assert len(cache) == 2
+            assert database.statement_cache_stats["evictions"] == 1
+            await cache.get("ORDER BY title")
+            assert database.statement_cache_stats["hits"] == 2
+
+    async def test_helpers_run_through_cached_statement(self, fake_pool, fake_conn):
+        statement = make_statement(rows=[{"id": 9}])
+        fake_conn.statement_cache = MagicMock(get=AsyncMock(return_value=statement))
+
+        assert await database.read_query("SELECT", (1,)) == [{"id": 9}]
+        assert await database.update_query("UPDATE", (1,)) == 2
+        statement.fetch.assert_awaited_with(1)
+        fake_conn.fetch.assert_not_awaited()
+
+    async def test_dict_params_bypass_cache(self, fake_pool, fake_conn):
+        fake_conn.statement_cache = MagicMock(get=AsyncMock())
+
+        await database.read_query("SELECT", {"timeout": 5})
+
+        fake_conn.statement_cache.get.assert_not_awaited()
+        fake_conn.fetch.assert_awaited_once_with("SELECT", timeout=5)
+
+
+@pytest.mark.asyncio
+class TestPoolLifecycle:
+    async def test_init_pool_creates_pool_once(self):
+        created = MagicMock()
+        with patch.object(database, "_pool", None), \
+             patch("data.database.asyncpg.create_pool", new_callable=AsyncMock, return_value=created) as mock_create:
+            first = await database.init_pool()
+            second = await database.init_pool()
+
+            assert first is second is created
+            mock_create.assert_awaited_once()
+
+    async def test_pools_leave_prepared_statements_to_the_statement_cache(self):
+        with patch.object(database, "_pool", None), patch.object(database, "_replica_pools", []), \
+             patch("data.database.replica_pool_settings", return_value=[{"dsn": "postgresql://replica/db"}]), \
+             patch("data.database.asyncpg.create_pool", new_callable=AsyncMock) as mock_create:
+            await database.init_pool()
+
+        assert mock_create.await_count == 2
+        for call in mock_create.await_args_list:
+            assert call.kwargs["statement_cache_size"] == 0
+            assert call.kwargs["connection_class"] is database.CachedStatementConnection
+
+    async def test_close_pool_closes_and_resets(self):
+        pool = MagicMock()
+        pool.close = AsyncMock()
+        with patch.object(database, "_pool", pool):
+            await database.close_pool()
+
+            pool.close.assert_awaited_once()
+            assert database._pool is None
+
+
+@pytest.mark.asyncio
+class TestUnitOfWork:
+    async def test_transaction_shares_one_connection(self, fake_pool):
+        async with database.unit_of_work(transaction=True):
+            await database.read_query("SELECT 1")
+            await database.update_query("UPDATE", (1,))
+            await database.insert_query("INSERT", (1,))
+
+        assert fake_pool.acquired == 1
+        fake_pool.release.assert_awaited_once_with(fake_pool.conn)
+
+    async def test_plain_scope_borrows_per_query(self, fake_pool):
+        async with database.unit_of_work():
+            await database.read_query("SELECT 1")
+            await database.update_query("UPDATE", (1,))
+            assert fake_pool.acquired == fake_pool.release.await_count == 2
+
+        assert fake_pool.acquired == fake_pool.release.await_count == 2
+
+    async def test_unused_scope_never_acquires(self, fake_pool):
+        async with database.unit_of_work(transaction=True):
+            pass
+
+        assert fake_pool.acquired == 0
+
+    async def test_transaction_commits_on_success(self, fake_pool, fake_conn):
+        async with database.unit_of_work(transaction=True):
+            await database.update_query("UPDATE", (1,))
+
+        tx = fake_conn.transaction.return_value
+        tx.start.assert_awaited_once()
+        tx.commit.assert_awaited_once()
+        tx.rollback.assert_not_awaited()
+
+    async def test_transaction_rolls_back_on_error(self, fake_pool, fake_conn):
+        with pytest.raises(RuntimeError):
+            async with database.unit_of_work(transaction=True):
+                await database.update_query("UPDATE", (1,))
+                raise RuntimeError("boom")
+
+        tx = fake_conn.transaction.return_value
+        tx.rollback.assert_awaited_once()
+        tx.commit.assert_not_awaited()
+        fake_pool.release.assert_awaited_once()
+
+    async def test_nested_transaction_reuses_parent_connection(self, fake_pool, fake_conn):
+        async with database.unit_of_work(transaction=True):
+            await database.read_query("SELECT 1")
+            async with database.unit_of_work(transaction=True):
+                await database.update_query("UPDATE", (1,))
+            fake_pool.release.assert_not_awaited()
+
+        assert fake_pool.acquired == 1
+        assert fake_conn.transaction.call_count == 2
+        fake_pool.release.assert_awaited_once()
+
+    async def test_transaction_in_plain_scope_releases_on_exit(self, fake_pool):
+        async with database.unit_of_work():
+            async with database.unit_of_work(transaction=True):
+                await database.update_query("UPDATE", (1,))
+                await database.update_query("UPDATE", (2,))
+            assert fake_pool.acquired == fake_pool.release.await_count == 1
+            await database.read_query("SELECT 1")
+
+        assert fake_pool.acquired == fake_pool.release.await_count == 2
+
+
+@pytest.fixture
+def replicas():
+    pools = []
+    for _ in range(2):
+        conn = MagicMock()
+        conn.fetch = AsyncMock(return_value=[{"replica": True}])
+        conn.fetchrow = AsyncMock(return_value=[1])
+        conn.statement_cache = None
+        pools.append(FakePool(conn))
+    with patch.object(database, "_replica_pools", pools):
+        yield pools
+
+
+@pytest.mark.asyncio
+class TestReplicaRouting:
+    async def test_reads_rotate_over_replicas(self, fake_pool, replicas):
+        for _ in range(4):
+            assert await database.read_query("SELECT 1") == [{"replica": True}]
+
+        assert [pool.acquired for pool in replicas] == [2, 2]
+        assert fake_pool.acquired == 0
+
+    async def test_writes_go_to_primary(self, fake_pool, replicas):
+        await database.update_query("UPDATE", (1,))
+
+        assert fake_pool.acquired == 1
+        assert all(pool.acquired == 0 for pool in replicas)
+
+    async def test_reads_after_write_stick_to_primary(self, fake_pool, replicas):
+        async with database.unit_of_work():
+            await database.read_query("SELECT 1")
+            await database.update_query("UPDATE", (1,))
+            assert await database.read_query("SELECT 1") == [{"id": 1}]
+
+        assert sum(pool.acquired for pool in replicas) == 1
+        assert fake_pool.acquired == 2
+
+    async def test_transaction_reads_from_primary(self, fake_pool, replicas):
+        async with database.unit_of_work(transaction=True):
+            await database.query_count("SELECT count(*)")
+
+        assert all(pool.acquired == 0 for pool in replicas)
+
+    async def test_least_busy_strategy(self, fake_pool, replicas):
+        busy, idle = MagicMock(), MagicMock()
+        busy.get_size.return_value, busy.get_idle_size.return_value = 5, 1
+        idle.get_size.return_value, idle.get_idle_size.return_value = 5, 5
+        with patch.object(database, "_replica_pools", [busy, idle]), \
+             patch.object(database, "DB_REPLICA_STRATEGY", "least_busy"):
+            assert database._pick_replica() is idle
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def this_function():
+    """Metrics label of the calling test (its qualified name where the interpreter has co_qualname)."""
+    return database._function_name(sys._getframe(1))
+
+
+@pytest.mark.asyncio
+class TestQueryInstrumentation:
+    async def test_labels_queries_with_repository_function(self, fake_pool):
+        labels = {"function": "check_enrollment_repo", "helper": "read_query"}
+        before = sample("db_query_duration_seconds_count", **labels)
+
+        await student_repo.check_enrollment_repo(1, 2)
+
+        assert sample("db_query_duration_seconds_count", **labels) == before + 1
+        assert sample("db_query_rows_sum", function="check_enrollment_repo") >= 1
+
+    async def test_labels_nested_loaders_with_their_enclosing_function(self, fake_pool):
+        labels = {"function": "get_course_by_id_repo", "helper": "read_query"}
+        before = sample("db_query_duration_seconds_count", **labels)
+
+        with patch.object(course_repo.course_cache, "get_or_load", new=lambda key, load: load()):
+            await course_repo.get_course_by_id_repo(987654)
+
+        assert sample("db_query_duration_seconds_count", **labels) == before + 1
+
+    async def test_logs_slow_queries(self, fake_pool, caplog):
+        with patch.object(database, "DB_SLOW_QUERY_MS", 0.000001), caplog.at_level("WARNING", "data.database"):
+            await database.update_query("UPDATE v1.courses\n   SET title = $1", ("x",))
+
+        assert "Slow query in" in caplog.text
+        assert "3 rows: UPDATE v1.courses SET title = $1" in caplog.text
+
+    async def test_counts_failed_queries(self, fake_pool, fake_conn):
+        fake_conn.fetch.side_effect = RuntimeError("boom")
+        function = this_function()
+        before = sample("db_query_errors_total", function=function)
+
+        with pytest.raises(RuntimeError):
+            await database.read_query("SELECT 1")
+
+        assert sample("db_query_errors_total", function=function) == before + 1
+
+    async def test_copy_records_query_copies_on_the_primary(self, fake_pool, fake_conn):
+        fake_conn.copy_records_to_table = AsyncMock(return_value="COPY 2")
+        function = this_function()
+        labels = {"function": function, "helper": "copy_records_query"}
+        before = sample("db_query_duration_seconds_count", **labels)
+
+        copied = await database.copy_records_query("course_sections", ("course_id", "title"), [(1, "a"), (1, "b")])
+
+        assert copied == 2
+        fake_conn.copy_records_to_table.assert_awaited_once_with(
+            "course_sections", schema_name="v1", columns=["course_id", "title"], records=[(1, "a"), (1, "b")])
+        assert sample("db_query_duration_seconds_count", **labels) == before + 1
+
+
+def fake_cursor(rows):
+    async def cursor():
+        for row in rows:
+            yield row
+    return cursor()
+
+
+@pytest.mark.asyncio
+class TestStreamQuery:
+    async def test_yields_rows_from_a_cursor_in_a_read_only_transaction(self, fake_pool, fake_conn):
+        fake_conn.cursor = MagicMock(return_value=fake_cursor([{"id": 1}, {"id": 2}]))
+
+        rows = [row async for row in database.stream_query("SELECT id FROM v1.courses WHERE owner_id = $1", (3,), prefetch=50)]
+
+        assert rows == [{"id": 1}, {"id": 2}]
+        fake_conn.cursor.assert_called_once_with("SELECT id FROM v1.courses WHERE owner_id = $1", 3, prefetch=50)
+        fake_conn.transaction.assert_called_once_with(readonly=True)
+        fake_pool.release.assert_awaited_once_with(fake_conn)
+
+    async def test_releases_the_connection_when_the_consumer_stops_early(self, fake_pool, fake_conn):
+        fake_conn.cursor = MagicMock(return_value=fake_cursor([{"id": 1}, {"id": 2}]))
+        function = this_function()
+        before = sample("db_query_rows_sum", function=function)
+
+        stream = database.stream_query("SELECT 1")
+        assert await anext(stream) == {"id": 1}
+        await stream.aclose()
+
+        fake_pool.release.assert_awaited_once_with(fake_conn)
+        assert sample("db_query_rows_sum", function=function) == before + 1
+
+    async def test_uses_its_own_connection_inside_a_unit_of_work(self, fake_pool, fake_conn):
+        fake_conn.cursor = MagicMock(return_value=fake_cursor([]))
+
+        async with database.unit_of_work():
+            await database.read_query("SELECT 1")
+            rows = [row async for row in database.stream_query("SELECT 2")]
+
+        assert rows == []
+        assert fake_pool.acquired == 2
@@ -0,0 +1,30 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from data import database
+from repositories.email_outbox_repo import claim_pending_outbox_repo
+
+
+@pytest.mark.asyncio
+async def test_claim_pending_outbox_repo_leases_rows_with_one_update():
+    rows = [{"id": 3, "payload": "{}", "attempts": 1}]
+    mock_func = AsyncMock(return_value=rows)
+
+    result = await claim_pending_outbox_repo(100, 300.0, update_data_func=mock_func)
+
+    assert result == rows
+    query, params = mock_func.call_args.args
+    assert "FOR UPDATE SKIP LOCKED" in query
+    assert params == (100, 300.0)
+
+
+@pytest.mark.asyncio
+async def test_claim_pending_outbox_repo_runs_on_the_primary():
+    primary, replica = MagicMock(), MagicMock()
+    primary.acquire.return_value.__aenter__ = AsyncMock(return_value=MagicMock(fetch=AsyncMock(return_value=[]), statement_cache=None))
+    primary.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    with patch.object(database, "_pool", primary), patch.object(database, "_replica_pools", [replica]):
+        assert await claim_pending_outbox_repo(10, 60.0) == []
+
+    primary.acquire.assert_called_once()
+    replica.acquire.assert_not_called()
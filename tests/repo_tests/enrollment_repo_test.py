@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, patch
 from datetime import datetime
 from repositories.enrollments_repo import (
     create_enrollment_repo,
+    enroll_student_repo,
     confirm_enrollment_repo,
     get_enrollment_by_id_repo,
     get_enrollment_by_student_course_repo,
@@ -43,6 +44,35 @@ class TestRepoCreateEnrollment:
         # Assert
         assert result is None
 
+@pytest.mark.asyncio
+class TestRepoEnrollStudent:
+    async def test_checks_and_inserts_in_one_statement(self):
+        fake_row = {"id": 121, "enrollment_id": 55, "subscribed": True}
+        mock_insert_query = AsyncMock(return_value=fake_row)
+
+        result = await enroll_student_repo(121, 13, 5, insert_data_func=mock_insert_query)
+
+        assert result == fake_row
+        query, params = mock_insert_query.call_args.args
+        assert "INSERT INTO v1.enrollments" in query
+        assert "JOIN v1.teachers" in query
+        assert params == (13, 121, 5)
+
+    async def test_counts_completed_and_dropped_enrollments_as_existing(self):
+        mock_insert_query = AsyncMock(return_value=None)
+
+        await enroll_student_repo(121, 13, 5, insert_data_func=mock_insert_query)
+
+        query, _ = mock_insert_query.call_args.args
+        already_enrolled = query.split("AS within_premium_limit", 1)[1].split("AS already_enrolled", 1)[0]
+        assert "completed_at" not in already_enrolled and "drop_out" not in already_enrolled
+        assert "ON CONFLICT (student_id, course_id) DO NOTHING" in query
+
+    async def test_returns_none_when_course_missing(self):
+        mock_insert_query = AsyncMock(return_value=None)
+
+        assert await enroll_student_repo(121, 13, 5, insert_data_func=mock_insert_query) is None
+
 @pytest.mark.asyncio
 class TestRepoConfirmEnrollment:
     async def test_should_call_update_query_with_correct_query_and_params(self):
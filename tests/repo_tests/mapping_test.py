@@ -0,0 +1,67 @@
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+from pydantic import ValidationError
+from data import mapping
+from data.mapping import to_model, to_models, to_model_stream, trusted_model
+from data.models import CourseStudentResponse, StudentResponse, TeacherResponse
+
+
+def course_row(**overrides):
+    return {"id": 1, "title": "T", "description": "d", "tags": "x", "picture_url": "p", "is_premium": False,
+            "owner_id": 3, "created_on": datetime(2025, 1, 1, tzinfo=timezone.utc),
+            "average_rating": Decimal("7.5"), **overrides}
+
+def student_row(**overrides):
+    return {"email": "not-an-email", "first_name": "Ana", "last_name": None, "avatar_url": None, "is_active": True,
+            "notifications": False, **overrides}
+
+
+class TestTrustedRows:
+    def test_fills_fields_by_alias_and_drops_extra_columns(self):
+        course = to_model(CourseStudentResponse, course_row())
+
+        assert course.rating == 7.5 and isinstance(course.rating, float)
+        assert "owner_id" not in course.model_dump()
+        assert course.model_dump_json().endswith('"rating":7.5}')
+
+    def test_skips_email_validation_only(self):
+        students = to_models(StudentResponse, [student_row()])
+
+        assert isinstance(students[0], StudentResponse)
+        assert students[0].email == "not-an-email"
+        with pytest.raises(ValidationError):
+            to_models(StudentResponse, [student_row(is_active="maybe")])
+
+    def test_reuses_models_without_email_fields(self):
+        assert trusted_model(CourseStudentResponse) is CourseStudentResponse
+        assert trusted_model(TeacherResponse) is trusted_model(TeacherResponse)
+        assert trusted_model(TeacherResponse).model_fields["email"].annotation is str
+
+    def test_maps_missing_rows_to_none_and_empty_lists(self):
+        assert to_model(StudentResponse, None) is None
+        assert to_models(StudentResponse, None) == []
+
+
+class TestStrictRowValidation:
+    def test_validates_every_row(self):
+        rows = [course_row(), course_row(id="x")]
+
+        with patch.object(mapping, "STRICT_ROW_VALIDATION", True), pytest.raises(ValidationError):
+            to_models(CourseStudentResponse, rows)
+
+    def test_validates_emails(self):
+        with patch.object(mapping, "STRICT_ROW_VALIDATION", True), pytest.raises(ValidationError):
+            to_model(StudentResponse, student_row())
+
+
+@pytest.mark.asyncio
+async def test_to_model_stream_maps_each_row():
+    async def rows():
+        yield course_row(id=1)
+        yield course_row(id=2)
+
+    courses = [course async for course in to_model_stream(CourseStudentResponse, rows())]
+
+    assert [course.id for course in courses] == [1, 2]
@@ -0,0 +1,60 @@
+import hashlib
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from data.migrate import discover_migrations, apply_pending, baseline
+
+
+def make_migrations(tmp_path):
+    for name in ["migration003.sql", "migration002.sql", "migration.sql", "migration 0001.sql", "notes.txt"]:
+        (tmp_path / name).write_text(f"-- {name}\nSELECT 1;\n")
+    return discover_migrations(tmp_path)
+
+def make_connection(applied: dict):
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value=[{"version": v, "checksum": c} for v, c in applied.items()])
+    conn.execute = AsyncMock()
+    return conn
+
+def checksum(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_discovers_numbered_migrations_in_order(tmp_path):
+    migrations = make_migrations(tmp_path)
+
+    assert [m.version for m in migrations] == [2, 3]
+    assert [m.name for m in migrations] == ["migration002.sql", "migration003.sql"]
+
+
+@pytest.mark.asyncio
+class TestApplyPending:
+
+    async def test_applies_only_unrecorded_migrations_in_a_transaction(self, tmp_path):
+        migrations = make_migrations(tmp_path)
+        conn = make_connection({2: checksum(migrations[0].path)})
+
+        applied = await apply_pending(conn, migrations)
+
+        assert applied == [migrations[1]]
+        conn.transaction.assert_called_once()
+        sql, record = conn.execute.await_args_list
+        assert sql.args == ("-- migration003.sql\nSELECT 1;\n",)
+        assert record.args[1:] == (3, "migration003.sql", checksum(migrations[1].path))
+
+    async def test_does_nothing_when_up_to_date(self, tmp_path):
+        migrations = make_migrations(tmp_path)
+        conn = make_connection({m.version: checksum(m.path) for m in migrations})
+
+        assert await apply_pending(conn, migrations) == []
+        conn.execute.assert_not_awaited()
+
+    async def test_baseline_records_without_running(self, tmp_path):
+        migrations = make_migrations(tmp_path)
+        conn = make_connection({})
+
+        recorded = await baseline(conn, migrations, up_to=2)
+
+        assert recorded == [migrations[0]]
+        conn.execute.assert_awaited_once()
+        assert "INSERT INTO v1.schema_migrations" in conn.execute.await_args.args[0]
+        conn.transaction.assert_not_called()
@@ -0,0 +1,37 @@
+import pytest
+from unittest.mock import AsyncMock
+from repositories.section_repo import complete_sections_repo, copy_sections_repo
+from data.models import SectionCreate
+
+
+@pytest.mark.asyncio
+async def test_complete_sections_repo_upserts_all_sections_in_one_statement():
+    rows = [{"section_id": 3, "completed": True}]
+    mock_func = AsyncMock(return_value=rows)
+
+    result = await complete_sections_repo(1, 10, [3, 4], insert_data_func=mock_func)
+
+    assert result == rows
+    mock_func.assert_awaited_once()
+    query, params = mock_func.call_args.args
+    assert "unnest($3::int[])" in query
+    assert "ON CONFLICT (students_id, course_sections_id)" in query
+    assert params == (1, 10, [3, 4])
+
+
+@pytest.mark.asyncio
+async def test_copy_sections_repo_copies_sections_of_an_async_iterable():
+    async def sections():
+        yield SectionCreate(title="One", content="c1", description="d1")
+        yield SectionCreate(title="Two", content="c2", description="d2", is_hidden=True)
+
+    copied_rows = []
+
+    async def copy_func(table, columns, records):
+        copied_rows.extend([record async for record in records])
+        return len(copied_rows)
+
+    result = await copy_sections_repo(5, sections(), copy_data_func=copy_func)
+
+    assert result == 2
+    assert copied_rows == [(5, "One", "c1", "d1", False), (5, "Two", "c2", "d2", True)]
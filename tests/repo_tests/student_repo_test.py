@@ -110,6 +110,27 @@ class TestGetCoursesProgressRepo:
         assert result is None
         mock_read_query.assert_awaited_once()
 
+@pytest.mark.asyncio
+class TestGetCourseProgressRepo:
+
+    async def test_returns_single_course_progress(self):
+        fake_row = {"course_id": 3, "title": "Course", "progress_percentage": 50.0}
+        mock_read_query = AsyncMock(return_value=[fake_row])
+
+        result = await student_repo.get_course_progress_repo(11, 3, get_data_func=mock_read_query)
+
+        assert result == fake_row
+        query, params = mock_read_query.call_args.args
+        assert params == (11, 3)
+        assert "v1.student_course_progress" in query
+
+    async def test_returns_none_when_course_missing(self):
+        mock_read_query = AsyncMock(return_value=[])
+
+        result = await student_repo.get_course_progress_repo(11, 3, get_data_func=mock_read_query)
+
+        assert result is None
+
 @pytest.mark.asyncio
 class TestUpdateAvatarUrlRepo:
 
@@ -221,6 +242,26 @@ class TestCourseRatingRepo:
         _, params = mock_insert_query.call_args.args
         assert params == (student_id, course_id, rating_value)
 
+    async def test_rate_course_repo_updates_rating_summary(self):
+        mock_insert_query = AsyncMock(return_value=1)
+
+        await student_repo.rate_course_repo(1, 11, 5, insert_data_func=mock_insert_query)
+
+        query, _ = mock_insert_query.call_args.args
+        assert query == student_repo.RATE_COURSE_FIRST_QUERY
+        assert "v1.course_rating_summary" in query and "DO NOTHING" in query
+
+    async def test_rate_course_repo_changes_an_existing_rating_in_a_second_statement(self):
+        mock_insert_query = AsyncMock(side_effect=[None, 1])
+
+        assert await student_repo.rate_course_repo(1, 11, 5, insert_data_func=mock_insert_query) == 1
+
+        (first, _), (again, params) = (call.args for call in mock_insert_query.await_args_list)
+        assert first == student_repo.RATE_COURSE_FIRST_QUERY
+        assert again == student_repo.RATE_COURSE_AGAIN_QUERY
+        assert "FOR UPDATE" in again and "previous.rating" in again
+        assert params == (1, 11, 5)
+
     async def test_allow_rating_repo_returns_true_if_allowed(self):
         student_id = 1
         course_id = 11
@@ -1,8 +1,13 @@
 import pytest
 from unittest.mock import AsyncMock
+from datetime import datetime, timezone
+from data.models import EnrollmentReportFilter, EnrollmentStatus
+from common.pagination import encode_cursor
 from repositories.teacher_repo import (
     update_teacher_repo,
     report_enrolled_students_repo,
+    stream_enrolled_students_repo,
+    get_enrollment_report_page_repo,
     deactivate_course_repo,
     verify_email_repo,
     validate_teacher_verified_and_activated_repo
@@ -70,6 +75,59 @@ class TestReportEnrolledStudentsRepo:
         assert result is None
         mock_read_query.assert_awaited_once()
 
+    async def test_stream_enrolled_students_repo_yields_rows(self):
+        # Arrange
+        calls = []
+
+        async def mock_stream_query(query, params):
+            calls.append(params)
+            for row in [{"student_id": 1}, {"student_id": 2}]:
+                yield row
+
+        # Act
+        result = [row async for row in stream_enrolled_students_repo(22, stream_data_func=mock_stream_query)]
+
+        # Assert
+        assert result == [{"student_id": 1}, {"student_id": 2}]
+        assert calls == [(22, None, None, None)]
+
+    async def test_stream_enrolled_students_repo_applies_filters_without_paging(self):
+        # Arrange
+        calls = []
+
+        async def mock_stream_query(query, params):
+            calls.append((query, params))
+            return
+            yield
+
+        filters = EnrollmentReportFilter(course_id=5, status=EnrollmentStatus.dropped, limit=1)
+
+        # Act
+        result = [row async for row in stream_enrolled_students_repo(22, filters, stream_data_func=mock_stream_query)]
+
+        # Assert
+        query, params = calls[0]
+        assert result == []
+        assert params == (22, 5, None, None)
+        assert "AND e.drop_out = TRUE" in query
+        assert "LIMIT" not in query
+
+    async def test_get_enrollment_report_page_repo_continues_after_the_cursor(self):
+        # Arrange
+        mock_read_query = AsyncMock(return_value=[])
+        requested_at = datetime(2025, 3, 1, tzinfo=timezone.utc)
+        filters = EnrollmentReportFilter(requested_from=requested_at, limit=20, cursor=encode_cursor(requested_at, 41))
+
+        # Act
+        await get_enrollment_report_page_repo(22, filters, get_data_func=mock_read_query)
+
+        # Assert
+        query, params = mock_read_query.call_args.args
+        assert params == (22, None, requested_at, None, requested_at.isoformat(), 41, 20)
+        assert "AND (e.requested_at, e.id) > ($5::text::timestamptz, $6::int)" in query
+        assert "ORDER BY e.requested_at, e.id" in query
+        assert "LIMIT $7" in query
+
 @pytest.mark.asyncio
 class TestDeactivateCourseRepo:
     async def test_deactivate_course_repo_returns_result(self):
@@ -7,7 +7,8 @@ from repositories.user_repo import (
     get_account_by_email_repo,
     get_user_by_id_repo,
     email_exists_repo,
-    get_role_by_email_repo
+    get_role_by_email_repo,
+    get_identity_by_email_repo
 )
 from data.models import UserRole, StudentRegisterData, TeacherRegisterData
 
@@ -197,51 +198,54 @@ class TestEmailExistsRepo:
 
 @pytest.mark.asyncio
 class TestGetRoleByEmailRepo:
-    async def test_returns_first_role_found(self):
+    async def test_returns_role_from_single_query(self):
         # Arrange
         email = "test@example.com"
-        # Simulate: found in students
-        mock_read_query = AsyncMock(side_effect=[
-            [{"1": 1}],  # students -> found
-            [],          # teachers -> skipped
-            []           # admins -> skipped
-        ])
-
-        # Act
-        result = await get_role_by_email_repo(email, get_data_func=mock_read_query)
-
-        # Assert
-        assert result == "student"
-        assert mock_read_query.await_count == 1  # stops at first found
-
-    async def test_checks_all_tables_and_returns_role(self):
-        # Arrange
-        email = "test@example.com"
-        # Simulate: not in students, but found in teachers
-        mock_read_query = AsyncMock(side_effect=[
-            [],           # students -> not found
-            [{"1": 1}],   # teachers -> found
-            []            # admins -> skipped
-        ])
+        mock_read_query = AsyncMock(return_value=[{"role": "teacher"}])
 
         # Act
         result = await get_role_by_email_repo(email, get_data_func=mock_read_query)
 
         # Assert
         assert result == "teacher"
-        assert mock_read_query.await_count == 2
+        mock_read_query.assert_awaited_once()
+        query, params = mock_read_query.call_args.args
+        assert "v1.accounts" in query
+        assert params == (email,)
 
     async def test_returns_none_if_not_found_in_any(self):
         # Arrange
         email = "test@example.com"
-        mock_read_query = AsyncMock(side_effect=[
-            [], [], []  # students, teachers, admins -> none found
-        ])
+        mock_read_query = AsyncMock(return_value=[])
 
         # Act
         result = await get_role_by_email_repo(email, get_data_func=mock_read_query)
 
         # Assert
         assert result is None
-        assert mock_read_query.await_count == 3
+        mock_read_query.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+class TestGetIdentityByEmailRepo:
+    async def test_returns_role_hash_and_role_profile(self):
+        account = {
+            "role": "teacher", "role_rank": 2, "id": 4, "email": "t@example.com", "password": "hash",
+            "is_active": False, "first_name": None, "last_name": None, "avatar_url": None,
+            "notifications": None, "mobile": "0888", "linked_in_url": "in/t",
+        }
+        mock_read_query = AsyncMock(return_value=[account])
+
+        result = await get_identity_by_email_repo("t@example.com", get_data_func=mock_read_query)
+
+        assert result == {
+            "role": "teacher",
+            "password": "hash",
+            "profile": {"id": 4, "email": "t@example.com", "mobile": "0888", "linked_in_url": "in/t", "is_active": False},
+        }
+        mock_read_query.assert_awaited_once()
+
+    async def test_returns_none_for_unknown_email(self):
+        mock_read_query = AsyncMock(return_value=[])
 
+        assert await get_identity_by_email_repo("x@example.com", get_data_func=mock_read_query) is None
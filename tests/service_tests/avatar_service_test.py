@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+from io import BytesIO
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+from config.cloudinary_config import read_avatar
+from data import database
+from services.avatar_service import start_avatar_upload, get_avatar_upload_job
+
+
+class CountingPool:
+    """Pool of one mocked connection counting how often it is borrowed and returned."""
+
+    def __init__(self):
+        self.conn = MagicMock(fetch=AsyncMock(return_value=[]), execute=AsyncMock(return_value="UPDATE 1"),
+                              statement_cache=None)
+        self.conn.transaction.return_value = MagicMock(start=AsyncMock(), commit=AsyncMock(), rollback=AsyncMock())
+        self.acquired = self.released = 0
+
+    def acquire(self, timeout=None):
+        return self
+
+    def __await__(self):
+        self.acquired += 1
+        yield from asyncio.sleep(0).__await__()
+        return self.conn
+
+    async def __aenter__(self):
+        self.acquired += 1
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        await self.release(self.conn)
+
+    async def release(self, conn):
+        self.released += 1
+
+
+def make_upload(content: bytes, content_type: str = "image/png", size=None):
+    return UploadFile(file=BytesIO(content), size=size, headers=Headers({"content-type": content_type}))
+
+
+@pytest.mark.asyncio
+class TestReadAvatar:
+    async def test_spools_file_in_chunks(self):
+        spooled = await read_avatar(make_upload(b"x" * 200_000), max_bytes=300_000)
+
+        assert spooled.read() == b"x" * 200_000
+        spooled.close()
+
+    async def test_rejects_declared_size_before_reading(self):
+        upload = make_upload(b"", size=10_000)
+
+        with pytest.raises(HTTPException) as exc:
+            await read_avatar(upload, max_bytes=100)
+        assert exc.value.status_code == 413
+
+    async def test_rejects_stream_over_limit(self):
+        with pytest.raises(HTTPException) as exc:
+            await read_avatar(make_upload(b"x" * 200_000), max_bytes=100_000)
+        assert exc.value.status_code == 413
+
+    async def test_rejects_non_images(self):
+        with pytest.raises(HTTPException) as exc:
+            await read_avatar(make_upload(b"text", content_type="text/plain"))
+        assert exc.value.status_code == 415
+
+
+@pytest.mark.asyncio
+class TestAvatarUploadJob:
+    async def test_uploads_and_updates_url_in_background(self):
+        with patch("services.avatar_service.upload_avatar", new_callable=AsyncMock) as mock_upload, \
+             patch("services.avatar_service.update_avatar_url", new_callable=AsyncMock) as mock_update:
+            mock_upload.return_value = "https://cdn/avatar.png"
+
+            job = await start_avatar_upload(make_upload(b"png"), "student@example.com")
+            assert job.status == "pending"
+            await asyncio.sleep(0.01)
+
+            assert job.status == "succeeded"
+            assert job.url == "https://cdn/avatar.png"
+            mock_update.assert_awaited_once_with("https://cdn/avatar.png", "student@example.com")
+
+    async def test_failed_upload_is_reported(self):
+        with patch("services.avatar_service.upload_avatar", new_callable=AsyncMock) as mock_upload, \
+             patch("services.avatar_service.update_avatar_url", new_callable=AsyncMock) as mock_update:
+            mock_upload.side_effect = RuntimeError("cloudinary down")
+
+            job = await start_avatar_upload(make_upload(b"png"), "student@example.com")
+            await asyncio.sleep(0.01)
+
+            assert job.status == "failed"
+            assert job.error == "cloudinary down"
+            mock_update.assert_not_awaited()
+
+    async def test_jobs_are_visible_to_their_owner_only(self):
+        with patch("services.avatar_service.upload_avatar", new_callable=AsyncMock), \
+             patch("services.avatar_service.update_avatar_url", new_callable=AsyncMock):
+            job = await start_avatar_upload(make_upload(b"png"), "owner@example.com")
+            await asyncio.sleep(0.01)
+
+        assert get_avatar_upload_job(job.id, "owner@example.com") is job
+        assert get_avatar_upload_job(job.id, "other@example.com") is None
+
+    async def test_background_task_returns_its_connection_to_the_pool(self):
+        pool = CountingPool()
+
+        with patch.object(database, "_pool", pool), patch.object(database, "_replica_pools", []), \
+             patch("services.avatar_service.upload_avatar", new_callable=AsyncMock, return_value="https://cdn/a.png"):
+            async with database.unit_of_work(transaction=True):
+                await database.read_query("SELECT 1")
+                job = await start_avatar_upload(make_upload(b"png"), "student@example.com")
+            await asyncio.sleep(0.01)
+
+        assert job.status == "succeeded"
+        pool.conn.execute.assert_awaited_once()
+        assert pool.acquired == pool.released == 2
@@ -0,0 +1,105 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from asyncpg.exceptions import UniqueViolationError
+from fastapi.exceptions import HTTPException
+from services import course_import_service
+from services.course_import_service import (
+    parse_course_bundle, parse_csv_sections, import_course_service, import_sections_service)
+
+
+async def chunked(text: str, size: int = 7):
+    data = text.encode("utf-8")
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+async def collect(sections):
+    return [section async for section in sections]
+
+def course_data(**overrides):
+    return {"title": "Course", "description": "d", "tags": "python", "picture_url": "url", "is_premium": False,
+            **overrides}
+
+
+@pytest.mark.asyncio
+class TestParseCsvSectionsShould:
+    async def test_parse_rows_split_across_chunks_and_multiline_fields(self):
+        body = 'title,content,description,is_hidden\nIntro,"Line one\nLine ""two""",First,\nNext,Body,Second,true\n'
+
+        sections = await collect(parse_csv_sections(chunked(body)))
+
+        assert [(s.title, s.content, s.is_hidden) for s in sections] == [
+            ("Intro", 'Line one\nLine "two"', False), ("Next", "Body", True)]
+
+    async def test_reject_a_header_missing_a_column(self):
+        with pytest.raises(HTTPException) as error:
+            await collect(parse_csv_sections(chunked("title,content\nA,B\n")))
+
+        assert error.value.status_code == 422
+
+    async def test_report_the_number_of_an_invalid_row(self):
+        body = "title,content,description,is_hidden\nA,B,C,no\nD,E,F,maybe\n"
+
+        with pytest.raises(HTTPException) as error:
+            await collect(parse_csv_sections(chunked(body)))
+
+        assert error.value.status_code == 422
+        assert error.value.detail.startswith("Section 2: is_hidden")
+
+    async def test_stop_past_the_section_limit(self):
+        body = "title,content,description\n" + "".join(f"T{n},c,d\n" for n in range(3))
+
+        with patch.object(course_import_service, "MAX_IMPORT_SECTIONS", 2), pytest.raises(HTTPException) as error:
+            await collect(parse_csv_sections(chunked(body)))
+
+        assert error.value.status_code == 413
+
+
+class TestParseCourseBundleShould:
+    def test_validate_the_course_and_sections_lazily(self):
+        body = json.dumps({"course": course_data(), "sections": [
+            {"title": "A", "content": "c", "description": "d"}, {"title": "B"}]}).encode()
+
+        course, sections = parse_course_bundle(body)
+
+        assert course.title == "Course"
+        assert next(sections).title == "A"
+        with pytest.raises(HTTPException) as error:
+            next(sections)
+        assert error.value.detail.startswith("Section 2:")
+
+    def test_reject_an_invalid_course(self):
+        with pytest.raises(HTTPException) as error:
+            parse_course_bundle(json.dumps({"course": {"title": "x"}, "sections": []}).encode())
+
+        assert error.value.status_code == 422
+        assert error.value.detail.startswith("Course:")
+
+
+@pytest.mark.asyncio
+class TestImportServicesShould:
+    async def test_create_the_course_and_copy_its_sections_in_one_transaction(self):
+        course, sections = parse_course_bundle(json.dumps({"course": course_data(), "sections": []}).encode())
+
+        with patch("services.course_import_service.unit_of_work") as mock_uow, \
+             patch("services.course_import_service.insert_course_repo", new_callable=AsyncMock, return_value=9) as mock_insert, \
+             patch("services.course_import_service.copy_sections_repo", new_callable=AsyncMock, return_value=300) as mock_copy:
+            mock_uow.return_value = MagicMock(__aenter__=AsyncMock(), __aexit__=AsyncMock(return_value=False))
+
+            result = await import_course_service(4, course, sections)
+
+        assert result == (9, 300)
+        mock_uow.assert_called_once_with(transaction=True)
+        assert mock_insert.await_args.args[0].owner_id == 4
+        mock_copy.assert_awaited_once_with(9, sections)
+
+    async def test_map_a_duplicate_section_title_to_bad_request(self):
+        with patch("services.course_import_service.unit_of_work") as mock_uow, \
+             patch("services.course_import_service.copy_sections_repo", new_callable=AsyncMock,
+                   side_effect=UniqueViolationError("duplicate")):
+            mock_uow.return_value = MagicMock(__aenter__=AsyncMock(), __aexit__=AsyncMock(return_value=False))
+
+            with pytest.raises(HTTPException) as error:
+                await import_sections_service(3, [])
+
+        assert error.value.status_code == 400
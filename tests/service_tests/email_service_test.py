@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from services import email_service
+from services.email_service import EmailDispatcher, FakeTransport, MailjetTransport
+
+
+def message(n):
+    return {"To": [{"Email": f"student{n}@example.com"}], "Subject": f"Message {n}"}
+
+
+@pytest.mark.asyncio
+class TestEmailDispatcher:
+    async def test_enqueue_returns_before_delivery(self):
+        transport = FakeTransport()
+        dispatcher = EmailDispatcher(transport, outbox=False)
+
+        assert await dispatcher.enqueue([message(1)]) == 1
+        assert transport.batches == []
+
+        await dispatcher.start()
+        await dispatcher.stop()
+
+        assert transport.messages == [message(1)]
+
+    async def test_batches_up_to_batch_size(self):
+        transport = FakeTransport()
+        dispatcher = EmailDispatcher(transport, workers=1, batch_size=50, outbox=False)
+
+        await dispatcher.enqueue([message(n) for n in range(120)])
+        await dispatcher.start()
+        await dispatcher.stop()
+
+        assert [len(batch) for batch in transport.batches] == [50, 50, 20]
+
+    async def test_retries_failed_batch_with_backoff(self):
+        transport = FakeTransport(failures=2)
+        dispatcher = EmailDispatcher(transport, workers=1, retry_base_delay=0.01, outbox=False)
+
+        await dispatcher.start()
+        await dispatcher.enqueue([message(1)])
+        for _ in range(100):
+            if transport.messages:
+                break
+            await asyncio.sleep(0.01)
+        await dispatcher.stop()
+
+        assert transport.messages == [message(1)]
+        assert dispatcher.stats["retried"] == 2
+
+    async def test_gives_up_after_max_attempts(self):
+        transport = FakeTransport(failures=10)
+        dispatcher = EmailDispatcher(transport, workers=1, max_attempts=1, outbox=False)
+
+        await dispatcher.enqueue([message(1)])
+        await dispatcher.start()
+        await dispatcher.stop()
+
+        assert transport.messages == []
+        assert dispatcher.stats["failed"] == 1
+
+    async def test_rejected_message_does_not_use_up_attempts_of_others(self):
+        transport = FakeTransport(rejected=frozenset({"student2@example.com"}))
+        dispatcher = EmailDispatcher(transport, workers=1, max_attempts=2, retry_base_delay=0.01, outbox=False)
+
+        with patch("services.email_service.mark_outbox_sent_repo", new_callable=AsyncMock):
+            await dispatcher.start()
+            await dispatcher.enqueue([message(1), message(2), message(3)])
+            for _ in range(100):
+                if dispatcher.stats["failed"]:
+                    break
+                await asyncio.sleep(0.01)
+            await dispatcher.stop()
+
+        assert transport.messages == [message(1), message(3)]
+        assert dispatcher.stats == {"queued": 4, "sent": 2, "retried": 1, "failed": 1}
+
+    async def test_outbox_rows_are_stored_and_marked_sent(self):
+        transport = FakeTransport()
+        dispatcher = EmailDispatcher(transport)
+
+        with patch("services.email_service.insert_outbox_messages_repo", new_callable=AsyncMock) as mock_insert, \
+             patch("services.email_service.claim_pending_outbox_repo", new_callable=AsyncMock) as mock_claim, \
+             patch("services.email_service.mark_outbox_sent_repo", new_callable=AsyncMock) as mock_sent:
+            mock_insert.return_value = [11, 12]
+            mock_claim.return_value = [{"id": 3, "payload": '{"Subject": "left over"}', "attempts": 1}]
+
+            await dispatcher.enqueue([message(1), message(2)])
+            await dispatcher.start()
+            await dispatcher.stop()
+
+            mock_insert.assert_awaited_once_with([message(1), message(2)], dispatcher.lease_seconds)
+            assert sorted(id for call in mock_sent.await_args_list for id in call.args[0]) == [3, 11, 12]
+            assert {"Subject": "left over"} in transport.messages
+
+
+@pytest.mark.asyncio
+class TestMailjetTransport:
+    @staticmethod
+    def transport(status_code, body):
+        response = MagicMock(status_code=status_code, text=str(body))
+        response.json.return_value = body
+        return MailjetTransport(MagicMock(send=MagicMock(create=MagicMock(return_value=response))))
+
+    async def test_reports_rejected_messages_of_a_partly_delivered_batch(self):
+        body = {"Messages": [{"Status": "success"}, {"Status": "error", "Errors": [{"ErrorMessage": "bad To"}]}]}
+
+        errors = await self.transport(400, body).send([message(1), message(2)])
+
+        assert errors[0] is None
+        assert "bad To" in errors[1]
+
+    async def test_raises_when_the_batch_failed_as_a_whole(self):
+        with pytest.raises(email_service.EmailDeliveryError):
+            await self.transport(401, {"ErrorMessage": "unauthorized"}).send([message(1)])
+
+
+@pytest.mark.asyncio
+async def test_enqueue_emails_requires_running_dispatcher():
+    with patch.object(email_service, "_dispatcher", None):
+        with pytest.raises(RuntimeError):
+            await email_service.enqueue_emails([message(1)])
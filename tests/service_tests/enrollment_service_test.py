@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import patch, AsyncMock
 from services.enrollment_service import (
+    enroll_student_service,
+    PREMIUM_ENROLLMENT_LIMIT,
     get_enrollment_by_id,
     EnrollmentResponse,
     unenroll_student_service
@@ -45,12 +47,12 @@ class TestUnenrollStudentShould:
         course_id = 101
 
         # Fake stuff
-        fake_progress = [{"course_id": course_id, "progress_percentage": 15}]
+        fake_progress = {"course_id": course_id, "progress_percentage": 15}
         fake_enrollment = {"id": 2}
         fake_unenroll_result = {"status": "success"}
 
         with patch(
-            "services.enrollment_service.get_courses_progress_repo",
+            "services.enrollment_service.get_course_progress_repo",
             new_callable=AsyncMock
         ) as mock_get_progress, \
              patch(
@@ -69,7 +71,7 @@ class TestUnenrollStudentShould:
             result = await unenroll_student_service(student_id, course_id)
 
             assert result == fake_unenroll_result
-            mock_get_progress.assert_awaited_once_with(student_id)
+            mock_get_progress.assert_awaited_once_with(student_id, course_id)
             mock_get_enrollment.assert_awaited_once_with(student_id, course_id)
             mock_unenroll_repo.assert_awaited_once_with(2, True)  # dropout = True (75% < 100)
 
@@ -77,10 +79,10 @@ class TestUnenrollStudentShould:
         student_id = 2
         course_id = 22
 
-        fake_progress = [{"course_id": course_id, "progress_percentage": 100}]
+        fake_progress = {"course_id": course_id, "progress_percentage": 100}
 
         with patch(
-            "services.enrollment_service.get_courses_progress_repo",
+            "services.enrollment_service.get_course_progress_repo",
             new_callable=AsyncMock
         ) as mock_get_progress, \
              patch(
@@ -98,6 +100,19 @@ class TestUnenrollStudentShould:
             result = await unenroll_student_service(student_id, course_id)
 
             assert result is None
-            mock_get_progress.assert_awaited_once_with(student_id)
+            mock_get_progress.assert_awaited_once_with(student_id, course_id)
             mock_get_enrollment.assert_awaited_once_with(student_id, course_id)
             mock_unenroll_repo.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+class TestEnrollStudentService:
+    async def test_passes_premium_limit_to_repo(self):
+        fake_row = {"id": 22, "enrollment_id": 7}
+        with patch("services.enrollment_service.enroll_student_repo", new_callable=AsyncMock) as mock_repo:
+            mock_repo.return_value = fake_row
+
+            result = await enroll_student_service(22, 2)
+
+            assert result == fake_row
+            mock_repo.assert_awaited_once_with(22, 2, PREMIUM_ENROLLMENT_LIMIT)
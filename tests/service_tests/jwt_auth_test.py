@@ -0,0 +1,66 @@
+import time
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from fastapi import HTTPException
+from jose import jwt
+from security import auth_dependencies, jwt_auth
+from security.auth_dependencies import get_current_user
+
+SECRET = "test-secret"
+
+
+@pytest.fixture(autouse=True)
+def signing_key():
+    with patch.object(jwt_auth, "SECRET_KEY", SECRET), patch.object(jwt_auth, "ALGORITHM", "HS256"), \
+         patch.object(auth_dependencies, "SECRET_KEY", SECRET), patch.object(auth_dependencies, "ALGORITHM", "HS256"), \
+         patch.object(auth_dependencies, "_payload_cache", auth_dependencies.OrderedDict()):
+        yield
+
+
+def test_create_access_token_sets_exp_from_expires_delta():
+    token = jwt_auth.create_access_token({"email": "a@b.com"}, expires_delta=timedelta(minutes=5))["JWT"]
+
+    exp = jwt.get_unverified_claims(token)["exp"]
+    assert time.time() + 290 < exp <= time.time() + 300
+
+
+def test_create_access_token_uses_default_lifetime():
+    with patch.object(jwt_auth, "ACCESS_TOKEN_EXPIRE_MINUTES", "30"):
+        token = jwt_auth.create_access_token({"email": "a@b.com"})["JWT"]
+
+    assert "exp" in jwt.get_unverified_claims(token)
+
+
+@pytest.mark.asyncio
+class TestGetCurrentUser:
+    async def test_verifies_signature_once_per_token(self):
+        token = jwt_auth.create_access_token({"email": "a@b.com", "role": "student"}, timedelta(minutes=5))["JWT"]
+
+        with patch("security.auth_dependencies.jwt.decode", wraps=jwt.decode) as mock_decode:
+            first = await get_current_user(token)
+            second = await get_current_user(token)
+
+        assert first == second
+        assert first["email"] == "a@b.com"
+        mock_decode.assert_called_once()
+
+    async def test_cached_payload_expires_with_token(self):
+        token = jwt_auth.create_access_token({"email": "a@b.com"}, timedelta(minutes=5))["JWT"]
+        await get_current_user(token)
+
+        with patch("security.auth_dependencies.time.time", return_value=time.time() + 600), \
+             patch("security.auth_dependencies.jwt.decode", side_effect=auth_dependencies.JWTError("expired")) as mock_decode:
+            with pytest.raises(HTTPException) as exc:
+                await get_current_user(token)
+
+        mock_decode.assert_called_once()
+        assert exc.value.status_code == 401
+
+    async def test_rejects_tampered_token(self):
+        token = jwt.encode({"email": "a@b.com"}, "other-secret", algorithm="HS256")
+
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user(token)
+        assert exc.value.status_code == 401
+        assert len(auth_dependencies._payload_cache) == 0
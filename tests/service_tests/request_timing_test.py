@@ -0,0 +1,54 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from common.request_timing import RequestTimingMiddleware
+from data import database
+
+
+app = FastAPI()
+app.add_middleware(RequestTimingMiddleware)
+
+
+@app.get("/timing-test/{item_id}")
+async def read_item(item_id: int):
+    await database.read_query("SELECT 1")
+    await database.read_query("SELECT 2")
+    return {"item_id": item_id}
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def make_pool():
+    conn = MagicMock(fetch=AsyncMock(return_value=[]), statement_cache=None)
+    acquire = MagicMock()
+    acquire.__aenter__ = AsyncMock(return_value=conn)
+    acquire.__aexit__ = AsyncMock(return_value=False)
+    return MagicMock(acquire=MagicMock(return_value=acquire))
+
+
+def test_records_requests_per_route_template():
+    labels = {"method": "GET", "route": "/timing-test/{item_id}"}
+    before = sample("http_request_duration_seconds_count", status="200", **labels)
+    queries_before = sample("http_request_db_queries_sum", **labels)
+
+    with patch.object(database, "_pool", make_pool()):
+        response = TestClient(app).get("/timing-test/7")
+
+    assert response.status_code == 200
+    assert sample("http_request_duration_seconds_count", status="200", **labels) == before + 1
+    assert sample("http_request_db_queries_sum", **labels) == queries_before + 2
+    assert sample("http_requests_in_flight", **labels) == 0
+    assert 'desc="2 queries"' in response.headers["server-timing"]
+
+
+def test_unknown_paths_share_one_label():
+    before = sample("http_request_duration_seconds_count", method="GET", route="<unmatched>", status="404")
+
+    TestClient(app).get("/no/such/path")
+    TestClient(app).get("/another/unknown/path")
+
+    assert sample("http_request_duration_seconds_count",
+                  method="GET", route="<unmatched>", status="404") == before + 2
@@ -0,0 +1,38 @@
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from common.responses import Successful, StreamingCSV, dumps
+from data.models import CourseStudentResponse
+
+
+def course(**overrides):
+    return CourseStudentResponse(**{
+        "id": 1, "title": "T", "description": "d", "tags": "x", "picture_url": "p", "is_premium": False,
+        "created_on": datetime(2025, 1, 1, tzinfo=timezone.utc), "average_rating": 7.5, **overrides})
+
+
+class TestDumpsShould:
+    def test_encode_models_like_model_dump_json(self):
+        model = course()
+
+        assert dumps([model]) == f"[{model.model_dump_json()}]".encode()
+
+    def test_encode_decimals_as_numbers_and_utc_datetimes_with_z(self):
+        content = {"average_rating": Decimal("7.50"), "created_on": datetime(2025, 1, 1, tzinfo=timezone.utc)}
+
+        assert dumps(content) == b'{"average_rating":7.5,"created_on":"2025-01-01T00:00:00Z"}'
+
+    def test_render_response_bodies(self):
+        assert Successful(content={"rating": Decimal("5")}).body == b'{"rating":5.0}'
+
+
+@pytest.mark.asyncio
+async def test_streaming_csv_writes_models_as_rows():
+    async def rows():
+        yield course()
+        yield {"id": 2, "title": "Comma, title", "rating": None}
+
+    response = StreamingCSV(rows(), ["id", "title", "rating"])
+    body = b"".join([chunk async for chunk in response.body_iterator])
+
+    assert body.decode().splitlines() == ["id,title,rating", "1,T,7.5", '2,"Comma, title",']
@@ -0,0 +1,48 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from security import secrets
+from security.secrets import hash_password_async, verify_and_update_password
+
+# Fast pure-python schemes stand in for bcrypt; md5_crypt plays the outdated hash
+test_context = CryptContext(schemes=["sha256_crypt", "md5_crypt"], deprecated="auto", sha256_crypt__rounds=1000)
+
+
+@pytest.fixture(autouse=True)
+def context():
+    with patch.object(secrets, "password_context", test_context):
+        yield
+
+
+@pytest.mark.asyncio
+class TestPasswordPool:
+    async def test_hash_and_verify_off_the_event_loop(self):
+        hashed = await hash_password_async("s3cret-pass")
+
+        assert await verify_and_update_password("s3cret-pass", hashed) == (True, None)
+        assert (await verify_and_update_password("wrong-pass", hashed))[0] is False
+
+    async def test_outdated_hash_is_replaced_on_verify(self):
+        outdated = test_context.handler("md5_crypt").hash("s3cret-pass")
+
+        valid, new_hash = await verify_and_update_password("s3cret-pass", outdated)
+
+        assert valid is True
+        assert new_hash.startswith("$5$")
+
+    async def test_queue_metrics(self):
+        with patch.dict(secrets.password_hash_stats, {"waiting": 0, "running": 0, "completed": 0,
+                                                      "rejected": 0, "wait_seconds_total": 0.0}):
+            await asyncio.gather(*(hash_password_async("s3cret-pass") for _ in range(6)))
+
+            assert secrets.password_hash_stats["completed"] == 6
+            assert secrets.password_hash_stats["waiting"] == 0
+            assert secrets.password_hash_stats["running"] == 0
+
+    async def test_rejects_when_queue_is_full(self):
+        with patch.object(secrets, "PASSWORD_HASH_MAX_QUEUE", 0):
+            with pytest.raises(HTTPException) as exc:
+                await hash_password_async("s3cret-pass")
+        assert exc.value.status_code == 503
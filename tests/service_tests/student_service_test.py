@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import AsyncMock, patch
 
-from services.student_service import update_student_service
+from services.student_service import update_student_service, complete_sections_service
 
 
 @pytest.mark.asyncio
@@ -33,4 +33,17 @@ class TestUpdateStudentService:
             assert result == fake_account
 
 
-
+@pytest.mark.asyncio
+class TestCompleteSectionsService:
+    async def test_reports_result_per_section(self):
+        rows = [{"section_id": 3, "completed": True}, {"section_id": 8, "completed": False}]
+        with patch("services.student_service.complete_sections_repo", new_callable=AsyncMock) as mock_repo:
+            mock_repo.return_value = rows
+
+            result = await complete_sections_service(1, 10, [8, 3, 3])
+
+            assert result == [
+                {"section_id": 3, "status": "completed"},
+                {"section_id": 8, "status": "not_in_course"},
+            ]
+            mock_repo.assert_awaited_once_with(1, 10, [8, 3, 3])
@@ -1,8 +1,12 @@
 import pytest
 from unittest.mock import AsyncMock, patch
 from common.responses import Forbidden
-from data.models import UserRole
-from services.teacher_service import validate_teacher_role
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from common.pagination import decode_cursor
+from data.models import UserRole, EnrollmentReportFilter
+from services.teacher_service import (
+    validate_teacher_role, get_enrollment_report_page, enrollment_report_next_cursor, stream_enrolled_students)
 
 @pytest.mark.asyncio
 class TestValidateTeacherRole:
@@ -34,3 +38,37 @@ class TestValidateTeacherRole:
 
 
 
+
+
+@pytest.mark.asyncio
+class TestEnrollmentReport:
+    async def test_page_is_read_with_the_filters(self):
+        filters = EnrollmentReportFilter(course_id=4, limit=2)
+        rows = [{"enrollment_id": 1, "requested_at": datetime(2025, 1, 1, tzinfo=timezone.utc)},
+                {"enrollment_id": 7, "requested_at": datetime(2025, 1, 2, tzinfo=timezone.utc)}]
+
+        with patch("services.teacher_service.get_enrollment_report_page_repo", new_callable=AsyncMock) as mock_repo:
+            mock_repo.return_value = rows
+
+            result = await get_enrollment_report_page(3, filters)
+
+            assert result == rows
+            mock_repo.assert_awaited_once_with(3, filters)
+            assert decode_cursor(enrollment_report_next_cursor(result, filters)) == ("2025-01-02T00:00:00+00:00", 7)
+
+    async def test_rejects_an_empty_request_period(self):
+        filters = EnrollmentReportFilter(requested_from=datetime(2025, 2, 1), requested_to=datetime(2025, 1, 1))
+
+        with pytest.raises(HTTPException) as error:
+            stream_enrolled_students(3, filters)
+
+        assert error.value.status_code == 400
+
+    async def test_compares_naive_and_offset_bounds_as_utc(self):
+        filters = EnrollmentReportFilter(requested_from="2024-01-01T00:00:00", requested_to="2024-02-01T00:00:00Z")
+
+        with patch("services.teacher_service.stream_enrolled_students_repo") as mock_repo:
+            stream_enrolled_students(3, filters)
+
+        assert filters.requested_from == datetime(2024, 1, 1, tzinfo=timezone.utc)
+        mock_repo.assert_called_once_with(3, filters)